@@ -1,12 +1,12 @@
-import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from typing import List, Dict, Tuple
-from sklearn.linear_model import LinearRegression
 
 from database.models import PerformanceRecord, AnxietySignal, MicroGoal
 from schemas.anxiety_signal import AnxietySignalCreate
+from monitoring.profiling import phase_timers, profiled
+from cache.store import shared_cache, student_scope
+from utils.singleflight import coalesced
 
 
 class AnxietySignalsEngine:
@@ -19,26 +19,30 @@ class AnxietySignalsEngine:
             'performance_trend': 0.15      # Overall performance trend
         }
 
+    @coalesced("anxiety_signals.calculate_confidence_score")
+    @profiled("anxiety_signals")
     def calculate_confidence_score(self, db: Session, student_id: int) -> float:
         """
         Calculate a confidence score (0-100) based on multiple factors
         """
-        # Get recent performance data (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        performance_records = db.query(PerformanceRecord).filter(
-            PerformanceRecord.student_id == student_id,
-            PerformanceRecord.date >= thirty_days_ago
-        ).order_by(PerformanceRecord.date).all()
+        with phase_timers.phase("anxiety_signals", "load"):
+            # Get recent performance data (last 30 days)
+            thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+            performance_records = db.query(PerformanceRecord).filter(
+                PerformanceRecord.student_id == student_id,
+                PerformanceRecord.date >= thirty_days_ago
+            ).order_by(PerformanceRecord.date).all()
         
         if not performance_records:
             return 50.0  # Neutral score if no data
         
-        # Calculate individual factors
-        consistency_score = self._calculate_consistency_score(db, student_id)
-        improvement_streak_score = self._calculate_improvement_streak_score(performance_records)
-        mistake_reduction_score = self._calculate_mistake_reduction_score(performance_records)
-        goal_completion_score = self._calculate_goal_completion_score(db, student_id)
-        performance_trend_score = self._calculate_performance_trend_score(performance_records)
+        with phase_timers.phase("anxiety_signals", "analyze"):
+            # Calculate individual factors
+            consistency_score = self._calculate_consistency_score(db, student_id)
+            improvement_streak_score = self._calculate_improvement_streak_score(performance_records)
+            mistake_reduction_score = self._calculate_mistake_reduction_score(performance_records)
+            goal_completion_score = self._calculate_goal_completion_score(db, student_id)
+            performance_trend_score = self._calculate_performance_trend_score(performance_records)
         
         # Weighted combination of factors
         confidence_score = (
@@ -54,30 +58,42 @@ class AnxietySignalsEngine:
         
         return round(confidence_score, 2)
 
+    def cached_confidence_score(self, db: Session, student_id: int) -> Tuple[float, bool]:
+        """
+        Confidence score from the shared cache, recomputed when the student's
+        records or goals changed (or the entry expired). Returns (score, hit).
+        """
+        key = shared_cache.generation_key(f"confidence:{student_id}", student_scope(student_id))
+        return shared_cache.get_or_set(key, lambda: self.calculate_confidence_score(db, student_id))
+
+    @coalesced("anxiety_signals.detect_anxiety_signals")
+    @profiled("anxiety_signals")
     def detect_anxiety_signals(self, db: Session, student_id: int) -> List[AnxietySignalCreate]:
         """
         Detect various anxiety signals based on performance and behavior patterns
         """
         signals = []
         
-        # Get recent data
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        performance_records = db.query(PerformanceRecord).filter(
-            PerformanceRecord.student_id == student_id,
-            PerformanceRecord.date >= thirty_days_ago
-        ).order_by(PerformanceRecord.date).all()
-        
-        # Detect stress indicators
-        stress_signals = self._detect_stress_signals(performance_records, student_id)
-        signals.extend(stress_signals)
-        
-        # Detect improvement streaks
-        improvement_signals = self._detect_improvement_signals(performance_records, student_id)
-        signals.extend(improvement_signals)
-        
-        # Detect consistency patterns
-        consistency_signals = self._detect_consistency_signals(db, student_id)
-        signals.extend(consistency_signals)
+        with phase_timers.phase("anxiety_signals", "load"):
+            # Get recent data
+            thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+            performance_records = db.query(PerformanceRecord).filter(
+                PerformanceRecord.student_id == student_id,
+                PerformanceRecord.date >= thirty_days_ago
+            ).order_by(PerformanceRecord.date).all()
+        
+        with phase_timers.phase("anxiety_signals", "analyze"):
+            # Detect stress indicators
+            stress_signals = self._detect_stress_signals(performance_records, student_id)
+            signals.extend(stress_signals)
+            
+            # Detect improvement streaks
+            improvement_signals = self._detect_improvement_signals(performance_records, student_id)
+            signals.extend(improvement_signals)
+            
+            # Detect consistency patterns
+            consistency_signals = self._detect_consistency_signals(db, student_id)
+            signals.extend(consistency_signals)
         
         return signals
 
@@ -191,6 +207,10 @@ class AnxietySignalsEngine:
             dates.append(record.date.toordinal())
             scores.append(record.score)
         
+        # Imported here: sklearn alone roughly doubles the API's import time
+        import numpy as np
+        from sklearn.linear_model import LinearRegression
+
         # Perform linear regression
         X = np.array(dates).reshape(-1, 1)
         y = np.array(scores)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import FileResponse
+from typing import Dict, List, Optional
+
+from monitoring.profiling import PROFILE_MODES, request_profiler
+
+router = APIRouter()
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints are only available when EXAM_ADMIN_TOKEN is set and sent as X-Admin-Token"""
+    if not request_profiler.authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@router.post("/admin/profiling/arm", dependencies=[Depends(require_admin)])
+def arm_profiler(requests: int = Query(1, ge=0, le=1000), mode: str = Query("sample")) -> Dict:
+    """
+    Profile the next `requests` requests. mode=sample writes collapsed stacks
+    for flamegraph tools, mode=cprofile writes a .pstats file. requests=0 disarms.
+    """
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=422, detail=f"mode must be one of {list(PROFILE_MODES)}")
+    return request_profiler.arm(requests, mode)
+
+@router.get("/admin/profiling/captures", dependencies=[Depends(require_admin)])
+def list_profile_captures() -> List[Dict]:
+    """
+    Summaries of captured requests (phase timings and file names), newest first
+    """
+    return request_profiler.captures()
+
+@router.get("/admin/profiling/captures/{file_name}", dependencies=[Depends(require_admin)])
+def download_profile_capture(file_name: str):
+    """
+    Download a capture file (.collapsed, .pstats or .json)
+    """
+    path = request_profiler.capture_file(file_name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Capture not found")
+    return FileResponse(path, filename=file_name)
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List
 
 from database.database import get_db
-from schemas.anxiety_signal import AnxietySignalResponse
+from schemas.anxiety_signal import AnxietySignalCreate, AnxietySignalResponse
 from database.models import AnxietySignal
 from anxiety_signals.engine import anxiety_signals_engine
+from monitoring.profiling import phase_timers
+from jobs.queue import job_queue, session_job
+from api.job_routes import job_accepted
+from events.broker import event_broker
 
 router = APIRouter()
 
@@ -17,23 +22,33 @@ def get_student_anxiety_signals(student_id: int, db: Session = Depends(get_db)):
     signals = db.query(AnxietySignal).filter(AnxietySignal.student_id == student_id).all()
     return signals
 
-@router.get("/confidence-score/{student_id}", response_model=float)
-def get_confidence_score(student_id: int, db: Session = Depends(get_db)):
+def record_confidence_score(db: Session, student_id: int) -> float:
     """
-    Calculate and return the current confidence score for a student
+    Current confidence score. A freshly computed score is saved as a
+    confidence signal and, when it moved, pushed to the student's open event
+    streams; cached reads save nothing.
     """
-    try:
-        confidence_score = anxiety_signals_engine.calculate_confidence_score(db, student_id)
-        
-        # Save this as an anxiety signal for tracking
-        from schemas.anxiety_signal import AnxietySignalCreate
-        signal = AnxietySignalCreate(
-            student_id=student_id,
-            signal_type="confidence",
-            value=confidence_score,
-            description=f"Current confidence score: {confidence_score}"
-        )
-        
+    confidence_score, cached = anxiety_signals_engine.cached_confidence_score(db, student_id)
+    if cached:
+        return confidence_score
+    
+    watched = event_broker.has_subscribers(student_id)
+    previous = None
+    if watched:
+        previous = db.query(AnxietySignal.value).filter(
+            AnxietySignal.student_id == student_id,
+            AnxietySignal.signal_type == "confidence"
+        ).order_by(AnxietySignal.id.desc()).limit(1).scalar()
+    
+    # Save this as an anxiety signal for tracking
+    signal = AnxietySignalCreate(
+        student_id=student_id,
+        signal_type="confidence",
+        value=confidence_score,
+        description=f"Current confidence score: {confidence_score}"
+    )
+    
+    with phase_timers.phase("anxiety_signals", "persist"):
         db_signal = AnxietySignal(
             student_id=signal.student_id,
             signal_type=signal.signal_type,
@@ -42,20 +57,28 @@ def get_confidence_score(student_id: int, db: Session = Depends(get_db)):
         )
         db.add(db_signal)
         db.commit()
-        
-        return confidence_score
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calculating confidence score: {str(e)}")
+    
+    if watched and previous != confidence_score:
+        event_broker.publish(student_id, "confidence", {"score": confidence_score, "previous": previous})
+    return confidence_score
 
-@router.post("/detect-anxiety-signals/{student_id}")
-def detect_anxiety_signals(student_id: int, db: Session = Depends(get_db)):
+@router.get("/confidence-score/{student_id}", response_model=float)
+def get_confidence_score(student_id: int, db: Session = Depends(get_db)):
     """
-    Detect and store anxiety signals based on recent performance
+    Return the current confidence score for a student. A freshly computed
+    score is also saved as a confidence signal; cached reads save nothing,
+    so the signal history records one entry per recomputation.
     """
     try:
-        signals = anxiety_signals_engine.detect_anxiety_signals(db, student_id)
-        
-        # Save detected signals to database
+        return record_confidence_score(db, student_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calculating confidence score: {str(e)}")
+
+def _detect_and_store_signals(db: Session, student_id: int) -> Dict:
+    signals = anxiety_signals_engine.detect_anxiety_signals(db, student_id)
+    
+    # Save detected signals to database
+    with phase_timers.phase("anxiety_signals", "persist"):
         for signal in signals:
             db_signal = AnxietySignal(
                 student_id=signal.student_id,
@@ -66,10 +89,33 @@ def detect_anxiety_signals(student_id: int, db: Session = Depends(get_db)):
             db.add(db_signal)
         
         db.commit()
-        
-        return {
-            "message": f"Detected {len(signals)} anxiety signals",
-            "signals": signals
-        }
+    
+    if signals:
+        event_broker.publish(student_id, "signals_detected", {
+            "count": len(signals), "signals": jsonable_encoder(signals)
+        })
+    return {
+        "message": f"Detected {len(signals)} anxiety signals",
+        "signals": signals
+    }
+
+@router.post("/detect-anxiety-signals/{student_id}")
+def detect_anxiety_signals(student_id: int, run_async: bool = Query(False, alias="async"),
+                           db: Session = Depends(get_db)):
+    """
+    Detect and store anxiety signals based on recent performance.
+    With async=true the work is queued and a job id is returned (202);
+    poll GET /jobs/{job_id} for the result.
+    """
+    if run_async:
+        return job_accepted(job_queue.enqueue("detect_anxiety_signals", {"student_id": student_id}))
+    try:
+        return _detect_and_store_signals(db, student_id)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error detecting anxiety signals: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error detecting anxiety signals: {str(e)}")
+
+job_queue.register(
+    "detect_anxiety_signals",
+    session_job(lambda db, payload: jsonable_encoder(_detect_and_store_signals(db, payload["student_id"]))),
+    priority=0, concurrency=2
+)
\ No newline at end of file
@@ -1,23 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database.database import get_db
-from schemas.encouragement import EncouragementResponse, EncouragementCreate
+from schemas.encouragement import (
+    EncouragementResponse, EncouragementCreate, EncouragementMarkViewed,
+    EncouragementMarkViewedResponse, UnreadCountResponse
+)
 from database.models import EncouragementMessage
 from encouragement.engine import encouragement_engine
+from monitoring.profiling import phase_timers
 
 router = APIRouter()
 
 @router.get("/encouragements/{student_id}", response_model=List[EncouragementResponse])
-def get_student_encouragements(student_id: int, db: Session = Depends(get_db)):
+def get_student_encouragements(student_id: int, limit: Optional[int] = Query(None, ge=1),
+                                db: Session = Depends(get_db)):
     """
-    Get all encouragement messages for a specific student
+    Get encouragement messages for a specific student, newest first
     """
-    encouragements = db.query(EncouragementMessage).filter(
+    query = db.query(EncouragementMessage).filter(
         EncouragementMessage.student_id == student_id
-    ).order_by(EncouragementMessage.created_at.desc()).all()
-    return encouragements
+    ).order_by(EncouragementMessage.created_at.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+@router.get("/encouragements/{student_id}/unread-count", response_model=UnreadCountResponse)
+def get_unread_encouragement_count(student_id: int, db: Session = Depends(get_db)):
+    """
+    Count a student's unviewed messages (answered from the (student_id, viewed) index)
+    """
+    unread = db.query(func.count(EncouragementMessage.id)).filter(
+        EncouragementMessage.student_id == student_id,
+        EncouragementMessage.viewed == False
+    ).scalar()
+    return UnreadCountResponse(student_id=student_id, unread=unread or 0)
 
 @router.post("/encouragements/generate/{student_id}", response_model=List[EncouragementResponse])
 def generate_encouragement_messages(student_id: int, db: Session = Depends(get_db)):
@@ -30,16 +49,17 @@ def generate_encouragement_messages(student_id: int, db: Session = Depends(get_d
         
         # Save the generated messages to the database
         created_messages = []
-        for msg_data in encouragement_data:
-            db_message = EncouragementMessage(
-                student_id=msg_data.student_id,
-                message=msg_data.message,
-                message_type=msg_data.message_type
-            )
-            db.add(db_message)
-            db.commit()
-            db.refresh(db_message)
-            created_messages.append(db_message)
+        with phase_timers.phase("encouragement", "persist"):
+            for msg_data in encouragement_data:
+                db_message = EncouragementMessage(
+                    student_id=msg_data.student_id,
+                    message=msg_data.message,
+                    message_type=msg_data.message_type
+                )
+                db.add(db_message)
+                db.commit()
+                db.refresh(db_message)
+                created_messages.append(db_message)
         
         return created_messages
     
@@ -61,8 +81,9 @@ def get_daily_encouragement(student_id: int, db: Session = Depends(get_db)):
             message=message,
             message_type="daily"
         )
-        db.add(db_message)
-        db.commit()
+        with phase_timers.phase("encouragement", "persist"):
+            db.add(db_message)
+            db.commit()
         
         return message
     except Exception as e:
@@ -73,14 +94,37 @@ def mark_encouragement_viewed(message_id: int, db: Session = Depends(get_db)):
     """
     Mark an encouragement message as viewed
     """
-    message = db.query(EncouragementMessage).filter(
+    updated = db.query(EncouragementMessage).filter(
         EncouragementMessage.id == message_id
-    ).first()
+    ).update({EncouragementMessage.viewed: True}, synchronize_session=False)
     
-    if not message:
+    if not updated:
         raise HTTPException(status_code=404, detail="Message not found")
     
-    message.viewed = True
     db.commit()
     
-    return {"message": "Message marked as viewed", "success": True}
\ No newline at end of file
+    return {"message": "Message marked as viewed", "success": True}
+
+@router.put("/encouragements/mark-viewed", response_model=EncouragementMarkViewedResponse)
+def mark_encouragements_viewed(selection: EncouragementMarkViewed, db: Session = Depends(get_db)):
+    """
+    Mark several of a student's messages as viewed with a single UPDATE:
+    either the listed ids or everything up to the up_to_id cursor
+    """
+    query = db.query(EncouragementMessage).filter(
+        EncouragementMessage.student_id == selection.student_id,
+        EncouragementMessage.viewed == False
+    )
+    if selection.message_ids is not None:
+        query = query.filter(EncouragementMessage.id.in_(selection.message_ids))
+    else:
+        query = query.filter(EncouragementMessage.id <= selection.up_to_id)
+    
+    try:
+        updated = query.update({EncouragementMessage.viewed: True}, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error marking messages as viewed: {str(e)}")
+    
+    return EncouragementMarkViewedResponse(updated=updated, success=True)
\ No newline at end of file
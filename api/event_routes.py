@@ -0,0 +1,39 @@
+from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+
+from database.database import SessionLocal
+from events.broker import event_broker, event_stream
+from api.anxiety_signal_routes import record_confidence_score
+
+router = APIRouter()
+
+@router.get("/students/{student_id}/events")
+async def stream_student_events(student_id: int, request: Request):
+    """
+    Server-Sent Events for one student: goals_completed, performance_record,
+    signals_detected and confidence (sent when the score changes). A
+    `dropped` event means the connection fell behind and missed events, so
+    the client should refetch rather than apply increments.
+    """
+    return StreamingResponse(
+        event_stream(event_broker, lambda: event_broker.subscribe(student_id), request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _refresh_confidence(student_id: int):
+    db = SessionLocal()
+    try:
+        record_confidence_score(db, student_id)
+    finally:
+        db.close()
+
+def refresh_watched_confidence(background_tasks: BackgroundTasks, *student_ids: int):
+    """
+    After a write that can move the confidence score, recompute it once the
+    response is sent - only for students with an open event stream - so
+    watchers get a `confidence` event without polling
+    """
+    for student_id in set(student_ids):
+        if event_broker.has_subscribers(student_id):
+            background_tasks.add_task(_refresh_confidence, student_id)
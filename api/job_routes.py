@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from datetime import datetime
+from typing import Optional
+
+from schemas.job import JobAccepted, JobResponse, JobStatus
+from jobs.queue import job_queue
+
+router = APIRouter()
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(value) if value is not None else None
+
+def job_accepted(job_id: int) -> JSONResponse:
+    """202 response for an endpoint called with async=true"""
+    accepted = JobAccepted(job_id=job_id, status=JobStatus.queued, status_url=f"/api/v1/jobs/{job_id}")
+    return JSONResponse(accepted.model_dump(mode="json"), status_code=202)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: int):
+    """
+    Status of a background job; result is set once it succeeded
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(
+        id=job["id"],
+        type=job["type"],
+        status=job["status"],
+        priority=job["priority"],
+        attempts=job["attempts"],
+        max_attempts=job["max_attempts"],
+        created_at=_timestamp(job["created_at"]),
+        started_at=_timestamp(job["started_at"]),
+        finished_at=_timestamp(job["finished_at"]),
+        result=job["result"],
+        error=job["error"]
+    )
@@ -1,46 +1,149 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Query
+from sqlalchemy import case, delete, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import datetime, date, timedelta, timezone
 
 from database.database import get_db
-from schemas.micro_goal import MicroGoalCreate, MicroGoalResponse
-from database.models import MicroGoal
+from schemas.micro_goal import MicroGoalCreate, MicroGoalResponse, BulkGoalCompletion, BulkGoalCompletionResponse
+from database.models import MicroGoal, DailyGoalSet
 from micro_goals.engine import micro_goal_engine
+from topic_scheduler.engine import topic_scheduler_engine
+from monitoring.profiling import phase_timers
+from cache.store import invalidate_students
+from jobs.queue import job_queue, session_job
+from api.job_routes import job_accepted
+from api.event_routes import refresh_watched_confidence
+from events.broker import event_broker
 
 router = APIRouter()
 
-@router.post("/micro-goals/generate", response_model=List[MicroGoalResponse])
-def generate_daily_micro_goals(student_id: int, db: Session = Depends(get_db)):
-    """
-    Generate 2-4 small, realistic daily goals for a student
-    based on their syllabus and performance history
-    """
+def _local_goal_date(utc_offset_minutes: int) -> date:
+    """Calendar day the student is currently in, given their UTC offset"""
+    return (datetime.utcnow() + timedelta(minutes=utc_offset_minutes)).date()
+
+def _goals_in_set(db: Session, goal_set_id: int) -> List[MicroGoal]:
+    return db.query(MicroGoal).filter(
+        MicroGoal.goal_set_id == goal_set_id
+    ).order_by(MicroGoal.id).all()
+
+def _completion_time(completed_at: Optional[datetime], now: datetime) -> datetime:
+    """Client timestamp as naive UTC, never in the future"""
+    if completed_at is None:
+        return now
+    if completed_at.tzinfo is not None:
+        completed_at = completed_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(completed_at, now)
+
+def _generate_goal_set(db: Session, student_id: int, goal_date: date, regenerate: bool,
+                       idempotency_key: Optional[str]) -> List[MicroGoal]:
+    goal_set = db.query(DailyGoalSet).filter(
+        DailyGoalSet.student_id == student_id,
+        DailyGoalSet.goal_date == goal_date
+    ).first()
+    
+    if goal_set is not None:
+        is_retry = idempotency_key is not None and goal_set.idempotency_key == idempotency_key
+        if not regenerate or is_retry:
+            return _goals_in_set(db, goal_set.id)
+    
     try:
-        # Generate micro goals using the engine
-        goals_data = micro_goal_engine.generate_daily_goals(db, student_id)
-        
-        # Save the generated goals to the database
-        created_goals = []
-        for goal_data in goals_data:
-            db_goal = MicroGoal(
-                student_id=goal_data.student_id,
-                topic_id=goal_data.topic_id,
-                goal_text=goal_data.goal_text,
-                estimated_time=goal_data.estimated_time,
-                priority=goal_data.priority
+        if goal_set is None:
+            goal_set = DailyGoalSet(
+                student_id=student_id,
+                goal_date=goal_date,
+                idempotency_key=idempotency_key,
+                generation=0
             )
-            db.add(db_goal)
+            db.add(goal_set)
+            db.flush()
+        else:
+            # Regenerating keeps what the student already finished today
+            db.query(MicroGoal).filter(
+                MicroGoal.goal_set_id == goal_set.id,
+                MicroGoal.completed == False
+            ).delete(synchronize_session=False)
+            goal_set.idempotency_key = idempotency_key
+            goal_set.generation = (goal_set.generation or 0) + 1
+            goal_set.generated_at = datetime.utcnow()
+        
+        # Generate micro goals using the engine (seeded by the student's day and re-roll count)
+        goals_data = micro_goal_engine.generate_daily_goals(
+            db, student_id, day=goal_date, variant=goal_set.generation
+        )
+        
+        # Save the generated goals in a single transaction
+        with phase_timers.phase("micro_goals", "persist"):
+            for goal_data in goals_data:
+                db.add(MicroGoal(
+                    student_id=goal_data.student_id,
+                    topic_id=goal_data.topic_id,
+                    goal_text=goal_data.goal_text,
+                    estimated_time=goal_data.estimated_time,
+                    priority=goal_data.priority,
+                    goal_set_id=goal_set.id
+                ))
             db.commit()
-            db.refresh(db_goal)
-            created_goals.append(db_goal)
+        invalidate_students(student_id)
         
-        return created_goals
+        return _goals_in_set(db, goal_set.id)
     
+    except IntegrityError:
+        # A concurrent request created today's set first - return that one
+        db.rollback()
+        existing = db.query(DailyGoalSet).filter(
+            DailyGoalSet.student_id == student_id,
+            DailyGoalSet.goal_date == goal_date
+        ).first()
+        if existing is None:
+            raise RuntimeError("conflicting goal set")
+        return _goals_in_set(db, existing.id)
+
+@router.post("/micro-goals/generate", response_model=List[MicroGoalResponse])
+def generate_daily_micro_goals(
+    student_id: int,
+    regenerate: bool = False,
+    utc_offset_minutes: int = Query(0, ge=-720, le=840),
+    run_async: bool = Query(False, alias="async"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db)
+):
+    """
+    Generate 2-4 small, realistic daily goals for a student
+    based on their syllabus and performance history.
+    
+    Goals are generated at most once per (student, local day): repeated calls
+    return the existing set unless regenerate=true. A retried request carrying
+    the same Idempotency-Key as the one that produced the current set always
+    gets that set back, even with regenerate=true.
+    
+    With async=true the work is queued and a job id is returned (202); the
+    job's result is the goal list. The local day is fixed when the job is queued.
+    """
+    goal_date = _local_goal_date(utc_offset_minutes)
+    
+    if run_async:
+        return job_accepted(job_queue.enqueue("generate_micro_goals", {
+            "student_id": student_id,
+            "goal_date": goal_date.isoformat(),
+            "regenerate": regenerate,
+            "idempotency_key": idempotency_key
+        }))
+    try:
+        return _generate_goal_set(db, student_id, goal_date, regenerate, idempotency_key)
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error generating micro goals: {str(e)}")
 
+def _generate_goals_job(db: Session, payload: Dict) -> List[Dict]:
+    goals = _generate_goal_set(db, payload["student_id"], date.fromisoformat(payload["goal_date"]),
+                               payload["regenerate"], payload["idempotency_key"])
+    return [MicroGoalResponse.model_validate(goal).model_dump(mode="json") for goal in goals]
+
+# Students wait on this one, so it goes ahead of signal detection
+job_queue.register("generate_micro_goals", session_job(_generate_goals_job), priority=10, concurrency=4)
+
 @router.get("/micro-goals/{student_id}", response_model=List[MicroGoalResponse])
 def get_student_micro_goals(student_id: int, db: Session = Depends(get_db)):
     """
@@ -65,6 +168,7 @@ def create_micro_goal(goal: MicroGoalCreate, db: Session = Depends(get_db)):
         )
         db.add(db_goal)
         db.commit()
+        invalidate_students(goal.student_id)
         db.refresh(db_goal)
         
         return db_goal
@@ -73,30 +177,113 @@ def create_micro_goal(goal: MicroGoalCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error creating micro goal: {str(e)}")
 
 @router.put("/micro-goals/{goal_id}/complete")
-def mark_goal_complete(goal_id: int, db: Session = Depends(get_db)):
+def mark_goal_complete(goal_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
-    Mark a micro goal as completed
+    Mark a micro goal as completed.
+    One UPDATE ... RETURNING for an open goal; a goal that is already
+    completed matches nothing, so a double-submitted request is detected
+    with a primary-key lookup and changes nothing.
     """
-    goal = db.query(MicroGoal).filter(MicroGoal.id == goal_id).first()
-    if not goal:
-        raise HTTPException(status_code=404, detail="Goal not found")
+    now = datetime.utcnow()
+    try:
+        row = db.execute(
+            update(MicroGoal).where(MicroGoal.id == goal_id, MicroGoal.completed == False).values(
+                completed=True,
+                completed_at=now
+            ).returning(MicroGoal.student_id, MicroGoal.topic_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        already_completed = row is None
+        if already_completed and db.query(MicroGoal.id).filter(MicroGoal.id == goal_id).first() is None:
+            raise HTTPException(status_code=404, detail="Goal not found")
+        
+        if not already_completed:
+            topic_scheduler_engine.record_goal_completions(db, row.student_id, [(row.topic_id, now)])
+        db.commit()
+        if not already_completed:
+            invalidate_students(row.student_id)
+            event_broker.publish(row.student_id, "goals_completed", {"goal_ids": [goal_id]})
+            refresh_watched_confidence(background_tasks, row.student_id)
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error completing micro goal: {str(e)}")
     
-    goal.completed = True
-    goal.completed_at = datetime.utcnow()
-    db.commit()
+    message = "Goal was already completed" if already_completed else "Goal marked as completed"
+    return {"message": message, "success": True, "already_completed": already_completed}
+
+@router.post("/micro-goals/complete", response_model=BulkGoalCompletionResponse)
+def mark_goals_complete(batch: BulkGoalCompletion, background_tasks: BackgroundTasks,
+                        db: Session = Depends(get_db)):
+    """
+    Complete many of a student's goals at once, e.g. when an offline client syncs.
+    All still-open goals are updated by one UPDATE ... RETURNING with each goal's
+    own completion time; schedule updates happen in the same transaction.
+    """
+    now = datetime.utcnow()
+    completed_times = {}
+    for completion in batch.completions:
+        completed_times[completion.goal_id] = _completion_time(completion.completed_at, now)
+    if not completed_times:
+        return BulkGoalCompletionResponse(completed=[], already_completed=[], not_found=[])
     
-    return {"message": "Goal marked as completed", "success": True}
+    goal_ids = list(completed_times)
+    try:
+        rows = db.execute(
+            update(MicroGoal).where(
+                MicroGoal.id.in_(goal_ids),
+                MicroGoal.student_id == batch.student_id,
+                MicroGoal.completed == False
+            ).values(
+                completed=True,
+                completed_at=case(completed_times, value=MicroGoal.id, else_=now)
+            ).returning(MicroGoal.id, MicroGoal.topic_id, MicroGoal.completed_at)
+            .execution_options(synchronize_session=False)
+        ).all()
+        
+        topic_scheduler_engine.record_goal_completions(
+            db, batch.student_id, [(row.topic_id, row.completed_at) for row in rows]
+        )
+        
+        completed = {row.id for row in rows}
+        skipped = [goal_id for goal_id in goal_ids if goal_id not in completed]
+        existing = set()
+        if skipped:
+            existing = {goal_id for (goal_id,) in db.query(MicroGoal.id).filter(
+                MicroGoal.id.in_(skipped),
+                MicroGoal.student_id == batch.student_id
+            )}
+        db.commit()
+        if rows:
+            invalidate_students(batch.student_id)
+            event_broker.publish(batch.student_id, "goals_completed", {"goal_ids": sorted(row.id for row in rows)})
+            refresh_watched_confidence(background_tasks, batch.student_id)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error completing micro goals: {str(e)}")
+    
+    return BulkGoalCompletionResponse(
+        completed=[goal_id for goal_id in goal_ids if goal_id in completed],
+        already_completed=[goal_id for goal_id in skipped if goal_id in existing],
+        not_found=[goal_id for goal_id in skipped if goal_id not in existing]
+    )
 
 @router.delete("/micro-goals/{goal_id}")
 def delete_micro_goal(goal_id: int, db: Session = Depends(get_db)):
     """
-    Delete a micro goal
+    Delete a micro goal with a single DELETE
     """
-    goal = db.query(MicroGoal).filter(MicroGoal.id == goal_id).first()
-    if not goal:
+    row = db.execute(
+        delete(MicroGoal).where(MicroGoal.id == goal_id).returning(MicroGoal.student_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Goal not found")
     
-    db.delete(goal)
     db.commit()
+    invalidate_students(row.student_id)
     
     return {"message": "Goal deleted successfully", "success": True}
\ No newline at end of file
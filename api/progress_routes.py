@@ -15,7 +15,7 @@ def get_student_progress(student_id: int, db: Session = Depends(get_db)):
     """
     try:
         # Get confidence score
-        confidence_score = anxiety_signals_engine.calculate_confidence_score(db, student_id)
+        confidence_score, _ = anxiety_signals_engine.cached_confidence_score(db, student_id)
         
         # Calculate consistency days (days active in last 30 days)
         consistency_days = 0  # Placeholder - would implement proper calculation
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 
 from database.database import get_db
-from schemas.student import StudentCreate, StudentResponse
+from schemas.student import StudentCreate, StudentResponse, SyllabusEnrollmentCreate, SyllabusEnrollmentResponse
 from schemas.performance import PerformanceRecordCreate, PerformanceRecordResponse
-from database.models import Student, PerformanceRecord
+from schemas.topic import TopicResponse
+from database.models import Student, PerformanceRecord, StudentSyllabus, Topic
+from micro_goals.engine import micro_goal_engine
+from topic_scheduler.engine import topic_scheduler_engine
+from cache.store import invalidate_students
+from events.broker import event_broker
+from api.event_routes import refresh_watched_confidence
 
 router = APIRouter()
 
@@ -25,7 +33,8 @@ def create_student(student: StudentCreate, db: Session = Depends(get_db)):
             name=student.name,
             email=student.email,
             grade=student.grade,
-            exam_type=student.exam_type
+            exam_type=student.exam_type,
+            daily_study_minutes=student.daily_study_minutes
         )
         
         db.add(db_student)
@@ -58,9 +67,73 @@ def get_students(skip: int = 0, limit: int = 100, db: Session = Depends(get_db))
     students = db.query(Student).offset(skip).limit(limit).all()
     return students
 
+@router.post("/students/{student_id}/syllabi", response_model=SyllabusEnrollmentResponse)
+def enroll_student_in_syllabus(
+    student_id: int,
+    enrollment: SyllabusEnrollmentCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Enroll a student in a syllabus so its topics are used for their goals.
+    A syllabus exists once it has topics; enrolling twice is a conflict.
+    """
+    if db.query(Student.id).filter(Student.id == student_id).first() is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    if db.query(Topic.id).filter(Topic.syllabus_id == enrollment.syllabus_id).first() is None:
+        raise HTTPException(status_code=404, detail="Syllabus not found")
+    
+    try:
+        db_enrollment = StudentSyllabus(
+            student_id=student_id,
+            syllabus_id=enrollment.syllabus_id
+        )
+        db.add(db_enrollment)
+        db.commit()
+        db.refresh(db_enrollment)
+        
+        return db_enrollment
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Student is already enrolled in this syllabus")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error enrolling student: {str(e)}")
+
+@router.get("/students/{student_id}/syllabi", response_model=List[SyllabusEnrollmentResponse])
+def get_student_syllabi(student_id: int, db: Session = Depends(get_db)):
+    """
+    Get the syllabi a student is enrolled in
+    """
+    return db.query(StudentSyllabus).filter(StudentSyllabus.student_id == student_id).all()
+
+@router.delete("/students/{student_id}/syllabi/{syllabus_id}")
+def unenroll_student_from_syllabus(student_id: int, syllabus_id: int, db: Session = Depends(get_db)):
+    """
+    Remove a student's enrollment in a syllabus
+    """
+    deleted = db.query(StudentSyllabus).filter(
+        StudentSyllabus.student_id == student_id,
+        StudentSyllabus.syllabus_id == syllabus_id
+    ).delete(synchronize_session=False)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Enrollment not found")
+    
+    db.commit()
+    
+    return {"message": "Enrollment removed successfully", "success": True}
+
+@router.get("/students/{student_id}/topics", response_model=List[TopicResponse])
+def get_student_topics(student_id: int, db: Session = Depends(get_db)):
+    """
+    Get the topic catalog for a student's enrolled syllabi (every topic while
+    they have no enrollments), the same topics their daily goals draw on
+    """
+    return micro_goal_engine.student_topics(db, student_id)
+
 @router.post("/performance-records", response_model=PerformanceRecordResponse)
 def create_performance_record(
     performance_record: PerformanceRecordCreate, 
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -77,10 +150,20 @@ def create_performance_record(
         )
         
         db.add(db_record)
+        
+        # Reschedule the topic in the same transaction as the record
+        topic_scheduler_engine.record_review(
+            db, performance_record.student_id, performance_record.topic_id, performance_record.score
+        )
+        
         db.commit()
+        invalidate_students(performance_record.student_id)
         db.refresh(db_record)
         
-        return db_record
+        response = PerformanceRecordResponse.model_validate(db_record)
+        event_broker.publish(response.student_id, "performance_record", jsonable_encoder(response))
+        refresh_watched_confidence(background_tasks, response.student_id)
+        return response
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating performance record: {str(e)}")
@@ -0,0 +1,208 @@
+"""
+Benchmark suite entry point.
+
+    python -m benchmarks run --size 1k --output results.json
+    python -m benchmarks compare benchmarks/baseline.json results.json
+    python -m benchmarks load --start-server --size 100k --rate 5 10 20 40
+    python -m benchmarks replay trace.jsonl --start-server --snapshot snapshot.db --speed 10 --output new.json
+    python -m benchmarks imports --runs 10 --output imports.json
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.compare import compare_results, format_comparison
+from benchmarks.dataset import SIZES
+
+
+def _print_results(document):
+    results = document["results"]
+    width = max([len(name) for name in results] + [4])
+    print(f"{'case':<{width}}  {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10}")
+    for name, stats in results.items():
+        errors = f"  ({stats['errors']} errors)" if stats.get("errors") else ""
+        print(f"{name:<{width}}  {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f} "
+              f"{stats['throughput_per_s']:>10.1f}{errors}")
+
+
+def _load(args) -> int:
+    import asyncio
+    from contextlib import nullcontext
+
+    from benchmarks.dataset import dataset_shape, ensure_dataset
+    from benchmarks.loadtest import format_stage, local_server, max_sustainable, run_stage
+
+    if args.start_server:
+        students = args.students or dataset_shape(SIZES[args.size])["students"]
+        server = local_server(ensure_dataset(args.size, args.seed), args.port, args.workers)
+    else:
+        students = args.students or 5
+        server = nullcontext(args.base_url)
+
+    stages = []
+    with server as base_url:
+        for i, rate in enumerate(args.rate):
+            stage = asyncio.run(run_stage(base_url, rate, args.duration, students, args.topics,
+                                          args.seed + i, args.timeout, args.max_in_flight))
+            stages.append(stage)
+            print(format_stage(stage))
+
+    best = max_sustainable(stages, args.slo_p95_ms)
+    if best is None:
+        print(f"\nNo stage met render p95 <= {args.slo_p95_ms:.0f} ms with <= 1% errors")
+    else:
+        print(f"\nSustained {best:g} renders/s within the SLO "
+              f"(~{best * args.think_time:.0f} active students at one render every {args.think_time:g}s)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"base_url": args.base_url if not args.start_server else "local", "size": args.size,
+                       "workers": args.workers, "stages": stages}, f, indent=2)
+    return 0
+
+
+def _replay(args) -> int:
+    import asyncio
+    from contextlib import nullcontext
+
+    from benchmarks.loadtest import local_server
+    from benchmarks.replay import StudentMapper, load_trace, replay, replay_document
+
+    if args.snapshot:
+        mapper = StudentMapper.from_snapshot(args.snapshot, args.salt)
+    elif args.students:
+        mapper = StudentMapper(list(range(1, args.students + 1)), args.salt)
+    else:
+        print("Pass --snapshot or --students so captured students can be mapped", file=sys.stderr)
+        return 2
+    if args.start_server and not args.snapshot:
+        print("--start-server needs --snapshot", file=sys.stderr)
+        return 2
+
+    records = load_trace(args.trace)
+    server = (local_server(args.snapshot, args.port, args.workers, app_dir=args.app_dir)
+              if args.start_server else nullcontext(args.base_url))
+    with server as base_url:
+        report = asyncio.run(replay(base_url, records, mapper, args.speed, args.seed, args.timeout,
+                                    args.max_in_flight))
+
+    target = args.app_dir or ("local" if args.start_server else args.base_url)
+    document = replay_document(report, records, args.trace, args.speed, target)
+    _print_results(document)
+    print(f"\n{len(records)} requests replayed in {report['seconds']}s at {args.speed:g}x, "
+          f"error rate {report['error_rate']:.2%}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time engines and routes on a synthetic dataset")
+    run.add_argument("--size", choices=sorted(SIZES), default="1k")
+    run.add_argument("--iterations", type=int, default=200)
+    run.add_argument("--warmup", type=int, default=20)
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--only", action="append", help="substring of case names to run (repeatable)")
+    run.add_argument("--no-engines", action="store_true")
+    run.add_argument("--no-routes", action="store_true")
+    run.add_argument("--output", help="write the JSON results here")
+
+    compare = commands.add_parser("compare", help="flag regressions against a baseline run")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts (default 0.10)")
+    compare.add_argument("--min-delta-ms", type=float, default=0.05)
+    compare.add_argument("--metrics", nargs="+", default=["p50_ms", "p95_ms"],
+                         choices=["mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+
+    replay = commands.add_parser("replay", help="replay a captured traffic trace against a snapshot database")
+    replay.add_argument("trace", help="file written with EXAM_TRAFFIC_CAPTURE")
+    replay.add_argument("--snapshot", help="SQLite snapshot to serve (with --start-server) and map students onto")
+    replay.add_argument("--base-url", default="http://127.0.0.1:8000")
+    replay.add_argument("--start-server", action="store_true", help="launch a local uvicorn on a copy of --snapshot")
+    replay.add_argument("--app-dir", help="checkout to serve with --start-server (default: this one)")
+    replay.add_argument("--workers", type=int, default=1)
+    replay.add_argument("--port", type=int, default=8765)
+    replay.add_argument("--speed", type=float, default=1.0, help="time compression factor, e.g. 10 for 10x")
+    replay.add_argument("--salt", help="EXAM_TRAFFIC_SALT used for the capture, to map students exactly")
+    replay.add_argument("--students", type=int, help="without --snapshot, map onto student ids 1..N")
+    replay.add_argument("--timeout", type=float, default=30.0)
+    replay.add_argument("--max-in-flight", type=int, default=1000)
+    replay.add_argument("--seed", type=int, default=42)
+    replay.add_argument("--output", help="write the JSON results here")
+
+    imports = commands.add_parser("imports", help="cold `import main` time, per directly imported module")
+    imports.add_argument("--module", default="main")
+    imports.add_argument("--runs", type=int, default=5)
+    imports.add_argument("--output", help="write the JSON results here")
+
+    load = commands.add_parser("load", help="open-loop dashboard traffic against a running API")
+    load.add_argument("--base-url", default="http://127.0.0.1:8000")
+    load.add_argument("--start-server", action="store_true",
+                      help="launch a local uvicorn on a copy of the --size dataset instead of using --base-url")
+    load.add_argument("--size", choices=sorted(SIZES), default="1k")
+    load.add_argument("--workers", type=int, default=1)
+    load.add_argument("--port", type=int, default=8765)
+    load.add_argument("--rate", type=float, nargs="+", default=[5.0], help="dashboard renders per second, one stage each")
+    load.add_argument("--duration", type=float, default=30.0, help="seconds per stage")
+    load.add_argument("--students", type=int, help="student ids to draw from (default: the dataset's count, or 5)")
+    load.add_argument("--topics", type=int, default=15)
+    load.add_argument("--timeout", type=float, default=30.0)
+    load.add_argument("--max-in-flight", type=int, default=1000)
+    load.add_argument("--slo-p95-ms", type=float, default=1000.0, help="render p95 a stage must stay under")
+    load.add_argument("--think-time", type=float, default=30.0,
+                      help="seconds between one student's renders, to translate rates into concurrent students")
+    load.add_argument("--seed", type=int, default=42)
+    load.add_argument("--output", help="write the JSON results here")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "load":
+        return _load(args)
+    if args.command == "replay":
+        return _replay(args)
+
+    if args.command == "imports":
+        from benchmarks.importtime import run_importtime
+
+        document = run_importtime(args.module, args.runs)
+        _print_results(document)
+        heavy = document["meta"]["heavy_modules_loaded"]
+        print(f"\nHeavy modules loaded at import: {', '.join(heavy) if heavy else 'none'}")
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(document, f, indent=2)
+        return 0
+
+    if args.command == "run":
+        from benchmarks.runner import run_benchmarks
+
+        document = run_benchmarks(
+            size=args.size, iterations=args.iterations, warmup=args.warmup, seed=args.seed,
+            engines=not args.no_engines, routes=not args.no_routes, selected=args.only
+        )
+        _print_results(document)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(document, f, indent=2)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    metrics = tuple(args.metrics)
+    rows = compare_results(baseline, current, args.threshold, args.min_delta_ms, metrics)
+    print(format_comparison(rows, metrics))
+    regressions = [row["case"] for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+from typing import Dict, List
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.10,
+                    min_delta_ms: float = 0.05, metrics=("p50_ms", "p95_ms")) -> List[Dict]:
+    """
+    One row per case present in both runs. A case regresses when any of
+    `metrics` grew by more than `threshold` (relative) and `min_delta_ms`
+    (absolute, so sub-microsecond noise on tiny cases is ignored).
+    """
+    rows = []
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        before, after = baseline["results"][name], current["results"][name]
+        row = {"case": name, "regressed": False}
+        for metric in metrics:
+            old, new = before[metric], after[metric]
+            change = (new - old) / old if old else 0.0
+            row[metric] = (old, new, round(change, 4))
+            if change > threshold and new - old > min_delta_ms:
+                row["regressed"] = True
+        rows.append(row)
+    return rows
+
+
+def format_comparison(rows: List[Dict], metrics=("p50_ms", "p95_ms")) -> str:
+    width = max([len(row["case"]) for row in rows] + [4])
+    header = f"{'case':<{width}}  " + "  ".join(f"{metric:>26}" for metric in metrics)
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        cells = []
+        for metric in metrics:
+            old, new, change = row[metric]
+            cells.append(f"{old:>9.3f} -> {new:>9.3f} {change:>+6.1%}")
+        flag = "  REGRESSION" if row["regressed"] else ""
+        lines.append(f"{row['case']:<{width}}  " + "  ".join(cells) + flag)
+    return "\n".join(lines)
@@ -0,0 +1,83 @@
+"""
+Deterministic synthetic databases for the benchmarks, built with the
+populate_sample_data generator.
+
+The same (size, seed, build date) always yields the same rows. Timestamps are
+laid out relative to the build day so the engines' 7/30-day windows see
+realistic activity; cached files are therefore keyed by date as well.
+"""
+import os
+import shutil
+from datetime import date, datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import create_engine
+
+from populate_sample_data import planned_counts, populate
+
+# Performance-record counts per named size
+SIZES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000
+}
+
+DATA_DIR = os.environ.get("EXAM_BENCH_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data"))
+
+SYLLABI = 4
+TOPICS_PER_SYLLABUS = 15
+RECORDS_PER_STUDENT = 100
+HISTORY_DAYS = 30
+GOALS_PER_RECORD = 0.2
+
+
+def dataset_shape(records: int) -> Dict[str, int]:
+    """Row counts derived from the number of performance records"""
+    students = max(10, records // RECORDS_PER_STUDENT)
+    sessions_per_day = records / students / HISTORY_DAYS
+    return {
+        "students": students,
+        "topics": SYLLABI * TOPICS_PER_SYLLABUS,
+        **planned_counts(students, HISTORY_DAYS, sessions_per_day, sessions_per_day * GOALS_PER_RECORD)
+    }
+
+
+def dataset_path(size: str, seed: int, today: date) -> str:
+    return os.path.join(DATA_DIR, f"bench-{size}-seed{seed}-{today.isoformat()}.db")
+
+
+def ensure_dataset(size: str, seed: int = 42, today: date = None) -> str:
+    """Path of the cached dataset, building it first if needed"""
+    today = today or datetime.utcnow().date()
+    path = dataset_path(size, seed, today)
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        partial = path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        build_dataset(partial, SIZES[size], seed, today)
+        os.replace(partial, path)
+    return path
+
+
+def copy_dataset(path: str, destination: str) -> str:
+    """Benchmarks that write get a private copy so the cached file stays pristine"""
+    shutil.copyfile(path, destination)
+    return destination
+
+
+def build_dataset(path: str, records: int, seed: int = 42, today: date = None) -> Dict[str, int]:
+    """Create the schema in a new SQLite file and fill it with seeded rows"""
+    today = today or datetime.utcnow().date()
+    shape = dataset_shape(records)
+    sessions_per_day = records / shape["students"] / HISTORY_DAYS
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        return populate(
+            engine, students=shape["students"], topics=shape["topics"], days=HISTORY_DAYS,
+            sessions_per_day=sessions_per_day, goals_per_day=sessions_per_day * GOALS_PER_RECORD,
+            topics_per_syllabus=TOPICS_PER_SYLLABUS, seed=seed,
+            now=datetime.combine(today, datetime.min.time()) + timedelta(hours=12)
+        )
+    finally:
+        engine.dispose()
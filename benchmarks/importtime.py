@@ -0,0 +1,97 @@
+"""
+Cold import time of the API, from `python -X importtime`.
+
+Each run imports `main` in a fresh interpreter and parses the importtime
+report on stderr. Results use the `benchmarks run` layout - one case for the
+whole import plus one per module `main` imports directly (cumulative time,
+including everything they pull in) - so two builds can be compared with
+`benchmarks compare`. The meta section lists which heavy libraries were
+loaded at import; the API is meant to load none of them.
+"""
+import os
+import platform
+import re
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.runner import _git_commit, summarize
+from utils.warmup import HEAVY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+def parse_importtime(report: str) -> List[Tuple[str, int, int, int]]:
+    """(module, depth, self_us, cumulative_us) per line of an importtime report"""
+    rows = []
+    for line in report.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, (len(indent) - 1) // 2, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_breakdown(rows: List[Tuple[str, int, int, int]], module: str) -> Dict[str, int]:
+    """Cumulative microseconds of `module` and of each module it imports directly"""
+    # importtime prints children before their parent, so walk backwards from the target
+    breakdown = {}
+    target_depth = None
+    for name, depth, _, cumulative in reversed(rows):
+        if target_depth is None:
+            if name == module:
+                target_depth = depth
+                breakdown[name] = cumulative
+            continue
+        if depth <= target_depth:
+            break
+        if depth == target_depth + 1:
+            breakdown[name] = cumulative
+    return breakdown
+
+
+def measure_import(module: str = "main", env: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, int], List[str]]:
+    """Import `module` in a fresh interpreter; returns its breakdown and the heavy modules it loaded"""
+    env = dict(os.environ, **(env or {}))
+    # Keep the run from touching a real database file
+    env.setdefault("EXAM_DATABASE_URL", "sqlite://")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    rows = parse_importtime(completed.stderr)
+    loaded = sorted({name for name, *_ in rows} & set(HEAVY_MODULES))
+    return import_breakdown(rows, module), loaded
+
+
+def run_importtime(module: str = "main", runs: int = 5) -> Dict:
+    """Import `module` `runs` times and return a results document"""
+    samples: Dict[str, List[int]] = {}
+    wall = 0.0
+    loaded: List[str] = []
+    for _ in range(runs):
+        breakdown, loaded = measure_import(module)
+        wall += breakdown.get(module, 0) / 1e6
+        for name, cumulative_us in breakdown.items():
+            samples.setdefault(f"import.{name}", []).append(cumulative_us * 1000)
+
+    # Slowest direct imports first; the whole-module case leads
+    total = samples.pop(f"import.{module}", [])
+    ordered = sorted(samples.items(), key=lambda item: -sorted(item[1])[len(item[1]) // 2])
+    results = {f"import.{module}": summarize(total, wall)} if total else {}
+    results.update((name, summarize(values, wall)) for name, values in ordered)
+    return {
+        "meta": {
+            "module": module,
+            "runs": runs,
+            "heavy_modules_loaded": loaded,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        },
+        "results": results
+    }
@@ -0,0 +1,240 @@
+"""
+Open-loop load generator that replays the dashboard's traffic.
+
+Each arrival is one render of dashboard/app.py for a random student: the
+requests the Streamlit script issues top to bottom (every tab runs on each
+render), plus the button/form actions a student sometimes triggers. Arrivals
+are a Poisson process at a fixed rate regardless of how fast the server
+answers, so an overloaded server shows up as growing latency and errors
+rather than as a politely slower client. Latency for a render is measured
+from its scheduled arrival time, which keeps client-side queueing visible.
+"""
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.runner import summarize
+
+API_PREFIX = "/api/v1"
+
+# Probability that a render includes each action
+ACTIONS = {
+    "generate_goals": 0.05,
+    "complete_goal": 0.15,
+    "log_performance": 0.20,
+    "daily_encouragement": 0.05
+}
+
+
+class LoadStats:
+    """Latency samples and outcomes for one stage, per request label"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.render_latencies = []
+        self.failed_renders = 0
+        self.dropped = 0
+
+    def record(self, label: str, elapsed_ns: int, status):
+        self.latencies[label].append(elapsed_ns)
+        self.statuses[label][status] += 1
+
+    def report(self, rate: float, wall_seconds: float) -> Dict:
+        endpoints = {}
+        total = errors = 0
+        for label, samples in sorted(self.latencies.items()):
+            statuses = self.statuses[label]
+            failed = sum(count for status, count in statuses.items() if not isinstance(status, int) or status >= 500)
+            endpoints[label] = summarize(samples, wall_seconds)
+            endpoints[label].update(errors=failed, statuses={str(status): count for status, count in statuses.items()})
+            total += len(samples)
+            errors += failed
+        renders = summarize(self.render_latencies, wall_seconds) if self.render_latencies else None
+        return {
+            "rate": rate,
+            "seconds": round(wall_seconds, 2),
+            "requests": total,
+            "throughput_per_s": round(total / wall_seconds, 2) if wall_seconds > 0 else None,
+            "error_rate": round((errors + self.dropped) / max(total + self.dropped, 1), 4),
+            "failed_renders": self.failed_renders,
+            "dropped_renders": self.dropped,
+            "renders": renders,
+            "endpoints": endpoints
+        }
+
+
+class RenderSession:
+    """Issues one render's requests and remembers whether any of them failed"""
+
+    def __init__(self, client: httpx.AsyncClient, stats: LoadStats):
+        self.client = client
+        self.stats = stats
+        self.failed = False
+
+    async def call(self, label: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter_ns()
+        try:
+            response = await self.client.request(method, API_PREFIX + path, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(label, time.perf_counter_ns() - started, type(e).__name__)
+            self.failed = True
+            return None
+        self.stats.record(label, time.perf_counter_ns() - started, response.status_code)
+        if response.status_code >= 500:
+            self.failed = True
+        return response
+
+
+async def render_dashboard(session: RenderSession, student_id: int, actions: Dict[str, bool],
+                           topics: int, rng: np.random.Generator):
+    """The requests one dashboard render issues, in script order"""
+    sid = student_id
+    call = session.call
+    await call("GET /encouragements/{id}/unread-count", "GET", f"/encouragements/{sid}/unread-count")
+
+    # Daily Goals tab
+    if actions["generate_goals"]:
+        await call("POST /micro-goals/generate", "POST", "/micro-goals/generate",
+                   params={"student_id": sid, "utc_offset_minutes": 0})
+    response = await call("GET /micro-goals/{id}", "GET", f"/micro-goals/{sid}")
+    if actions["complete_goal"] and response is not None and response.status_code == 200:
+        pending = [goal["id"] for goal in response.json() if not goal["completed"]]
+        if pending:
+            await call("PUT /micro-goals/{id}/complete", "PUT", f"/micro-goals/{pending[0]}/complete")
+    if actions["log_performance"]:
+        await call("POST /performance-records", "POST", "/performance-records", json={
+            "student_id": sid, "topic_id": int(rng.integers(1, topics + 1)), "score": float(rng.integers(30, 100)),
+            "time_spent": int(rng.integers(10, 60)), "mistakes": None, "completed": True
+        })
+
+    # Progress tab
+    await call("GET /confidence-score/{id}", "GET", f"/confidence-score/{sid}")
+    await call("GET /anxiety-signals/{id}", "GET", f"/anxiety-signals/{sid}")
+
+    # Encouragement tab
+    if actions["daily_encouragement"]:
+        await call("POST /encouragements/daily/{id}", "POST", f"/encouragements/daily/{sid}")
+    await call("GET /encouragements/{id}", "GET", f"/encouragements/{sid}", params={"limit": 5})
+
+    # Analytics tab
+    await call("GET /micro-goals/{id}", "GET", f"/micro-goals/{sid}")
+    await call("GET /performance-records/{id}", "GET", f"/performance-records/{sid}")
+    await call("GET /confidence-score/{id}", "GET", f"/confidence-score/{sid}")
+
+
+async def run_stage(base_url: str, rate: float, duration: float, students: int, topics: int = 15,
+                    seed: int = 42, timeout: float = 30.0, max_in_flight: int = 1000,
+                    transport: Optional[httpx.AsyncBaseTransport] = None) -> Dict:
+    """
+    Offer `rate` renders per second for `duration` seconds and wait for them
+    to finish. Arrivals beyond `max_in_flight` concurrent renders are dropped
+    (and counted as errors) to keep the generator itself from collapsing.
+    """
+    rng = np.random.default_rng(seed)
+    stats = LoadStats()
+    loop = asyncio.get_running_loop()
+    in_flight = set()
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits, transport=transport) as client:
+        async def arrival(scheduled: float, student_id: int, actions: Dict[str, bool], action_rng):
+            session = RenderSession(client, stats)
+            await render_dashboard(session, student_id, actions, topics, action_rng)
+            stats.render_latencies.append(int((loop.time() - scheduled) * 1e9))
+            if session.failed:
+                stats.failed_renders += 1
+
+        started = loop.time()
+        scheduled = started
+        while True:
+            scheduled += rng.exponential(1.0 / rate)
+            if scheduled - started >= duration:
+                break
+            student_id = int(rng.integers(1, students + 1))
+            actions = {name: bool(rng.random() < p) for name, p in ACTIONS.items()}
+            action_rng = np.random.default_rng(rng.integers(2 ** 32))
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= max_in_flight:
+                stats.dropped += 1
+                continue
+            task = asyncio.ensure_future(arrival(scheduled, student_id, actions, action_rng))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.wait(list(in_flight))
+        wall_seconds = loop.time() - started
+
+    return stats.report(rate, wall_seconds)
+
+
+def max_sustainable(stages: List[Dict], slo_p95_ms: float, max_error_rate: float = 0.01) -> Optional[float]:
+    """Highest offered rate whose render p95 and error rate stayed within the SLO"""
+    passing = [stage["rate"] for stage in stages
+               if stage["renders"] and stage["renders"]["p95_ms"] <= slo_p95_ms and stage["error_rate"] <= max_error_rate]
+    return max(passing) if passing else None
+
+
+@contextmanager
+def local_server(dataset: Optional[str] = None, port: int = 8765, workers: int = 1, startup_timeout: float = 60.0,
+                 app_dir: Optional[str] = None):
+    """
+    Run `uvicorn main:app` in a scratch directory. The app opens
+    ./exam_anxiety.db relative to its working directory, so a copy of
+    `dataset` placed there becomes the server's database. `app_dir` serves
+    another checkout (e.g. the previous build) instead of this one.
+    """
+    root = os.path.abspath(app_dir) if app_dir else os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as workdir:
+        if dataset:
+            shutil.copyfile(dataset, os.path.join(workdir, "exam_anxiety.db"))
+        env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        if workers > 1 and env.get("EXAM_CACHE", "memory") == "memory":
+            # Workers must share one cache, as with `python main.py --workers N`
+            env["EXAM_CACHE"] = os.path.join(workdir, "exam_cache.db")
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning"],
+            cwd=workdir, env=env
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+                try:
+                    # /ready turns 200 once warmup is done; builds without it answer 404
+                    if httpx.get(base_url + "/ready", timeout=1.0).status_code in (200, 404):
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not become ready in time")
+                time.sleep(0.2)
+            yield base_url
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def format_stage(stage: Dict) -> str:
+    renders = stage["renders"] or {}
+    return (f"rate {stage['rate']:>7.1f}/s  throughput {stage['throughput_per_s'] or 0:>8.1f} req/s  "
+            f"render p50 {renders.get('p50_ms', 0):>8.1f}  p95 {renders.get('p95_ms', 0):>8.1f}  "
+            f"p99 {renders.get('p99_ms', 0):>8.1f} ms  errors {stage['error_rate']:.2%}")
@@ -0,0 +1,146 @@
+"""
+Replays a captured traffic trace (monitoring.traffic_capture) against a
+snapshot database, at the original pace or accelerated.
+
+Requests are issued open-loop at their captured offsets divided by the speed
+factor, so the trace's skew - a few very active students, morning spikes -
+reaches the server as it happened. Hashed student ids are mapped back onto
+the snapshot's students: exactly when the capture salt is supplied, otherwise
+by a stable hash-to-id assignment that keeps each captured student distinct
+(as far as the snapshot's cohort size allows) and preserves their activity.
+The results document has the same shape as `benchmarks run`, so two builds'
+replays can be compared with `benchmarks compare`.
+"""
+import asyncio
+import sqlite3
+import string
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.loadtest import LoadStats
+from benchmarks.runner import summarize
+from monitoring.traffic_capture import STUDENT_MARKER, TEXT_MARKER, hash_student_id, read_trace
+
+LETTERS = np.array(list(string.ascii_lowercase))
+
+
+def load_trace(path: str) -> List[Dict]:
+    return sorted(read_trace(path), key=lambda record: record["t"])
+
+
+class StudentMapper:
+    """Maps captured student pseudonyms onto student ids present in the snapshot"""
+
+    def __init__(self, student_ids: List[int], salt: Optional[str] = None):
+        self.student_ids = sorted(student_ids)
+        self.exact = {hash_student_id(sid, salt): sid for sid in self.student_ids} if salt is not None else {}
+
+    @classmethod
+    def from_snapshot(cls, path: str, salt: Optional[str] = None) -> "StudentMapper":
+        conn = sqlite3.connect(path)
+        try:
+            ids = [row[0] for row in conn.execute("SELECT id FROM students")]
+        finally:
+            conn.close()
+        return cls(ids, salt)
+
+    def __call__(self, pseudonym: str) -> int:
+        if pseudonym in self.exact:
+            return self.exact[pseudonym]
+        return self.student_ids[int(pseudonym[len(STUDENT_MARKER):], 16) % len(self.student_ids)]
+
+
+def _restore(value, mapper: StudentMapper, rng: np.random.Generator):
+    if isinstance(value, dict):
+        return {key: _restore(item, mapper, rng) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore(item, mapper, rng) for item in value]
+    if isinstance(value, str):
+        if value.startswith(STUDENT_MARKER):
+            return mapper(value)
+        if value.startswith(TEXT_MARKER):
+            # Random filler of the captured length (unique enough for e.g. emails)
+            return "".join(rng.choice(LETTERS, int(value[len(TEXT_MARKER):])))
+    return value
+
+
+def materialize(record: Dict, mapper: StudentMapper, rng: np.random.Generator) -> Dict:
+    """Method, concrete path, query params and JSON body for one trace record"""
+    path_params = _restore(record.get("p", {}), mapper, rng)
+    request = {
+        "method": record["m"],
+        "url": record["r"].format(**path_params),
+        "params": _restore(record.get("q"), mapper, rng)
+    }
+    if record.get("b") is not None:
+        request["json"] = _restore(record["b"], mapper, rng)
+    return request
+
+
+async def replay(base_url: str, records: List[Dict], mapper: StudentMapper, speed: float = 1.0,
+                 seed: int = 42, timeout: float = 30.0, max_in_flight: int = 1000,
+                 transport: Optional[httpx.AsyncBaseTransport] = None) -> Dict:
+    """Issue every record at its captured offset / speed and collect latencies per route"""
+    rng = np.random.default_rng(seed)
+    stats = LoadStats()
+    loop = asyncio.get_running_loop()
+    in_flight = set()
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    first = records[0]["t"] if records else 0.0
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits, transport=transport) as client:
+        async def send(label: str, request: Dict):
+            started = time.perf_counter_ns()
+            try:
+                response = await client.request(**request)
+            except httpx.HTTPError as e:
+                stats.record(label, time.perf_counter_ns() - started, type(e).__name__)
+                return
+            stats.record(label, time.perf_counter_ns() - started, response.status_code)
+
+        started = loop.time()
+        for record in records:
+            delay = started + (record["t"] - first) / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= max_in_flight:
+                stats.dropped += 1
+                continue
+            label = f"{record['m']} {record['r']}"
+            task = asyncio.ensure_future(send(label, materialize(record, mapper, rng)))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.wait(list(in_flight))
+        wall_seconds = loop.time() - started
+
+    captured_span = (records[-1]["t"] - first) if records else 0.0
+    return stats.report(rate=len(records) / max(captured_span / speed, 1e-9), wall_seconds=wall_seconds)
+
+
+def replay_document(report: Dict, records: List[Dict], trace: str, speed: float, target: str) -> Dict:
+    """Replay results in the `benchmarks run` layout, with the captured latencies alongside"""
+    captured = {}
+    by_route: Dict[str, List[int]] = {}
+    for record in records:
+        by_route.setdefault(f"{record['m']} {record['r']}", []).append(int(record["ms"] * 1e6))
+    span = (records[-1]["t"] - records[0]["t"]) if records else 0.0
+    for label, samples in by_route.items():
+        captured[label] = summarize(samples, max(span, 1e-9))
+    return {
+        "meta": {
+            "trace": trace,
+            "records": len(records),
+            "speed": speed,
+            "target": target,
+            "captured_seconds": round(span, 2),
+            "replay_seconds": report["seconds"],
+            "error_rate": report["error_rate"],
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        },
+        "results": report["endpoints"],
+        "captured": captured
+    }
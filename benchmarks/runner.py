@@ -0,0 +1,204 @@
+"""
+Times every engine entry point and API route against a synthetic dataset.
+
+Engine cases call the engines directly with a session on the dataset; route
+cases go through the full ASGI app (middleware, validation, serialization)
+with an in-process httpx client, so no server or network is involved. Route
+cases invalidate the student's cached values before each request, so every
+sample is a cold (cache-miss) call.
+"""
+import asyncio
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.dataset import SIZES, copy_dataset, dataset_shape, ensure_dataset
+from database.database import build_engine
+
+EngineCase = Callable[[Session, int], object]
+
+
+def _engine_cases() -> Dict[str, EngineCase]:
+    from anxiety_signals.engine import anxiety_signals_engine
+    from encouragement.engine import encouragement_engine
+    from micro_goals.engine import micro_goal_engine
+    from topic_scheduler.engine import topic_scheduler_engine
+
+    return {
+        "engine.micro_goals.generate_daily_goals":
+            lambda db, student_id: micro_goal_engine.generate_daily_goals(db, student_id),
+        "engine.anxiety_signals.calculate_confidence_score":
+            lambda db, student_id: anxiety_signals_engine.calculate_confidence_score(db, student_id),
+        "engine.anxiety_signals.detect_anxiety_signals":
+            lambda db, student_id: anxiety_signals_engine.detect_anxiety_signals(db, student_id),
+        "engine.encouragement.generate_daily_encouragement":
+            lambda db, student_id: encouragement_engine.generate_daily_encouragement(db, student_id),
+        "engine.encouragement.generate_personalized_encouragement":
+            lambda db, student_id: encouragement_engine.generate_personalized_encouragement(db, student_id),
+        "engine.topic_scheduler.due_topics":
+            lambda db, student_id: topic_scheduler_engine.due_topics(db, student_id, 4)
+    }
+
+
+# (name, method, path, query params, JSON body); {student_id} is filled in per call
+ROUTE_CASES: List[Tuple[str, str, str, Optional[dict], Optional[dict]]] = [
+    ("route.GET /micro-goals/{student_id}", "GET", "/api/v1/micro-goals/{student_id}", None, None),
+    ("route.POST /micro-goals/generate", "POST", "/api/v1/micro-goals/generate", {"student_id": "{student_id}"}, None),
+    ("route.GET /confidence-score/{student_id}", "GET", "/api/v1/confidence-score/{student_id}", None, None),
+    ("route.GET /progress/{student_id}", "GET", "/api/v1/progress/{student_id}", None, None),
+    ("route.GET /anxiety-signals/{student_id}", "GET", "/api/v1/anxiety-signals/{student_id}", None, None),
+    ("route.POST /detect-anxiety-signals/{student_id}", "POST", "/api/v1/detect-anxiety-signals/{student_id}", None, None),
+    ("route.GET /encouragements/{student_id}", "GET", "/api/v1/encouragements/{student_id}", None, None),
+    ("route.GET /encouragements/{student_id}/unread-count", "GET", "/api/v1/encouragements/{student_id}/unread-count", None, None),
+    ("route.POST /encouragements/daily/{student_id}", "POST", "/api/v1/encouragements/daily/{student_id}", None, None),
+    ("route.POST /encouragements/generate/{student_id}", "POST", "/api/v1/encouragements/generate/{student_id}", None, None),
+    ("route.GET /performance-records/{student_id}", "GET", "/api/v1/performance-records/{student_id}", None, None),
+    ("route.POST /performance-records", "POST", "/api/v1/performance-records", None,
+     {"student_id": "{student_id}", "topic_id": 1, "score": 72.5, "time_spent": 25})
+]
+
+
+def summarize(samples_ns: List[int], wall_seconds: float) -> Dict[str, float]:
+    """Latency percentiles (ms) and throughput for one case"""
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "n": int(samples.size),
+        "mean_ms": round(float(samples.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(samples.max()), 4),
+        "throughput_per_s": round(samples.size / wall_seconds, 2) if wall_seconds > 0 else None
+    }
+
+
+def _fill(value, student_id: int):
+    if isinstance(value, dict):
+        return {key: _fill(item, student_id) for key, item in value.items()}
+    if value == "{student_id}":
+        return student_id
+    return value
+
+
+def run_engine_cases(session_factory, student_ids: np.ndarray, warmup: int,
+                     selected: Optional[List[str]] = None) -> Dict[str, Dict]:
+    results = {}
+    for name, case in _engine_cases().items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        samples = []
+        wall_started = time.perf_counter()
+        for i, student_id in enumerate(student_ids):
+            db = session_factory()
+            try:
+                started = time.perf_counter_ns()
+                case(db, int(student_id))
+                elapsed = time.perf_counter_ns() - started
+                db.rollback()
+            finally:
+                db.close()
+            if i >= warmup:
+                samples.append(elapsed)
+        results[name] = summarize(samples, time.perf_counter() - wall_started)
+    return results
+
+
+async def _run_route_cases(app, student_ids: np.ndarray, warmup: int,
+                           selected: Optional[List[str]] = None) -> Dict[str, Dict]:
+    from cache.store import invalidate_students
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name, method, path, params, body in ROUTE_CASES:
+            if selected and not any(pattern in name for pattern in selected):
+                continue
+            samples, errors = [], 0
+            wall_started = time.perf_counter()
+            for i, student_id in enumerate(student_ids):
+                student_id = int(student_id)
+                invalidate_students(student_id)
+                started = time.perf_counter_ns()
+                response = await client.request(
+                    method, path.format(student_id=student_id),
+                    params=_fill(params, student_id), json=_fill(body, student_id)
+                )
+                elapsed = time.perf_counter_ns() - started
+                if response.status_code >= 400:
+                    errors += 1
+                if i >= warmup:
+                    samples.append(elapsed)
+            results[name] = summarize(samples, time.perf_counter() - wall_started)
+            results[name]["errors"] = errors
+    return results
+
+
+def run_route_cases(engine: Engine, student_ids: np.ndarray, warmup: int,
+                    selected: Optional[List[str]] = None) -> Dict[str, Dict]:
+    import main
+    from database import database
+
+    # Point the whole app (get_db and anything else using SessionLocal) at the dataset
+    previous = database.get_engine()
+    database.configure_engine(engine)
+    try:
+        return asyncio.run(_run_route_cases(main.app, student_ids, warmup, selected))
+    finally:
+        database.configure_engine(previous)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(size: str = "1k", iterations: int = 200, warmup: int = 20, seed: int = 42,
+                   engines: bool = True, routes: bool = True, selected: Optional[List[str]] = None) -> Dict:
+    """Run the suite on a private copy of the cached dataset and return the results document"""
+    dataset = ensure_dataset(size, seed)
+    shape = dataset_shape(SIZES[size])
+    student_ids = np.random.default_rng(seed).integers(1, shape["students"] + 1, iterations + warmup)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = copy_dataset(dataset, os.path.join(workdir, "bench.db"))
+        engine = build_engine(f"sqlite:///{path}")
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        results = {}
+        try:
+            if engines:
+                results.update(run_engine_cases(session_factory, student_ids, warmup, selected))
+            if routes:
+                results.update(run_route_cases(engine, student_ids, warmup, selected))
+        finally:
+            engine.dispose()
+
+    return {
+        "meta": {
+            "size": size,
+            "dataset": shape,
+            "seed": seed,
+            "iterations": iterations,
+            "warmup": warmup,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        },
+        "results": results
+    }
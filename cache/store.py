@@ -0,0 +1,271 @@
+"""
+Key-value cache with TTLs and generation counters, shared by API workers.
+
+Two backends with the same API:
+- MemoryCache: a dict in this process. Right for a single worker.
+- SQLiteCache: a WAL-mode SQLite file that every worker on the host opens, so
+  a value cached or invalidated by one worker is seen by all of them. No
+  external service is needed.
+
+Invalidation uses generation counters rather than deleting keys: callers put
+the generation of what a value depends on into its key (see
+`generation_key`), and `bump` moves the generation on atomically, so every
+worker stops reading the old entries at once. The old entries then expire
+through their TTL.
+
+Values are stored as JSON, so both backends hand back copies with the same
+types.
+
+Configuration (environment):
+- EXAM_CACHE: "memory" (default) or the path of a SQLite cache file. A
+  multi-worker launch (`python main.py --workers N`) uses a shared file
+  automatically.
+- EXAM_CACHE_TTL: default time-to-live in seconds (default 300).
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from monitoring.metrics import metrics_registry
+
+CACHE_URL = os.environ.get("EXAM_CACHE", "memory")
+CACHE_TTL = float(os.environ.get("EXAM_CACHE_TTL", "300"))
+
+# Cache file a multi-worker launch uses when EXAM_CACHE is left at "memory"
+SHARED_CACHE_PATH = "./exam_cache.db"
+
+# Expired rows are swept on every Nth write
+PURGE_EVERY = 1000
+
+_MISSING = object()
+
+
+class BaseCache(ABC):
+    """Shared bookkeeping; backends implement _get, _set, _delete, _incr, _generation and clear"""
+
+    backend = "base"
+
+    def __init__(self, default_ttl: float = CACHE_TTL):
+        self.default_ttl = default_ttl
+        self._counts = {"hit": 0, "miss": 0}
+        self._counts_lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        """Cached value for `key`, or `default` when missing or expired"""
+        raw = self._get(key, time.time())
+        with self._counts_lock:
+            self._counts["miss" if raw is None else "hit"] += 1
+        return default if raw is None else json.loads(raw)
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self._set(key, json.dumps(value, separators=(",", ":")), time.time() + ttl if ttl > 0 else None)
+
+    def delete(self, key: str):
+        self._delete(key)
+
+    def get_or_set(self, key: str, compute: Callable[[], object], ttl: Optional[float] = None) -> Tuple[object, bool]:
+        """(value, hit): the cached value, or compute() stored under `key`"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value, True
+        value = compute()
+        self.set(key, value, ttl)
+        return value, False
+
+    def generation(self, name: str) -> int:
+        """Current generation of `name` (0 until first bumped)"""
+        return self._generation(name)
+
+    def bump(self, name: str) -> int:
+        """Atomically advance the generation of `name`, invalidating keys built from the old one"""
+        return self._incr(name)
+
+    def generation_key(self, key: str, *names: str) -> str:
+        """`key` tagged with the current generation of each name it depends on"""
+        return key + "".join(f"|{name}@{self._generation(name)}" for name in names)
+
+    def stats(self) -> Dict:
+        with self._counts_lock:
+            return {"backend": self.backend, **self._counts}
+
+    def render_lines(self) -> List[str]:
+        stats = self.stats()
+        lines = ["# HELP cache_lookups_total Cache lookups by result", "# TYPE cache_lookups_total counter"]
+        for result in ("hit", "miss"):
+            lines.append(f'cache_lookups_total{{backend="{stats["backend"]}",result="{result}"}} {stats[result]}')
+        return lines
+
+    @abstractmethod
+    def _get(self, key: str, now: float) -> Optional[str]:
+        """Raw JSON stored under `key`, or None when missing or expired at `now`"""
+
+    @abstractmethod
+    def _set(self, key: str, raw: str, expires_at: Optional[float]):
+        """Store raw JSON under `key` until `expires_at` (None: no expiry)"""
+
+    @abstractmethod
+    def _delete(self, key: str):
+        """Remove `key` if present"""
+
+    @abstractmethod
+    def _generation(self, name: str) -> int:
+        """Current generation of `name`, 0 if never bumped"""
+
+    @abstractmethod
+    def _incr(self, name: str) -> int:
+        """Atomically add 1 to the generation of `name` and return the new value"""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry and generation"""
+
+    def close(self):
+        pass
+
+
+class MemoryCache(BaseCache):
+    """In-process backend; entries are only visible to this worker"""
+
+    backend = "memory"
+
+    def __init__(self, default_ttl: float = CACHE_TTL):
+        super().__init__(default_ttl)
+        self._entries: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _get(self, key: str, now: float) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= now):
+            return None
+        return entry[0]
+
+    def _set(self, key: str, raw: str, expires_at: Optional[float]):
+        with self._lock:
+            self._entries[key] = (raw, expires_at)
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                now = time.time()
+                self._entries = {k: e for k, e in self._entries.items() if e[1] is None or e[1] > now}
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _generation(self, name: str) -> int:
+        return self._generations.get(name, 0)
+
+    def _incr(self, name: str) -> int:
+        with self._lock:
+            value = self._generations[name] = self._generations.get(name, 0) + 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class SQLiteCache(BaseCache):
+    """
+    File-backed backend shared by every process that opens the same path.
+    Each thread (and each forked process) gets its own connection in
+    autocommit mode, so every statement is atomic on its own.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, default_ttl: float = CACHE_TTL, busy_timeout_ms: int = 5000):
+        super().__init__(default_ttl)
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._inherited: List[sqlite3.Connection] = []
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_generations (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            if conn is not None:
+                # Inherited across fork: never use it, and never close it either,
+                # as closing would drop the parent's file locks in SQLite's books
+                self._inherited.append(conn)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _get(self, key: str, now: float) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, now)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, raw: str, expires_at: Optional[float]):
+        conn = self._connection()
+        conn.execute("INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                     (key, raw, expires_at))
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+
+    def _delete(self, key: str):
+        self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def _generation(self, name: str) -> int:
+        row = self._connection().execute("SELECT value FROM cache_generations WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def _incr(self, name: str) -> int:
+        return self._connection().execute(
+            "INSERT INTO cache_generations (name, value) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1 RETURNING value", (name,)
+        ).fetchone()[0]
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_generations")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def build_cache(url: str = CACHE_URL, default_ttl: float = CACHE_TTL) -> BaseCache:
+    """MemoryCache for "memory", otherwise a SQLiteCache on the given file path"""
+    if url == "memory":
+        return MemoryCache(default_ttl)
+    return SQLiteCache(url, default_ttl)
+
+
+def student_scope(student_id: int) -> str:
+    """Generation name for everything derived from one student's records and goals"""
+    return f"student:{student_id}"
+
+
+def invalidate_students(*student_ids: int):
+    """Drop cached values derived from these students' data, in every worker"""
+    for student_id in set(student_ids):
+        shared_cache.bump(student_scope(student_id))
+
+
+# Process-wide cache (shared across workers when EXAM_CACHE is a file)
+shared_cache = build_cache()
+metrics_registry.register_collector(lambda: shared_cache.render_lines())
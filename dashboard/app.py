@@ -15,6 +15,9 @@ st.set_page_config(
 # API base URL
 API_BASE_URL = "http://localhost:8000/api/v1"
 
+# Local UTC offset so daily goals follow the student's calendar day
+UTC_OFFSET_MINUTES = int(datetime.now().astimezone().utcoffset().total_seconds() // 60)
+
 # Title
 st.title("🧠 AI-Driven Exam Anxiety Reduction Dashboard")
 
@@ -22,6 +25,14 @@ st.title("🧠 AI-Driven Exam Anxiety Reduction Dashboard")
 st.sidebar.header("Student Selection")
 student_id = st.sidebar.number_input("Enter Student ID", min_value=1, value=1, step=1)
 
+# Unread counter - a cheap poll instead of fetching the whole message list
+try:
+    unread_response = requests.get(f"{API_BASE_URL}/encouragements/{student_id}/unread-count")
+    if unread_response.status_code == 200:
+        st.sidebar.metric("🆕 Unread encouragements", unread_response.json()["unread"])
+except Exception:
+    pass
+
 # Tabs for different views
 tab1, tab2, tab3, tab4 = st.tabs(["🎯 Daily Goals", "📈 Progress", "😊 Encouragement", "📊 Analytics"])
 
@@ -31,7 +42,10 @@ with tab1:
     # Generate daily goals
     if st.button("Generate Daily Goals"):
         try:
-            response = requests.post(f"{API_BASE_URL}/micro-goals/generate?student_id={student_id}")
+            response = requests.post(
+                f"{API_BASE_URL}/micro-goals/generate",
+                params={"student_id": student_id, "utc_offset_minutes": UTC_OFFSET_MINUTES}
+            )
             if response.status_code == 200:
                 goals = response.json()
                 if goals:
@@ -213,14 +227,20 @@ with tab3:
     
     # Show all encouragements
     try:
-        response = requests.get(f"{API_BASE_URL}/encouragements/{student_id}")
+        response = requests.get(f"{API_BASE_URL}/encouragements/{student_id}", params={"limit": 5})
         if response.status_code == 200:
             encouragements = response.json()
             if encouragements:
                 st.subheader("Recent Encouragements")
-                for msg in encouragements[:5]:  # Show last 5 messages
+                for msg in encouragements:  # Show last 5 messages
                     viewed_status = "👁️" if msg['viewed'] else "🆕"
                     st.write(f"{viewed_status} **{msg['message_type'].title()}**: {msg['message']}")
+                if any(not msg['viewed'] for msg in encouragements) and st.button("Mark all as read"):
+                    requests.put(
+                        f"{API_BASE_URL}/encouragements/mark-viewed",
+                        json={"student_id": student_id, "up_to_id": max(msg['id'] for msg in encouragements)}
+                    )
+                    st.rerun()
             else:
                 st.info("No encouragement messages yet. Generate some!")
     except Exception as e:
@@ -278,7 +298,7 @@ with tab4:
                     st.bar_chart(priority_counts)
                 
                 # Get performance records to analyze study time
-                performance_response = requests.get(f"{API_BASE_URL}/performance-records/student/{student_id}")
+                performance_response = requests.get(f"{API_BASE_URL}/performance-records/{student_id}")
                 if performance_response.status_code == 200:
                     performance_data = performance_response.json()
                     if performance_data:
@@ -1,12 +1,46 @@
+import os
+from typing import Union
+
 from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
-from .models import DATABASE_URL
+from sqlalchemy.pool import StaticPool
+from .models import Base
+
+# EXAM_DATABASE_URL overrides the default file, e.g. "sqlite://" for tests
+DATABASE_URL = os.environ.get("EXAM_DATABASE_URL", "sqlite:///./exam_anxiety.db")
+MEMORY_URLS = ("sqlite://", "sqlite:///:memory:")
+
+
+def build_engine(url: str) -> Engine:
+    """Engine with the connect options this app needs for `url`"""
+    if not url.startswith("sqlite"):
+        return create_engine(url)
+    if url in MEMORY_URLS:
+        # Every pooled connection would otherwise open its own empty database
+        return create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    return create_engine(url, connect_args={"check_same_thread": False})
+
 
-# Database setup
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Database setup (Base comes from models so create_all sees every table)
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+
+
+def configure_engine(target: Union[str, Engine]) -> Engine:
+    """
+    Point the app at another database (a URL or a ready engine). Sessions from
+    SessionLocal, and so get_db, use it from then on.
+    """
+    global engine
+    engine = target if isinstance(target, Engine) else build_engine(target)
+    SessionLocal.configure(bind=engine)
+    return engine
+
+
+def get_engine() -> Engine:
+    return engine
+
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,118 @@
+"""
+Brings a database up to the models: creates missing tables, adds missing
+columns to existing tables and creates missing indexes. Idempotent, so it is
+safe to run on every deploy before the API workers start:
+
+    python -m database.migrate
+    python -m database.migrate --url sqlite:///./snapshot.db
+
+Only additive changes are made; columns are never dropped, renamed or
+retyped. Added columns get the model's scalar default, so existing rows read
+the same value new rows would get. When the topic schedule table is created
+next to existing performance records, schedules are rebuilt from that history
+(or on demand with --backfill-schedules).
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from sqlalchemy import Column, Index, Table, UniqueConstraint, inspect, literal, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from topic_scheduler.engine import topic_scheduler_engine
+
+from .database import DATABASE_URL, build_engine, get_engine
+from .models import Base, PerformanceRecord, TopicSchedule
+
+
+def migrate(engine: Optional[Engine] = None, backfill_schedules: bool = False) -> List[str]:
+    """Apply what `engine` is missing and return a description of each change"""
+    engine = engine or get_engine()
+    existing = set(inspect(engine).get_table_names())
+    try:
+        Base.metadata.create_all(bind=engine)
+    except OperationalError:
+        # Another worker created a table between our check and CREATE; what is
+        # left to create (if anything) is still missing, so try once more
+        Base.metadata.create_all(bind=engine)
+    changes = [f"table {name}" for name in Base.metadata.tables if name not in existing]
+    for name in existing & set(Base.metadata.tables):
+        try:
+            changes += _upgrade_table(engine, Base.metadata.tables[name])
+        except OperationalError:
+            # Another worker added a column or index after we inspected the
+            # table ("duplicate column name"); our transaction was rolled back,
+            # so re-inspect and add whatever is still missing
+            changes += _upgrade_table(engine, Base.metadata.tables[name])
+
+    schedules_added = TopicSchedule.__tablename__ not in existing and PerformanceRecord.__tablename__ in existing
+    if backfill_schedules or schedules_added:
+        with Session(engine) as db:
+            rebuilt = topic_scheduler_engine.backfill_schedules(db)
+        if rebuilt:
+            changes.append(f"schedules for {rebuilt} student(s)")
+    return changes
+
+
+def _upgrade_table(engine: Engine, table: Table) -> List[str]:
+    """Add the columns and indexes an existing table lacks"""
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns(table.name)}
+    indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+    indexes |= {constraint["name"] for constraint in inspector.get_unique_constraints(table.name)}
+    changes = []
+
+    with engine.begin() as conn:
+        for column in table.columns:
+            if column.name not in columns:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(engine, column)}"))
+                changes.append(f"column {table.name}.{column.name}")
+
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in indexes:
+                index.create(bind=conn, checkfirst=True)
+                changes.append(f"index {index.name}")
+
+        # A unique constraint can't be added to an existing SQLite table; a
+        # unique index enforces the same thing
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name and constraint.name not in indexes:
+                Index(constraint.name, *constraint.columns, unique=True).create(bind=conn, checkfirst=True)
+                changes.append(f"index {constraint.name}")
+    return changes
+
+
+def _column_ddl(engine: Engine, column: Column) -> str:
+    ddl = f"{column.name} {column.type.compile(dialect=engine.dialect)}"
+    default = column.default
+    if default is not None and default.is_scalar:
+        value = literal(default.arg, type_=column.type).compile(
+            dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+        )
+        ddl += f" DEFAULT {value}"
+    return ddl
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m database.migrate")
+    parser.add_argument("--url", default=DATABASE_URL, help="database URL (default: EXAM_DATABASE_URL or ./exam_anxiety.db)")
+    parser.add_argument("--backfill-schedules", action="store_true",
+                        help="rebuild topic schedules for students with history but no schedule")
+    args = parser.parse_args(argv)
+
+    engine = build_engine(args.url)
+    try:
+        changes = migrate(engine, backfill_schedules=args.backfill_schedules)
+    finally:
+        engine.dispose()
+    if changes:
+        print(f"Applied {len(changes)} change(s): {', '.join(changes)}")
+    else:
+        print("Schema is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,7 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Date, Text, Boolean, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from datetime import datetime
-import os
 
-# Database setup
-DATABASE_URL = "sqlite:///./exam_anxiety.db"
-
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 class Student(Base):
@@ -19,6 +12,7 @@ class Student(Base):
     email = Column(String, unique=True, index=True)
     grade = Column(String)
     exam_type = Column(String)  # e.g., "board", "competitive"
+    daily_study_minutes = Column(Integer, default=60)  # time budget for daily goals
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class Topic(Base):
@@ -27,12 +21,26 @@ class Topic(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     subject = Column(String, index=True)
-    syllabus_id = Column(Integer)
+    syllabus_id = Column(Integer, index=True)
     difficulty_level = Column(String)  # "easy", "medium", "hard"
     estimated_time = Column(Integer)  # in minutes
 
+class StudentSyllabus(Base):
+    __tablename__ = "student_syllabi"
+    __table_args__ = (
+        UniqueConstraint("student_id", "syllabus_id", name="uq_student_syllabi_student_syllabus"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer)
+    syllabus_id = Column(Integer, index=True)
+    enrolled_at = Column(DateTime, default=datetime.utcnow)
+
 class PerformanceRecord(Base):
     __tablename__ = "performance_records"
+    __table_args__ = (
+        Index("ix_performance_records_student_date", "student_id", "date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer)
@@ -43,8 +51,28 @@ class PerformanceRecord(Base):
     mistakes = Column(Text)  # JSON string of mistakes made
     completed = Column(Boolean, default=True)
 
+class TopicSchedule(Base):
+    __tablename__ = "topic_schedules"
+    __table_args__ = (
+        UniqueConstraint("student_id", "topic_id", name="uq_topic_schedules_student_topic"),
+        Index("ix_topic_schedules_student_due", "student_id", "next_due_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer)
+    topic_id = Column(Integer)
+    easiness = Column(Float, default=2.5)  # SM-2 easiness factor
+    interval_days = Column(Float, default=0)  # gap between the last two reviews
+    repetitions = Column(Integer, default=0)  # consecutive passing reviews
+    last_score = Column(Float)
+    last_reviewed_at = Column(DateTime)
+    next_due_at = Column(DateTime)
+
 class MicroGoal(Base):
     __tablename__ = "micro_goals"
+    __table_args__ = (
+        Index("ix_micro_goals_student_completed_at", "student_id", "completed_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer)
@@ -55,9 +83,26 @@ class MicroGoal(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     completed = Column(Boolean, default=False)
     completed_at = Column(DateTime)
+    goal_set_id = Column(Integer, index=True)  # set by daily generation, NULL for custom goals
+
+class DailyGoalSet(Base):
+    __tablename__ = "daily_goal_sets"
+    __table_args__ = (
+        UniqueConstraint("student_id", "goal_date", name="uq_daily_goal_sets_student_day"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer)
+    goal_date = Column(Date)  # student's local calendar day
+    idempotency_key = Column(String)  # key of the request that produced the current goals
+    generation = Column(Integer, default=0)  # times the set was regenerated, seeds the re-roll
+    generated_at = Column(DateTime, default=datetime.utcnow)
 
 class AnxietySignal(Base):
     __tablename__ = "anxiety_signals"
+    __table_args__ = (
+        Index("ix_anxiety_signals_student_type_detected", "student_id", "signal_type", "detected_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer)
@@ -68,10 +113,21 @@ class AnxietySignal(Base):
 
 class EncouragementMessage(Base):
     __tablename__ = "encouragement_messages"
+    __table_args__ = (
+        Index("ix_encouragement_messages_student_created", "student_id", "created_at"),
+        Index("ix_encouragement_messages_student_viewed", "student_id", "viewed"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer)
     message = Column(Text)
     message_type = Column(String)  # "daily", "after_goal", "consolation", etc.
     created_at = Column(DateTime, default=datetime.utcnow)
-    viewed = Column(Boolean, default=False)
\ No newline at end of file
+    viewed = Column(Boolean, default=False)
+
+class EncouragementRotation(Base):
+    __tablename__ = "encouragement_rotations"
+    
+    student_id = Column(Integer, primary_key=True)
+    category = Column(String, primary_key=True)  # template category, e.g. "stress"
+    recent_mask = Column(BigInteger, default=0)  # bit i set = template i shown in the current cycle
\ No newline at end of file
@@ -0,0 +1,298 @@
+"""
+Cohort-wide daily encouragement generation.
+
+Computes the same features as EncouragementEngine._analyze_student_progress
+for thousands of students at a time with a handful of grouped queries,
+selects categories and templates with NumPy, and bulk-inserts the messages.
+
+    python -m encouragement.batch --chunk-size 5000
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, func, insert, update
+from sqlalchemy.orm import Session
+
+from database.models import (
+    Student, PerformanceRecord, MicroGoal, AnxietySignal, EncouragementMessage, EncouragementRotation
+)
+from encouragement.engine import EncouragementEngine, encouragement_engine
+from encouragement.rotation import MAX_ROTATED_TEMPLATES
+from utils.rng import derive_seed
+
+# Checked in this order, mirroring generate_daily_encouragement
+DAILY_CATEGORIES = ["improvement", "consistency", "goal_completion", "stress", "default"]
+
+ProgressCallback = Callable[[int, int, int, float], None]
+
+
+class CohortEncouragementGenerator:
+    def __init__(self, engine: EncouragementEngine = encouragement_engine, chunk_size: int = 5000):
+        self.engine = engine
+        self.chunk_size = chunk_size
+
+    def run(self, db: Session, day: Optional[date] = None, locale: Optional[str] = None,
+            skip_existing: bool = True, limit: Optional[int] = None,
+            progress: Optional[ProgressCallback] = None) -> Dict:
+        """
+        Generate and store one daily encouragement per student.
+        Each chunk of students is committed as one transaction; with
+        skip_existing, students who already have a daily message for the
+        day are left alone, so an interrupted run can simply be restarted.
+        Messages for a past (or future) day are stamped within that day.
+        """
+        now = datetime.utcnow()
+        day = day or now.date()
+        if day != now.date():
+            # Backfill: stamp messages (and look back from) the same time of day on the target day
+            now = datetime.combine(day, now.time())
+        templates = self.engine.templates.get("encouragement", locale)
+        seed_version = f"{self.engine.ENGINE_VERSION}+templates/{templates.version}+batch"
+
+        total = db.query(func.count(Student.id)).scalar() or 0
+        if limit is not None:
+            total = min(total, limit)
+
+        started = time.perf_counter()
+        processed = created = 0
+        last_id = 0
+        while processed < total:
+            size = min(self.chunk_size, total - processed)
+            ids = np.array([row[0] for row in db.execute(
+                select(Student.id).where(Student.id > last_id).order_by(Student.id).limit(size)
+            )], dtype=np.int64)
+            if len(ids) == 0:
+                break
+            last_id = int(ids[-1])
+
+            created += self._generate_chunk(db, ids, day, now, templates, seed_version, skip_existing)
+            db.commit()
+
+            processed += len(ids)
+            if progress is not None:
+                progress(processed, total, created, time.perf_counter() - started)
+
+        return {
+            "students": processed,
+            "messages": created,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def _generate_chunk(self, db: Session, ids: np.ndarray, day: date, now: datetime,
+                        templates, seed_version: str, skip_existing: bool) -> int:
+        lo, hi = int(ids[0]), int(ids[-1])
+
+        if skip_existing:
+            day_start = datetime.combine(day, datetime.min.time())
+            done = {row[0] for row in db.execute(
+                select(EncouragementMessage.student_id).where(
+                    EncouragementMessage.student_id.between(lo, hi),
+                    EncouragementMessage.message_type == "daily",
+                    EncouragementMessage.created_at >= day_start,
+                    EncouragementMessage.created_at < day_start + timedelta(days=1)
+                ).distinct()
+            )}
+            if done:
+                ids = ids[~np.isin(ids, list(done))]
+            if len(ids) == 0:
+                return 0
+
+        features = self._features(db, ids, lo, hi, now)
+        categories = self._select_categories(features)
+        masks = self._rotation_masks(db, ids, lo, hi)
+
+        seeds = np.array([derive_seed(int(student_id), day, seed_version) for student_id in ids], dtype=np.uint64)
+        uniform = (seeds >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+        choice = np.zeros(len(ids), dtype=np.int64)
+        new_masks = {}
+        for c, category in enumerate(DAILY_CATEGORIES):
+            rows = categories == c
+            count = len(templates[category])
+            if not rows.any() or count <= 1 or count > MAX_ROTATED_TEMPLATES:
+                continue
+            current = masks[category].to_numpy()[rows] if category in masks else np.zeros(rows.sum(), dtype=np.int64)
+            choice[rows], new_masks[category] = self._pick_templates(current, count, uniform[rows])
+
+        messages = self._render(ids, categories, choice, features, templates, now)
+        db.execute(insert(EncouragementMessage), messages)
+        self._store_masks(db, ids, categories, masks, new_masks)
+
+        return len(messages)
+
+    def _features(self, db: Session, ids: np.ndarray, lo: int, hi: int, now: datetime) -> pd.DataFrame:
+        """Per-student analysis features over the week before `now`, indexed by student id"""
+        seven_days_ago = now - timedelta(days=7)
+
+        performance = pd.DataFrame(db.execute(
+            select(PerformanceRecord.student_id, PerformanceRecord.date, PerformanceRecord.score).where(
+                PerformanceRecord.student_id.between(lo, hi),
+                PerformanceRecord.date >= seven_days_ago,
+                PerformanceRecord.date < now
+            ).order_by(PerformanceRecord.student_id, PerformanceRecord.date, PerformanceRecord.id)
+        ).all(), columns=["student_id", "date", "score"])
+
+        features = pd.DataFrame(index=pd.Index(ids, name="student_id"))
+        if not performance.empty:
+            performance["day"] = pd.to_datetime(performance["date"]).dt.normalize()
+            grouped = performance.groupby("student_id")
+            summary = pd.DataFrame({
+                "first_score": grouped["score"].first(),
+                "last_score": grouped["score"].last(),
+                "records": grouped["score"].size(),
+                "consistency_days": grouped["day"].nunique()
+            })
+            features = features.join(summary)
+        else:
+            features = features.assign(first_score=np.nan, last_score=np.nan, records=0, consistency_days=0)
+
+        completed_goals = dict(db.execute(
+            select(MicroGoal.student_id, func.count(MicroGoal.id)).where(
+                MicroGoal.student_id.between(lo, hi),
+                MicroGoal.completed == True,
+                MicroGoal.completed_at >= seven_days_ago,
+                MicroGoal.completed_at < now
+            ).group_by(MicroGoal.student_id)
+        ).all())
+        stress_signals = dict(db.execute(
+            select(AnxietySignal.student_id, func.count(AnxietySignal.id)).where(
+                AnxietySignal.student_id.between(lo, hi),
+                AnxietySignal.signal_type == "stress",
+                AnxietySignal.detected_at >= seven_days_ago,
+                AnxietySignal.detected_at < now
+            ).group_by(AnxietySignal.student_id)
+        ).all())
+
+        features["records"] = features["records"].fillna(0).astype(np.int64)
+        features["consistency_days"] = features["consistency_days"].fillna(0).astype(np.int64)
+        first = features["first_score"].to_numpy(dtype=np.float64)
+        last = features["last_score"].to_numpy(dtype=np.float64)
+        valid = (features["records"].to_numpy() >= 2) & (first != 0) & ~np.isnan(first)
+        features["improvement"] = np.where(valid, (last - first) / np.where(valid, first, 1.0) * 100, 0.0)
+        features["completed_goals"] = features.index.map(completed_goals).fillna(0).astype(np.int64)
+        features["stress_signals"] = features.index.map(stress_signals).fillna(0).astype(np.int64)
+
+        return features
+
+    def _select_categories(self, features: pd.DataFrame) -> np.ndarray:
+        """Index into DAILY_CATEGORIES for every student"""
+        return np.select(
+            [
+                features["improvement"].to_numpy() > 5,
+                features["consistency_days"].to_numpy() >= 3,
+                features["completed_goals"].to_numpy() > 0,
+                features["stress_signals"].to_numpy() > 0
+            ],
+            [0, 1, 2, 3],
+            default=4
+        )
+
+    def _rotation_masks(self, db: Session, ids: np.ndarray, lo: int, hi: int) -> pd.DataFrame:
+        """Current rotation bitmasks as a (student x category) frame; missing rows are 0"""
+        rows = db.execute(
+            select(EncouragementRotation.student_id, EncouragementRotation.category,
+                   EncouragementRotation.recent_mask).where(
+                EncouragementRotation.student_id.between(lo, hi)
+            )
+        ).all()
+        if not rows:
+            return pd.DataFrame(index=ids)
+        masks = pd.DataFrame(rows, columns=["student_id", "category", "recent_mask"]).pivot(
+            index="student_id", columns="category", values="recent_mask"
+        )
+        return masks.reindex(ids)
+
+    def _pick_templates(self, masks: np.ndarray, count: int, uniform: np.ndarray):
+        """
+        Vectorized encouragement.rotation.pick_from_mask: choose an unused
+        template per row and return (indices, updated masks).
+        """
+        full = (1 << count) - 1
+        masks = np.nan_to_num(masks.astype(np.float64)).astype(np.int64) & full
+        masks[masks == full] = 0
+
+        bits = np.arange(count, dtype=np.int64)
+        available = ((masks[:, None] >> bits[None, :]) & 1) == 0
+        k = np.floor(uniform * available.sum(axis=1)).astype(np.int64)
+        index = np.argmax(np.cumsum(available, axis=1) > k[:, None], axis=1)
+
+        updated = masks | (np.int64(1) << index)
+        updated = np.where(updated == full, np.int64(1) << index, updated)
+        return index, updated
+
+    def _render(self, ids: np.ndarray, categories: np.ndarray, choice: np.ndarray,
+                features: pd.DataFrame, templates, now: datetime) -> List[Dict]:
+        improvement = np.round(features["improvement"].to_numpy(), 1)
+        days = features["consistency_days"].to_numpy()
+        compiled = [templates[category] for category in DAILY_CATEGORIES]
+
+        messages = []
+        for i in range(len(ids)):
+            template = compiled[categories[i]][choice[i]]
+            messages.append({
+                "student_id": int(ids[i]),
+                "message": template(improvement=float(improvement[i]), days=int(days[i])),
+                "message_type": "daily",
+                "created_at": now,
+                "viewed": False
+            })
+        return messages
+
+    def _store_masks(self, db: Session, ids: np.ndarray, categories: np.ndarray,
+                     masks: pd.DataFrame, new_masks: Dict[str, np.ndarray]):
+        """Write changed rotation masks: bulk UPDATE by primary key, bulk INSERT for new rows"""
+        updates, inserts = [], []
+        for c, category in enumerate(DAILY_CATEGORIES):
+            if category not in new_masks:
+                continue
+            rows = categories == c
+            existing = masks[category].to_numpy()[rows] if category in masks else np.full(rows.sum(), np.nan)
+            for student_id, had_row, mask in zip(ids[rows], ~pd.isna(existing), new_masks[category]):
+                row = {"student_id": int(student_id), "category": category, "recent_mask": int(mask)}
+                (updates if had_row else inserts).append(row)
+
+        if updates:
+            db.execute(update(EncouragementRotation), updates)
+        if inserts:
+            db.execute(insert(EncouragementRotation), inserts)
+
+
+def _print_progress(processed: int, total: int, created: int, elapsed: float):
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    percent = processed / total * 100 if total else 100.0
+    print(f"{processed}/{total} students ({percent:.1f}%), {created} messages, {rate:,.0f} students/s",
+          file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate daily encouragement messages for every student")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="students per transaction")
+    parser.add_argument("--day", type=date.fromisoformat, default=None, help="YYYY-MM-DD (default: today, UTC)")
+    parser.add_argument("--locale", default=None)
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many students")
+    parser.add_argument("--regenerate", action="store_true",
+                        help="also message students who already have a daily message for the day")
+    args = parser.parse_args(argv)
+
+    from database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stats = CohortEncouragementGenerator(chunk_size=args.chunk_size).run(
+            db, day=args.day, locale=args.locale, skip_existing=not args.regenerate,
+            limit=args.limit, progress=_print_progress
+        )
+    finally:
+        db.close()
+
+    print(f"Generated {stats['messages']} messages for {stats['students']} students in {stats['seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,215 +1,298 @@
 import random
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, func, distinct
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from database.models import PerformanceRecord, EncouragementMessage, MicroGoal, AnxietySignal
 from schemas.encouragement import EncouragementCreate, EncouragementType
+from utils.rng import derive_rng
+from utils.templates import TemplateCatalog, CompiledTemplate, template_registry
+from encouragement.rotation import MessageRotation
+from encouragement.nlp import nlp_model_manager
+from monitoring.profiling import phase_timers, profiled
+
+
+@dataclass(frozen=True)
+class StudentProgressContext:
+    """Snapshot of a student's recent activity, shared by every message generator"""
+    significant_improvement: float = 0.0  # % change first -> last score in the last 7 days
+    consistency_days: int = 0             # distinct study days in the last 7 days
+    recent_goal_completion: bool = False  # any goal completed in the last 7 days
+    stress_signals: int = 0               # stress signals in the last 7 days
+    recent_stress_signals: int = 0        # stress signals in the last 2 days
 
 
 class EncouragementEngine:
+    # Bump whenever templates or selection logic change (see utils.rng)
+    ENGINE_VERSION = "encouragement/1"
+
     def __init__(self):
-        # Load spaCy model (simplified - in real implementation, handle model loading properly)
-        try:
-            self.nlp = None  # Placeholder - would load actual model
-        except:
-            self.nlp = None  # Fallback if model not available
-            
-        # Positive encouragement templates
-        self.positive_templates = {
-            "improvement": [
-                "You improved accuracy by {improvement}% this week—keep going 💪",
-                "Great progress! Your hard work is showing results with {improvement}% improvement.",
-                "Consistency pays off! You've improved by {improvement}% recently.",
-                "Noticed your improvement of {improvement}% - you're on the right track!",
-                "Your dedication is paying off with {improvement}% progress!"
-            ],
-            "consistency": [
-                "Consistency matters more than speed. You're on track with {days} days in a row!",
-                "You've been studying for {days} consecutive days - that's commitment!",
-                "Daily practice is building your confidence. Keep up the {days} day streak!",
-                "Your consistency is impressive - {days} days of focused study!",
-                "Small steps daily lead to big results. {days} days of consistency shows your dedication!"
-            ],
-            "goal_completion": [
-                "Another goal completed! Your discipline is building your confidence.",
-                "Well done! You're building momentum with completed goals.",
-                "Goal completed! Each small victory counts toward your success.",
-                "Great job finishing that goal! You're making steady progress.",
-                "Completed goal! Every task you finish brings you closer to your target."
-            ],
-            "effort_recognition": [
-                "It's not about speed, it's about persistence. Your effort matters.",
-                "Progress isn't always linear. Your consistent effort is building confidence.",
-                "Every study session counts, even when progress feels slow.",
-                "Your dedication to showing up matters more than perfection.",
-                "Learning takes time. Your patience with the process is a strength."
-            ]
-        }
+        # spaCy is loaded lazily and shared process-wide (see encouragement/nlp.py)
+        self.nlp_models = nlp_model_manager
         
-        # Supportive templates for challenging times
-        self.supportive_templates = {
-            "setback": [
-                "One missed goal doesn't break your progress. Tomorrow is a new opportunity.",
-                "Setbacks are part of learning. What matters is you keep going.",
-                "Don't let one difficult day discourage you. Your journey continues.",
-                "It's okay to have challenging days. What's important is you're here now.",
-                "Progress isn't always smooth. Your commitment to continue matters."
-            ],
-            "stress": [
-                "Remember: consistency over intensity. You're doing better than you think.",
-                "Take breaks when needed. Quality over quantity in your preparation.",
-                "Your worth isn't defined by test scores. Focus on your growth journey.",
-                "Learning is a marathon, not a sprint. Pace yourself appropriately.",
-                "It's normal to feel challenged. Trust in your preparation and growth."
-            ]
+        # Goal verbs recognised after completion, matched on lemmas when NLP is available
+        self.goal_kind_keywords = {
+            "revision": ("revise", "review"),
+            "practice": ("practice", "solve")
         }
+        
+        # Templates live in templates/encouragement/<locale>.json; each category
+        # declares the placeholders it may use so bad edits fail at load time
+        self.templates = template_registry
+        self.templates.register("encouragement", {
+            "improvement": {"improvement"},
+            "consistency": {"days"},
+            "goal_completion": set(),
+            "effort_recognition": set(),
+            "setback": set(),
+            "stress": set(),
+            "default": set(),
+            "after_goal_missing": set(),
+            "after_goal_revision": set(),
+            "after_goal_practice": set(),
+            "after_goal_general": set()
+        })
+
+    @property
+    def nlp(self):
+        """The shared spaCy pipeline, or None when NLP is disabled or unavailable"""
+        return self.nlp_models.get()
 
-    def generate_daily_encouragement(self, db: Session, student_id: int) -> str:
+    def _goal_kind(self, goal_text: str) -> Optional[str]:
+        """
+        Classify a goal as revision or practice. With a spaCy model, inflected
+        verbs ("revising", "solved") match via their lemmas; without one, this
+        falls back to substring keyword matching.
+        """
+        nlp = self.nlp
+        if nlp is None:
+            text = goal_text.lower()
+            for kind, keywords in self.goal_kind_keywords.items():
+                if any(keyword in text for keyword in keywords):
+                    return kind
+            return None
+        
+        lemmas = {token.lemma_.lower() for token in nlp(goal_text)}
+        for kind, keywords in self.goal_kind_keywords.items():
+            if lemmas.intersection(keywords):
+                return kind
+        return None
+
+    def _rng(self, student_id: int, day: Optional[date], rng: Optional[random.Random],
+             templates: TemplateCatalog) -> random.Random:
+        """Use the caller's generator, or derive the student's seeded one for the day"""
+        if rng is not None:
+            return rng
+        return derive_rng(student_id, day, f"{self.ENGINE_VERSION}+templates/{templates.version}")
+
+    def _choose(self, rng: random.Random, templates: TemplateCatalog, category: str,
+                rotation: MessageRotation) -> CompiledTemplate:
+        """Pick a template, skipping ones the student has seen in the current rotation cycle"""
+        return rotation.choose(rng, category, templates[category])
+
+    @profiled("encouragement")
+    def generate_daily_encouragement(self, db: Session, student_id: int, day: Optional[date] = None,
+                                     rng: Optional[random.Random] = None,
+                                     context: Optional[StudentProgressContext] = None,
+                                     locale: Optional[str] = None,
+                                     rotation: Optional[MessageRotation] = None) -> str:
         """
         Generate personalized daily encouragement message based on recent activity
         """
+        templates = self.templates.get("encouragement", locale)
+        rng = self._rng(student_id, day, rng, templates)
+        rotation = rotation or MessageRotation.load(db, student_id)
+        
         # Analyze recent performance and behavior
-        analysis = self._analyze_student_progress(db, student_id)
+        analysis = context or self._analyze_student_progress(db, student_id)
         
         # Select appropriate template based on analysis
-        if analysis.get('significant_improvement', 0) > 5:  # More than 5% improvement
-            template = random.choice(self.positive_templates["improvement"])
-            return template.format(improvement=round(analysis['significant_improvement'], 1))
-        elif analysis.get('consistency_days', 0) >= 3:
-            template = random.choice(self.positive_templates["consistency"])
-            return template.format(days=analysis['consistency_days'])
-        elif analysis.get('recent_goal_completion', False):
-            template = random.choice(self.positive_templates["goal_completion"])
-            return template
-        elif analysis.get('stress_signals', 0) > 0:
-            template = random.choice(self.supportive_templates["stress"])
-            return template
+        if analysis.significant_improvement > 5:  # More than 5% improvement
+            template = self._choose(rng, templates, "improvement", rotation)
+            return template(improvement=round(analysis.significant_improvement, 1))
+        elif analysis.consistency_days >= 3:
+            template = self._choose(rng, templates, "consistency", rotation)
+            return template(days=analysis.consistency_days)
+        elif analysis.recent_goal_completion:
+            template = self._choose(rng, templates, "goal_completion", rotation)
+            return template()
+        elif analysis.stress_signals > 0:
+            template = self._choose(rng, templates, "stress", rotation)
+            return template()
         else:
             # Default encouraging message
-            return "Remember, every expert was once a beginner. Your consistent effort is building your success!"
+            return rng.choice(templates["default"])()
 
-    def generate_after_goal_encouragement(self, db: Session, student_id: int, goal_id: int) -> str:
+    def generate_after_goal_encouragement(self, db: Session, student_id: int, goal_id: int,
+                                          locale: Optional[str] = None) -> str:
         """
         Generate encouragement after completing a micro goal
         """
+        templates = self.templates.get("encouragement", locale)
+        
         # Get goal details
         goal = db.query(MicroGoal).filter(MicroGoal.id == goal_id).first()
         if not goal:
-            return "Goal completed! Keep up the good work!"
+            return templates["after_goal_missing"][0]()
         
         # Generate specific encouragement based on goal type
-        if "revise" in goal.goal_text.lower() or "review" in goal.goal_text.lower():
-            return "Great job reviewing concepts! Repetition strengthens memory and builds confidence."
-        elif "practice" in goal.goal_text.lower() or "solve" in goal.goal_text.lower():
-            return "Practice makes progress! Each problem you solve builds your confidence for the exam."
+        goal_kind = self._goal_kind(goal.goal_text)
+        if goal_kind == "revision":
+            return templates["after_goal_revision"][0]()
+        elif goal_kind == "practice":
+            return templates["after_goal_practice"][0]()
         else:
-            return "Goal completed! Each small step brings you closer to your success."
+            return templates["after_goal_general"][0]()
 
-    def generate_improvement_encouragement(self, db: Session, student_id: int, improvement_percentage: float) -> str:
+    def generate_improvement_encouragement(self, db: Session, student_id: int, improvement_percentage: float,
+                                           day: Optional[date] = None, rng: Optional[random.Random] = None,
+                                           locale: Optional[str] = None,
+                                           rotation: Optional[MessageRotation] = None) -> str:
         """
         Generate encouragement when improvement is detected
         """
-        template = random.choice(self.positive_templates["improvement"])
-        return template.format(improvement=round(improvement_percentage, 1))
+        templates = self.templates.get("encouragement", locale)
+        rng = self._rng(student_id, day, rng, templates)
+        rotation = rotation or MessageRotation.load(db, student_id)
+        template = self._choose(rng, templates, "improvement", rotation)
+        return template(improvement=round(improvement_percentage, 1))
 
-    def generate_setback_encouragement(self, db: Session, student_id: int) -> str:
+    def generate_setback_encouragement(self, db: Session, student_id: int, day: Optional[date] = None,
+                                       rng: Optional[random.Random] = None,
+                                       context: Optional[StudentProgressContext] = None,
+                                       locale: Optional[str] = None,
+                                       rotation: Optional[MessageRotation] = None) -> str:
         """
         Generate supportive message during difficult periods
         """
+        templates = self.templates.get("encouragement", locale)
+        rng = self._rng(student_id, day, rng, templates)
+        rotation = rotation or MessageRotation.load(db, student_id)
+        
         # Check if there are recent stress signals
-        stress_signals = db.query(AnxietySignal).filter(
-            AnxietySignal.student_id == student_id,
-            AnxietySignal.signal_type == "stress",
-            AnxietySignal.detected_at >= datetime.utcnow() - timedelta(days=2)
-        ).count()
+        analysis = context or self._analyze_student_progress(db, student_id)
         
-        if stress_signals > 0:
-            template = random.choice(self.supportive_templates["stress"])
+        if analysis.recent_stress_signals > 0:
+            template = self._choose(rng, templates, "stress", rotation)
         else:
-            template = random.choice(self.supportive_templates["setback"])
+            template = self._choose(rng, templates, "setback", rotation)
         
-        return template
+        return template()
 
-    def _analyze_student_progress(self, db: Session, student_id: int) -> Dict:
+    def _analyze_student_progress(self, db: Session, student_id: int) -> StudentProgressContext:
         """
-        Analyze student's recent progress to inform encouragement
+        Analyze student's recent progress to inform encouragement.
+        Every feature comes from one round trip: a single SELECT of scalar subqueries.
         """
-        analysis = {}
+        now = datetime.utcnow()
+        seven_days_ago = now - timedelta(days=7)
+        two_days_ago = now - timedelta(days=2)
         
-        # Get recent performance (last 7 days)
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        recent_performance = db.query(PerformanceRecord).filter(
+        # Recent performance (last 7 days)
+        recent_performance = (
             PerformanceRecord.student_id == student_id,
             PerformanceRecord.date >= seven_days_ago
-        ).order_by(PerformanceRecord.date).all()
-        
-        # Calculate improvement
-        if len(recent_performance) >= 2:
-            first_score = recent_performance[0].score
-            last_score = recent_performance[-1].score
-            improvement = ((last_score - first_score) / first_score * 100) if first_score != 0 else 0
-            analysis['significant_improvement'] = improvement
-        else:
-            analysis['significant_improvement'] = 0
-        
-        # Check consistency (days active in last 7 days)
-        study_dates = set()
-        for record in recent_performance:
-            study_dates.add(record.date.date())
-        analysis['consistency_days'] = len(study_dates)
+        )
+        first_score = select(PerformanceRecord.score).where(*recent_performance).order_by(
+            PerformanceRecord.date, PerformanceRecord.id
+        ).limit(1).scalar_subquery()
+        last_score = select(PerformanceRecord.score).where(*recent_performance).order_by(
+            PerformanceRecord.date.desc(), PerformanceRecord.id.desc()
+        ).limit(1).scalar_subquery()
+        record_count = select(func.count(PerformanceRecord.id)).where(*recent_performance).scalar_subquery()
+        study_days = select(
+            func.count(distinct(func.date(PerformanceRecord.date)))
+        ).where(*recent_performance).scalar_subquery()
         
-        # Check recent goal completion
-        recent_goals = db.query(MicroGoal).filter(
+        # Recent goal completion
+        completed_goals = select(func.count(MicroGoal.id)).where(
             MicroGoal.student_id == student_id,
             MicroGoal.completed == True,
             MicroGoal.completed_at >= seven_days_ago
-        ).count()
-        analysis['recent_goal_completion'] = recent_goals > 0
+        ).scalar_subquery()
         
-        # Check for stress signals
-        stress_signals = db.query(AnxietySignal).filter(
+        # Stress signals over the last 7 and 2 days
+        stress = (
             AnxietySignal.student_id == student_id,
-            AnxietySignal.signal_type == "stress",
-            AnxietySignal.detected_at >= seven_days_ago
-        ).count()
-        analysis['stress_signals'] = stress_signals
+            AnxietySignal.signal_type == "stress"
+        )
+        stress_signals = select(func.count(AnxietySignal.id)).where(
+            *stress, AnxietySignal.detected_at >= seven_days_ago
+        ).scalar_subquery()
+        recent_stress_signals = select(func.count(AnxietySignal.id)).where(
+            *stress, AnxietySignal.detected_at >= two_days_ago
+        ).scalar_subquery()
         
-        return analysis
+        row = db.execute(select(
+            first_score, last_score, record_count, study_days,
+            completed_goals, stress_signals, recent_stress_signals
+        )).one()
+        first, last, records, days, goals, stress_7d, stress_2d = row
+        
+        # Calculate improvement
+        improvement = 0
+        if records >= 2 and first:
+            improvement = (last - first) / first * 100
+        
+        return StudentProgressContext(
+            significant_improvement=improvement,
+            consistency_days=days or 0,
+            recent_goal_completion=(goals or 0) > 0,
+            stress_signals=stress_7d or 0,
+            recent_stress_signals=stress_2d or 0
+        )
 
-    def generate_personalized_encouragement(self, db: Session, student_id: int) -> List[EncouragementCreate]:
+    @profiled("encouragement")
+    def generate_personalized_encouragement(self, db: Session, student_id: int,
+                                            day: Optional[date] = None,
+                                            locale: Optional[str] = None) -> List[EncouragementCreate]:
         """
-        Generate multiple types of personalized encouragement messages
+        Generate multiple types of personalized encouragement messages.
+        One seeded generator drives every template choice, so the same
+        (student, day) always yields the same messages.
         """
         encouragements = []
         
-        # Daily encouragement
-        daily_msg = self.generate_daily_encouragement(db, student_id)
-        encouragements.append(EncouragementCreate(
-            student_id=student_id,
-            message=daily_msg,
-            message_type=EncouragementType.daily
-        ))
+        with phase_timers.phase("encouragement", "load"):
+            rng = self._rng(student_id, day, None, self.templates.get("encouragement", locale))
+            rotation = MessageRotation.load(db, student_id)
         
-        # Additional messages based on analysis
-        analysis = self._analyze_student_progress(db, student_id)
+        with phase_timers.phase("encouragement", "analyze"):
+            # Analyze once and share the snapshot and rotation state with every generator
+            analysis = self._analyze_student_progress(db, student_id)
         
-        if analysis.get('significant_improvement', 0) > 10:  # Significant improvement
-            improvement_msg = self.generate_improvement_encouragement(
-                db, student_id, analysis['significant_improvement']
+        with phase_timers.phase("encouragement", "render"):
+            # Daily encouragement
+            daily_msg = self.generate_daily_encouragement(
+                db, student_id, rng=rng, context=analysis, locale=locale, rotation=rotation
             )
             encouragements.append(EncouragementCreate(
                 student_id=student_id,
-                message=improvement_msg,
-                message_type=EncouragementType.improvement
-            ))
-        elif analysis.get('stress_signals', 0) > 0:  # If there are stress signals
-            setback_msg = self.generate_setback_encouragement(db, student_id)
-            encouragements.append(EncouragementCreate(
-                student_id=student_id,
-                message=setback_msg,
-                message_type=EncouragementType.consolation
+                message=daily_msg,
+                message_type=EncouragementType.daily
             ))
+            
+            # Additional messages based on analysis
+            if analysis.significant_improvement > 10:  # Significant improvement
+                improvement_msg = self.generate_improvement_encouragement(
+                    db, student_id, analysis.significant_improvement, rng=rng, locale=locale, rotation=rotation
+                )
+                encouragements.append(EncouragementCreate(
+                    student_id=student_id,
+                    message=improvement_msg,
+                    message_type=EncouragementType.improvement
+                ))
+            elif analysis.stress_signals > 0:  # If there are stress signals
+                setback_msg = self.generate_setback_encouragement(
+                    db, student_id, rng=rng, context=analysis, locale=locale, rotation=rotation
+                )
+                encouragements.append(EncouragementCreate(
+                    student_id=student_id,
+                    message=setback_msg,
+                    message_type=EncouragementType.consolation
+                ))
         
         return encouragements
 
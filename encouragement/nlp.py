@@ -0,0 +1,119 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (None where it can't be read)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, KB elsewhere; this is a peak, not current
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return round(peak / divisor, 1)
+    except (ImportError, OSError):
+        return None
+
+
+class NLPModelManager:
+    """
+    Loads the spaCy pipeline once per process, on first use.
+
+    Configuration (environment):
+    - EXAM_NLP_ENABLED=0 skips NLP entirely; callers get None and use their
+      keyword fast path.
+    - EXAM_NLP_MODEL picks the pipeline (default en_core_web_sm).
+    - EXAM_NLP_DISABLE_PIPES lists components not to load (default parser,ner;
+      the engine only needs lemmas).
+
+    The loaded model is read-only and shared by all threads. When it is loaded
+    before the server forks its workers (see EXAM_NLP_WARMUP in main.py), the
+    workers share its memory pages copy-on-write instead of each loading a copy.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, enabled: Optional[bool] = None,
+                 disable_pipes: Optional[str] = None):
+        self.model_name = model_name or os.environ.get("EXAM_NLP_MODEL", "en_core_web_sm")
+        if enabled is None:
+            enabled = os.environ.get("EXAM_NLP_ENABLED", "1") not in ("0", "false", "no")
+        self.enabled = enabled
+        pipes = disable_pipes if disable_pipes is not None else os.environ.get("EXAM_NLP_DISABLE_PIPES", "parser,ner")
+        self.disable_pipes = [pipe.strip() for pipe in pipes.split(",") if pipe.strip()]
+
+        self._lock = threading.Lock()
+        self._model = None
+        self._state = "disabled" if not enabled else "unloaded"  # unloaded, loaded, failed, disabled
+        self._error: Optional[str] = None
+        self._load_seconds: Optional[float] = None
+        self._rss_before_mb: Optional[float] = None
+        self._rss_after_mb: Optional[float] = None
+        self._loaded_in_pid: Optional[int] = None
+
+    def get(self):
+        """Return the loaded pipeline, or None when NLP is disabled or unavailable"""
+        if self._state == "loaded":
+            return self._model
+        if self._state in ("disabled", "failed"):
+            return None
+
+        with self._lock:
+            if self._state == "unloaded":
+                self._load()
+        return self._model
+
+    def _load(self):
+        self._rss_before_mb = current_rss_mb()
+        started = time.perf_counter()
+        try:
+            import spacy
+            self._model = spacy.load(self.model_name, disable=self.disable_pipes)
+        except (ImportError, OSError) as e:
+            # Missing package or model: fall back to keyword matching for good
+            self._state = "failed"
+            self._error = str(e)
+            logger.warning("NLP model %s unavailable, using keyword fallback: %s", self.model_name, e)
+            return
+
+        self._load_seconds = round(time.perf_counter() - started, 3)
+        self._rss_after_mb = current_rss_mb()
+        self._loaded_in_pid = os.getpid()
+        self._state = "loaded"
+        logger.info(
+            "Loaded NLP model %s in %.2fs (RSS %s MB -> %s MB)",
+            self.model_name, self._load_seconds, self._rss_before_mb, self._rss_after_mb
+        )
+
+    def warmup(self) -> Dict:
+        """Load the model now instead of on the first request"""
+        self.get()
+        return self.stats()
+
+    def stats(self) -> Dict:
+        """Load state, load time and memory figures for monitoring"""
+        return {
+            "model": self.model_name,
+            "state": self._state,
+            "error": self._error,
+            "load_seconds": self._load_seconds,
+            "rss_before_load_mb": self._rss_before_mb,
+            "rss_after_load_mb": self._rss_after_mb,
+            "rss_now_mb": current_rss_mb(),
+            "loaded_in_pid": self._loaded_in_pid,
+            "pid": os.getpid(),
+            "shared_from_parent": self._loaded_in_pid is not None and self._loaded_in_pid != os.getpid()
+        }
+
+
+# Process-wide model manager
+nlp_model_manager = NLPModelManager()
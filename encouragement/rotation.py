@@ -0,0 +1,92 @@
+import random
+from typing import Dict, Sequence, Tuple, TypeVar
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database.models import EncouragementRotation
+
+T = TypeVar("T")
+
+# Bits available in the BigInteger mask column
+MAX_ROTATED_TEMPLATES = 63
+
+
+def pick_from_mask(rng: random.Random, count: int, mask: int) -> Tuple[int, int]:
+    """
+    Choose a template index not yet used in the current cycle and return
+    (index, new_mask). When every template has been used, a new cycle
+    starts with only the one just picked marked, so it can't repeat next.
+    """
+    full = (1 << count) - 1
+    mask &= full  # the catalog may have shrunk since the mask was written
+    if mask == full:
+        mask = 0
+
+    available = [i for i in range(count) if not (mask >> i) & 1]
+    index = rng.choice(available)
+    mask |= 1 << index
+    if mask == full:
+        mask = 1 << index
+    return index, mask
+
+
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def upsert_rotation(dialect_name: str, student_id: int, category: str, mask: int):
+    """INSERT ... ON CONFLICT DO UPDATE ... RETURNING for one rotation row"""
+    if dialect_name not in _UPSERT_INSERTS:
+        raise NotImplementedError(f"Rotation upserts are not supported on {dialect_name}")
+    statement = _UPSERT_INSERTS[dialect_name](EncouragementRotation).values(
+        student_id=student_id, category=category, recent_mask=mask
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[EncouragementRotation.student_id, EncouragementRotation.category],
+        set_={"recent_mask": statement.excluded.recent_mask}
+    ).returning(EncouragementRotation)
+
+
+class MessageRotation:
+    """
+    A student's recently shown encouragement templates, one bitmask per
+    category, loaded with a single primary-key range query. Choosing a
+    template updates the mask in the session; the caller's commit
+    persists it together with the generated message. A category's first
+    mask is upserted, so concurrent first requests for a student don't
+    collide on the primary key.
+    """
+
+    def __init__(self, db: Session, student_id: int, rows: Dict[str, EncouragementRotation]):
+        self.db = db
+        self.student_id = student_id
+        self._rows = rows
+
+    @classmethod
+    def load(cls, db: Session, student_id: int) -> "MessageRotation":
+        rows = db.query(EncouragementRotation).filter(
+            EncouragementRotation.student_id == student_id
+        ).all()
+        return cls(db, student_id, {row.category: row for row in rows})
+
+    def mask(self, category: str) -> int:
+        row = self._rows.get(category)
+        return (row.recent_mask or 0) if row is not None else 0
+
+    def choose(self, rng: random.Random, category: str, templates: Sequence[T]) -> T:
+        """Pick a template from `category` that the student hasn't seen this cycle"""
+        if len(templates) <= 1 or len(templates) > MAX_ROTATED_TEMPLATES:
+            return rng.choice(templates)
+
+        index, new_mask = pick_from_mask(rng, len(templates), self.mask(category))
+
+        row = self._rows.get(category)
+        if row is None:
+            statement = upsert_rotation(self.db.get_bind().dialect.name, self.student_id, category, new_mask)
+            self._rows[category] = self.db.scalars(
+                statement, execution_options={"populate_existing": True}
+            ).one()
+        else:
+            row.recent_mask = new_mask
+
+        return templates[index]
@@ -0,0 +1,176 @@
+"""
+In-process publish/subscribe for live student updates (Server-Sent Events).
+
+Routes publish small events after their transaction commits: goals
+completed, performance records logged, anxiety signals detected, confidence
+score changed. Every open GET /api/v1/students/{id}/events connection for
+that student holds a Subscription with a bounded buffer. Publishing never
+blocks: when a slow client's buffer is full the oldest event is dropped,
+and the client gets a `dropped` event telling it to refetch instead.
+
+The broker lives in one process. With several API workers a client only
+sees events published by the worker its connection landed on, so
+multi-worker deployments should route a student's stream and writes to the
+same worker, or treat the stream as a hint and keep an occasional refetch.
+
+Configuration (environment):
+- EXAM_EVENT_BUFFER: events buffered per connection (default 100).
+- EXAM_EVENT_KEEPALIVE: seconds between keep-alive comments (default 15).
+"""
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from monitoring.metrics import metrics_registry
+
+EVENT_BUFFER = int(os.environ.get("EXAM_EVENT_BUFFER", "100"))
+EVENT_KEEPALIVE = float(os.environ.get("EXAM_EVENT_KEEPALIVE", "15"))
+
+# Browsers' EventSource reconnects after this many milliseconds
+RETRY_MS = 3000
+
+
+class Subscription:
+    """One connection's buffer; filled from any thread, drained on its event loop"""
+
+    def __init__(self, student_id: int, maxsize: int, loop: asyncio.AbstractEventLoop):
+        self.student_id = student_id
+        self.events: deque = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def push(self, event: Dict) -> bool:
+        """Buffer an event; returns False when it pushed out the oldest one"""
+        with self._lock:
+            full = len(self.events) == self.events.maxlen
+            if full:
+                self.dropped += 1
+            self.events.append(event)
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # the connection's loop is gone; it is being unsubscribed
+        return not full
+
+    async def get(self, timeout: float) -> Tuple[List[Dict], int]:
+        """Buffered events and the number dropped since the last call; ([], 0) after `timeout`"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return [], 0
+        with self._lock:
+            events, dropped = list(self.events), self.dropped
+            self.events.clear()
+            self.dropped = 0
+            self._ready.clear()
+        return events, dropped
+
+
+class EventBroker:
+    """Fan-out of per-student events to the subscriptions open in this process"""
+
+    def __init__(self, buffer_size: int = EVENT_BUFFER):
+        self.buffer_size = buffer_size
+        self._subscriptions: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, student_id: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        subscription = Subscription(student_id, self.buffer_size, loop or asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(student_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.student_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.student_id]
+
+    def has_subscribers(self, student_id: int) -> bool:
+        return student_id in self._subscriptions
+
+    def publish(self, student_id: int, event_type: str, data) -> int:
+        """Send an event to the student's open streams; returns how many received it"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(student_id, ()))
+            event_id = next(self._ids)
+            self.published += 1
+        if not subscriptions:
+            return 0
+        event = {"id": event_id, "event": event_type, "data": data, "at": round(time.time(), 3)}
+        dropped = sum(not subscription.push(event) for subscription in subscriptions)
+        with self._lock:
+            self.delivered += len(subscriptions)
+            self.dropped += dropped
+        return len(subscriptions)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "subscribers": sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": self.dropped
+            }
+
+    def render_lines(self) -> List[str]:
+        stats = self.stats()
+        return [
+            "# HELP event_stream_subscribers Open student event streams", "# TYPE event_stream_subscribers gauge",
+            f"event_stream_subscribers {stats['subscribers']}",
+            "# HELP event_stream_events_total Student events by outcome", "# TYPE event_stream_events_total counter",
+            f'event_stream_events_total{{outcome="published"}} {stats["published"]}',
+            f'event_stream_events_total{{outcome="delivered"}} {stats["delivered"]}',
+            f'event_stream_events_total{{outcome="dropped"}} {stats["dropped"]}'
+        ]
+
+
+def format_sse(event_type: str, data, event_id: Optional[int] = None) -> str:
+    """One Server-Sent Events message"""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event_type}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":"), default=str))
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(broker: EventBroker, subscribe: Callable[[], Subscription],
+                       is_disconnected: Callable[[], Awaitable[bool]],
+                       keepalive: float = EVENT_KEEPALIVE) -> AsyncIterator[str]:
+    """
+    SSE text for the subscription `subscribe` opens, until the client
+    disconnects; always unsubscribes. Subscribing happens on the first
+    iteration, so a response whose body never starts (the client left
+    first) never holds a subscription.
+    """
+    subscription = subscribe()
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while not await is_disconnected():
+            events, dropped = await subscription.get(keepalive)
+            if dropped:
+                yield format_sse("dropped", {"count": dropped})
+            for event in events:
+                yield format_sse(event["event"], {"student_id": subscription.student_id, "at": event["at"],
+                                                  **event["data"]}, event["id"])
+            if not events and not dropped:
+                yield ": keep-alive\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+# Process-wide broker
+event_broker = EventBroker()
+metrics_registry.register_collector(event_broker.render_lines)
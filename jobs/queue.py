@@ -0,0 +1,336 @@
+"""
+Durable background job queue on a local SQLite file - no broker needed.
+
+Heavy endpoints can enqueue their work (`?async=true`) and return 202 with a
+job id; worker threads claim jobs and run the handler registered for the
+job's type, and GET /api/v1/jobs/{id} reports status and result.
+
+- Durability: jobs live in the queue file. A running job's lease is renewed
+  while its handler runs; a job whose worker died keeps status "running"
+  until its lease expires, then is retried like a failure. Results are only
+  recorded by the attempt that currently holds the job.
+- Priority: higher first, then oldest first.
+- Retries: a handler exception requeues the job with exponential backoff
+  until max_attempts, then marks it failed with the last error.
+- Concurrency: each job type has a limit on jobs running at once, enforced
+  across every process that shares the file (claims run in BEGIN IMMEDIATE
+  transactions).
+
+Configuration (environment):
+- EXAM_JOBS_DB: queue file (default ./exam_jobs.db), or ":memory:" for a
+  queue private to this process (tests).
+- EXAM_JOB_WORKERS: worker threads each API process starts (default 2); 0
+  leaves jobs to a dedicated `python -m jobs.worker` process.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOBS_DB_PATH = os.environ.get("EXAM_JOBS_DB", "./exam_jobs.db")
+JOB_WORKERS = int(os.environ.get("EXAM_JOB_WORKERS", "2"))
+
+JOB_STATES = ("queued", "running", "succeeded", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after REAL NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_claim ON jobs (status, priority DESC, id);
+"""
+
+
+class JobType:
+    """How jobs of one type run: handler, default priority, retries, lease and concurrency"""
+
+    def __init__(self, name: str, handler: Callable[[Dict], object], priority: int = 0, max_attempts: int = 3,
+                 concurrency: int = 1, lease_seconds: float = 300.0, retry_backoff: float = 2.0):
+        self.name = name
+        self.handler = handler
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+
+
+class JobQueue:
+    """
+    The queue file plus the job types this process can run. One connection
+    per process, used under a lock; the operations are a few small
+    statements each.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.types: Dict[str, JobType] = {}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._inherited: List[sqlite3.Connection] = []
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            if self._conn is not None:
+                # Inherited across fork; closing it would upset the parent's SQLite locks
+                self._inherited.append(self._conn)
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None,
+                                   check_same_thread=False)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+            self.worker_id = f"{socket.gethostname()}:{self._pid}"
+        return self._conn
+
+    def register(self, name: str, handler: Callable[[Dict], object], **options) -> JobType:
+        """Declare a job type; see JobType for options"""
+        job_type = self.types[name] = JobType(name, handler, **options)
+        return job_type
+
+    def enqueue(self, job_type: str, payload: Dict, priority: Optional[int] = None, delay: float = 0.0) -> int:
+        """Store a job and return its id"""
+        spec = self.types[job_type]
+        now = time.time()
+        with self._lock:
+            return self._connection().execute(
+                "INSERT INTO jobs (type, payload, priority, max_attempts, run_after, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_type, json.dumps(payload), spec.priority if priority is None else priority,
+                 spec.max_attempts, now + delay, now)
+            ).lastrowid
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def claim(self) -> Optional[Dict]:
+        """
+        Take the highest-priority runnable job whose type is under its
+        concurrency limit, or None. Expired leases count as runnable.
+        """
+        if not self.types:
+            return None
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Workers that died on their last attempt leave nothing to retry
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'worker lost (lease expired)'), "
+                    "finished_at = ?, lease_until = NULL "
+                    "WHERE status = 'running' AND lease_until <= ? AND attempts >= max_attempts", (now, now)
+                )
+                running = dict(conn.execute(
+                    "SELECT type, COUNT(*) FROM jobs WHERE status = 'running' AND lease_until > ? GROUP BY type",
+                    (now,)
+                ).fetchall())
+                open_types = [name for name, spec in self.types.items() if running.get(name, 0) < spec.concurrency]
+                row = None
+                if open_types:
+                    marks = ",".join("?" * len(open_types))
+                    row = conn.execute(
+                        f"SELECT * FROM jobs WHERE type IN ({marks}) AND ("
+                        "(status = 'queued' AND run_after <= ?) OR (status = 'running' AND lease_until <= ?)"
+                        ") ORDER BY priority DESC, id LIMIT 1",
+                        (*open_types, now, now)
+                    ).fetchone()
+                if row is not None:
+                    lease = self.types[row["type"]].lease_seconds
+                    row = conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, "
+                        "lease_until = ?, worker = ? WHERE id = ? RETURNING *",
+                        (now, now + lease, self.worker_id, row["id"])
+                    ).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return _job_dict(row) if row else None
+
+    def _owned(self, job: Dict) -> tuple:
+        """WHERE clause and parameters matching only the attempt `job` was claimed as"""
+        return "id = ? AND status = 'running' AND worker = ? AND attempts = ?", (job["id"], job["worker"], job["attempts"])
+
+    def renew(self, job: Dict) -> bool:
+        """Extend the lease of a claimed job; False once another attempt has taken it over"""
+        where, params = self._owned(job)
+        lease_until = time.time() + self.types[job["type"]].lease_seconds
+        with self._lock:
+            return self._connection().execute(
+                f"UPDATE jobs SET lease_until = ? WHERE {where}", (lease_until, *params)
+            ).rowcount == 1
+
+    def complete(self, job: Dict, result) -> bool:
+        """Record a claimed job's result; False (and nothing written) if the attempt lost the job"""
+        where, params = self._owned(job)
+        with self._lock:
+            return self._connection().execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, finished_at = ?, lease_until = NULL "
+                f"WHERE {where}", (json.dumps(result), time.time(), *params)
+            ).rowcount == 1
+
+    def fail(self, job: Dict, error: str) -> Optional[str]:
+        """
+        Record a failed attempt: requeue with backoff, or fail for good.
+        Returns the new status, or None if the attempt lost the job.
+        """
+        spec = self.types.get(job["type"])
+        now = time.time()
+        retry = spec is not None and job["attempts"] < job["max_attempts"]
+        where, params = self._owned(job)
+        with self._lock:
+            if retry:
+                delay = spec.retry_backoff * 2 ** (job["attempts"] - 1)
+                updated = self._connection().execute(
+                    f"UPDATE jobs SET status = 'queued', error = ?, run_after = ?, lease_until = NULL WHERE {where}",
+                    (error, now + delay, *params)
+                ).rowcount
+            else:
+                updated = self._connection().execute(
+                    f"UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, lease_until = NULL WHERE {where}",
+                    (error, now, *params)
+                ).rowcount
+        if not updated:
+            return None
+        return "queued" if retry else "failed"
+
+    def run_one(self) -> Optional[Dict]:
+        """Claim and run one job in this thread; returns the claimed job, or None if nothing was runnable"""
+        job = self.claim()
+        if job is None:
+            return None
+        spec = self.types[job["type"]]
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_leased, args=(job, max(spec.lease_seconds / 3, 0.05), done),
+                                     name=f"job-lease-{job['id']}", daemon=True)
+        heartbeat.start()
+        try:
+            result = spec.handler(job["payload"])
+        except Exception as e:
+            status = self.fail(job, f"{type(e).__name__}: {e}")
+            logger.warning("Job %s (%s) attempt %s failed, now %s: %s", job["id"], job["type"], job["attempts"],
+                           status or "taken over", e)
+        else:
+            if not self.complete(job, result):
+                logger.warning("Job %s (%s) attempt %s finished after losing its lease; result dropped",
+                               job["id"], job["type"], job["attempts"])
+        finally:
+            done.set()
+            heartbeat.join()
+        return job
+
+    def _keep_leased(self, job: Dict, interval: float, done: threading.Event):
+        """Renew a running job's lease every `interval` seconds until `done`"""
+        while not done.wait(interval):
+            try:
+                if not self.renew(job):
+                    return
+            except sqlite3.Error:
+                logger.exception("Could not renew the lease of job %s", job["id"])
+
+    def run_pending(self) -> int:
+        """Run every job that is runnable now, in this thread; returns how many ran"""
+        ran = 0
+        while self.run_one() is not None:
+            ran += 1
+        return ran
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {state: dict(rows).get(state, 0) for state in JOB_STATES}
+
+    def clear(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM jobs")
+
+
+def _job_dict(row: sqlite3.Row) -> Dict:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+    return job
+
+
+class JobWorkerPool:
+    """Threads that claim and run jobs until stopped"""
+
+    def __init__(self, queue: JobQueue, threads: int = JOB_WORKERS, poll_interval: float = 0.5):
+        self.queue = queue
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+    def start(self):
+        self._stop.clear()
+        for i in range(self.threads):
+            worker = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.run_one()
+            except Exception:
+                logger.exception("Job worker error")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+
+    def stop(self, timeout: float = 10.0):
+        """Stop claiming; running jobs finish first (up to timeout)"""
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+
+def session_job(work: Callable[..., object]) -> Callable[[Dict], object]:
+    """Handler that runs work(db, payload) in its own session, rolled back if it raises"""
+    def handler(payload: Dict):
+        from database.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return work(db, payload)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    return handler
+
+
+# Process-wide queue; job types register themselves where their work lives
+job_queue = JobQueue()
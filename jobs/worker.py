@@ -0,0 +1,52 @@
+"""
+Dedicated job worker process, for deployments that run API workers with
+EXAM_JOB_WORKERS=0:
+
+    EXAM_CACHE=./exam_cache.db python -m jobs.worker --threads 4
+    EXAM_CACHE=./exam_cache.db python -m jobs.worker --drain   # run what is queued now, then exit
+
+Jobs invalidate cached per-student values, so the worker must share the API's
+cache file (EXAM_CACHE); with the default in-process cache the API would keep
+serving stale values, and the worker refuses to start.
+"""
+import argparse
+import logging
+import signal
+import sys
+import threading
+
+from cache.store import shared_cache
+from jobs.queue import JOB_WORKERS, JobWorkerPool, job_queue
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m jobs.worker")
+    parser.add_argument("--threads", type=int, default=max(JOB_WORKERS, 1))
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--drain", action="store_true", help="run the jobs that are runnable now and exit")
+    args = parser.parse_args(argv)
+    if shared_cache.backend == "memory":
+        parser.error("EXAM_CACHE must name the API's shared cache file (e.g. ./exam_cache.db); "
+                     "invalidations from a private in-process cache never reach the API")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # Job types register themselves in the route modules
+    import main  # noqa: F401
+
+    if args.drain:
+        print(f"Ran {job_queue.run_pending()} job(s); queue: {job_queue.counts()}")
+        return 0
+
+    stopped = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopped.set())
+    pool = JobWorkerPool(job_queue, args.threads, args.poll_interval)
+    pool.start()
+    logging.getLogger(__name__).info("Job worker running %s thread(s) on %s", args.threads, job_queue.path)
+    stopped.wait()
+    pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
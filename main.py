@@ -1,19 +1,49 @@
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+import argparse
+import logging
+import os
 import uvicorn
 from typing import List
 
-from database.database import engine, Base
+from database.database import get_engine
+from database.migrate import migrate
 from database.models import Student, Topic, PerformanceRecord, MicroGoal, AnxietySignal, EncouragementMessage
 from schemas.student import StudentCreate, StudentResponse
 from schemas.micro_goal import MicroGoalResponse
 from schemas.anxiety_signal import AnxietySignalResponse
 from schemas.encouragement import EncouragementResponse
 from schemas.progress import ProgressResponse
-from api import student_routes, micro_goal_routes, anxiety_signal_routes, encouragement_routes, progress_routes
+from api import student_routes, micro_goal_routes, anxiety_signal_routes, encouragement_routes, progress_routes, admin_routes, job_routes, event_routes
+from encouragement.nlp import nlp_model_manager, current_rss_mb
+from cache.store import CACHE_URL, SHARED_CACHE_PATH, build_cache
+from jobs.queue import JOB_WORKERS, JobWorkerPool, job_queue
+from monitoring.metrics import metrics_registry
+from monitoring.middleware import MetricsMiddleware, install_sqlalchemy_hooks
+from monitoring.sql_profiler import SQL_PROFILE_ENABLED, SQLProfilerMiddleware
+from monitoring.profiling import ProfilingMiddleware, request_profiler
+from monitoring.traffic_capture import TRAFFIC_CAPTURE_PATH, TrafficCaptureMiddleware
+from utils.warmup import CREATE_SCHEMA, WARMUP_MODE, StartupWarmup, import_heavy_modules
 
-# Create tables
-Base.metadata.create_all(bind=engine) 
+logger = logging.getLogger(__name__)
+
+# NLP warmup: "0" loads lazily on first use, "startup" loads in each worker's
+# startup hook, "import" loads now so pre-fork servers
+# (e.g. gunicorn --preload -k uvicorn.workers.UvicornWorker main:app)
+# share one copy of the model across workers
+NLP_WARMUP = os.environ.get("EXAM_NLP_WARMUP", "0")
+if NLP_WARMUP == "import":
+    nlp_model_manager.warmup()
+
+# Schema creation and library preloading run after startup (see utils/warmup.py)
+startup_warmup = StartupWarmup(WARMUP_MODE)
+if CREATE_SCHEMA:
+    startup_warmup.add("schema", lambda: migrate(get_engine()), deferred=False)
+if WARMUP_MODE != "off":
+    startup_warmup.add("imports", import_heavy_modules)
+if NLP_WARMUP == "startup":
+    startup_warmup.add("nlp", nlp_model_manager.warmup)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -31,16 +61,94 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request SQL summaries (EXAM_SQL_PROFILE=1): repeated and slow statements
+if SQL_PROFILE_ENABLED:
+    app.add_middleware(SQLProfilerMiddleware)
+
+# Opt-in sanitized request traces for replay (EXAM_TRAFFIC_CAPTURE=<file>)
+if TRAFFIC_CAPTURE_PATH:
+    app.add_middleware(TrafficCaptureMiddleware, path=TRAFFIC_CAPTURE_PATH)
+
+# On-demand cProfile / stack-sample captures (armed via /api/v1/admin/profiling/arm or X-Profile)
+app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+
+# Per-route latency, status, size and DB metrics (outermost, so it times everything)
+install_sqlalchemy_hooks()
+app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
 # Include API routes
 app.include_router(student_routes.router, prefix="/api/v1", tags=["students"])
 app.include_router(micro_goal_routes.router, prefix="/api/v1", tags=["micro-goals"])
 app.include_router(anxiety_signal_routes.router, prefix="/api/v1", tags=["anxiety-signals"])
 app.include_router(encouragement_routes.router, prefix="/api/v1", tags=["encouragements"])
 app.include_router(progress_routes.router, prefix="/api/v1", tags=["progress"])
+app.include_router(admin_routes.router, prefix="/api/v1", tags=["admin"])
+app.include_router(job_routes.router, prefix="/api/v1", tags=["jobs"])
+app.include_router(event_routes.router, prefix="/api/v1", tags=["events"])
+
+# Background job workers for async=true requests (EXAM_JOB_WORKERS=0: a separate `python -m jobs.worker`)
+job_workers = JobWorkerPool(job_queue, JOB_WORKERS)
+
+@app.on_event("startup")
+def warm_up_models():
+    startup_warmup.start()
+    if JOB_WORKERS > 0:
+        job_workers.start()
+    logger.info("API worker %s started, RSS %s MB, warmup %s", os.getpid(), current_rss_mb(), WARMUP_MODE)
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    job_workers.stop()
 
 @app.get("/")
 async def root():
     return {"message": "AI-Driven Exam Anxiety Reduction System"}
 
+@app.get("/ready")
+def readiness():
+    """
+    Warmup state of this worker; 503 until schema creation and preloading finish
+    """
+    stats = startup_warmup.stats()
+    return JSONResponse(stats, status_code=200 if stats["ready"] else 503)
+
+@app.get("/health/nlp")
+def nlp_status():
+    """
+    Report NLP model load state, load time and process memory
+    """
+    return nlp_model_manager.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Request metrics in the Prometheus text exposition format
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 1):
+    """
+    Run the API. With several workers uvicorn imports main:app in each worker
+    process, so the in-process cache is swapped for a shared SQLite file
+    (EXAM_CACHE, default ./exam_cache.db) that every worker reads and
+    invalidates. Each launch starts from an empty cache, since the database
+    may have changed while the API was down.
+    """
+    if workers <= 1:
+        uvicorn.run(app, host=host, port=port)
+        return
+    if CACHE_URL == "memory":
+        os.environ["EXAM_CACHE"] = os.path.abspath(SHARED_CACHE_PATH)
+    cache = build_cache(os.environ["EXAM_CACHE"])
+    cache.clear()
+    cache.close()
+    uvicorn.run("main:app", host=host, port=port, workers=workers)
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    parser = argparse.ArgumentParser(prog="python main.py")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("EXAM_WORKERS", "1")),
+                        help="worker processes sharing one cache (default: EXAM_WORKERS or 1)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
@@ -1,14 +1,26 @@
 import random
-from datetime import datetime, timedelta
-from typing import List, Dict
-import pandas as pd
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, List, Dict, Optional
 from sqlalchemy.orm import Session
 
-from database.models import PerformanceRecord, Topic, MicroGoal
+from database.models import PerformanceRecord, Topic, MicroGoal, Student, StudentSyllabus
 from schemas.micro_goal import MicroGoalCreate
+from topic_scheduler.engine import topic_scheduler_engine
+from micro_goals.optimizer import goal_packing_optimizer
+from monitoring.profiling import phase_timers, profiled
+from utils.rng import derive_rng
+from utils.singleflight import coalesced
+from utils.templates import TemplateCatalog, template_registry
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class MicroGoalEngine:
+    # Bump whenever templates or selection logic change, so seeded outputs
+    # (and anything cached or benchmarked against them) are not mixed up
+    ENGINE_VERSION = "micro_goals/1"
+
     def __init__(self):
         self.time_box_options = {
             "short": (10, 20),      # 10-20 minutes
@@ -16,83 +28,124 @@ class MicroGoalEngine:
             "long": (35, 50)        # 35-50 minutes
         }
         
-        self.goal_templates = {
-            "revision": [
-                "Revise {topic_name} formulas/concepts ({time_estimate} mins)",
-                "Review {topic_name} key points ({time_estimate} mins)",
-                "Go through {topic_name} notes ({time_estimate} mins)"
-            ],
-            "practice": [
-                "Attempt {num_questions} {difficulty} questions from {topic_name} ({time_estimate} mins)",
-                "Solve {num_questions} {difficulty} problems on {topic_name} ({time_estimate} mins)",
-                "Practice {topic_name} with {num_questions} questions - no time pressure ({time_estimate} mins)"
-            ],
-            "conceptual": [
-                "Understand core concepts of {topic_name} ({time_estimate} mins)",
-                "Focus on {topic_name} fundamentals ({time_estimate} mins)",
-                "Clear {topic_name} doubts ({time_estimate} mins)"
-            ]
+        # Candidates generated per source before packing into the daily budget
+        self.candidate_counts = {
+            "weak": 2,
+            "inactive": 2
         }
+        self.default_daily_minutes = 60
+        
+        # Goal templates live in templates/micro_goals/<locale>.json
+        self.templates = template_registry
+        self.templates.register("micro_goals", {
+            "revision": {"topic_name", "time_estimate"},
+            "practice": {"topic_name", "time_estimate", "num_questions", "difficulty"},
+            "conceptual": {"topic_name", "time_estimate"}
+        })
 
-    def generate_daily_goals(self, db: Session, student_id: int) -> List[MicroGoalCreate]:
+    @coalesced("micro_goals.generate_daily_goals")
+    @profiled("micro_goals")
+    def generate_daily_goals(self, db: Session, student_id: int, day: Optional[date] = None,
+                             variant: int = 0, locale: Optional[str] = None) -> List[MicroGoalCreate]:
         """
         Generate 2-4 small, realistic daily goals based on:
         - Student's syllabus (topics)
         - Performance history
         - Current preparation level
-        """
-        # Get all topics for the student's syllabus
-        topics = db.query(Topic).all()
+        - The student's daily time budget
         
-        # Get recent performance records
-        recent_date = datetime.utcnow() - timedelta(days=7)  # Last 7 days
-        recent_performance = db.query(PerformanceRecord).filter(
-            PerformanceRecord.student_id == student_id,
-            PerformanceRecord.date >= recent_date
-        ).all()
-        
-        # Analyze performance data
-        performance_df = self._create_performance_dataframe(recent_performance)
-        
-        # Generate goals based on performance analysis
-        goals = []
-        
-        # Identify weak areas (low scores or high mistakes)
-        weak_topics = self._identify_weak_topics(performance_df)
-        
-        # Identify topics not practiced recently
-        inactive_topics = self._identify_inactive_topics(topics, recent_performance)
-        
-        # Generate goals based on analysis
-        goals.extend(self._generate_goals_for_weak_topics(weak_topics, 2))  # 2 goals for weak areas
-        goals.extend(self._generate_goals_for_inactive_topics(inactive_topics, 1))  # 1 goal for inactive topics
-        
-        # Add one confidence-building goal
-        goals.append(self._generate_confidence_goal(topics))
-        
-        # Ensure we have 2-4 goals
-        while len(goals) < 2:
-            goals.append(self._generate_additional_goal(topics))
-        
-        # Limit to 4 goals maximum
-        goals = goals[:4]
+        Template and topic choices are seeded by (student_id, day, ENGINE_VERSION,
+        template version, variant), so the same inputs always produce the same goals.
+        """
+        with phase_timers.phase("micro_goals", "load"):
+            templates = self.templates.get("micro_goals", locale)
+            rng = derive_rng(student_id, day, f"{self.ENGINE_VERSION}+templates/{templates.version}", variant)
+            
+            # Get the topics of the syllabi the student is enrolled in
+            syllabus_ids = self._enrolled_syllabus_ids(db, student_id)
+            topics = self._load_syllabus_topics(db, syllabus_ids)
+            
+            # Get recent performance records
+            recent_date = datetime.utcnow() - timedelta(days=7)  # Last 7 days
+            recent_performance = db.query(PerformanceRecord).filter(
+                PerformanceRecord.student_id == student_id,
+                PerformanceRecord.date >= recent_date
+            ).all()
+            daily_budget = self._daily_budget(db, student_id)
         
-        # Convert to MicroGoalCreate objects
-        micro_goals = []
-        for goal in goals:
-            micro_goal = MicroGoalCreate(
-                student_id=student_id,
-                topic_id=goal['topic_id'],
-                goal_text=goal['text'],
-                estimated_time=goal['time'],
-                priority=goal['priority']
+        with phase_timers.phase("micro_goals", "analyze"):
+            # Analyze performance data
+            performance_df = self._create_performance_dataframe(recent_performance)
+            
+            # Identify weak areas (low scores or high mistakes)
+            weak_topics = self._identify_weak_topics(performance_df)
+            
+            # Identify topics due for revision (most overdue first)
+            inactive_topics = self._identify_inactive_topics(
+                db, student_id, self.candidate_counts["inactive"], syllabus_ids
             )
-            micro_goals.append(micro_goal)
+        
+        with phase_timers.phase("micro_goals", "render"):
+            # Generate candidate goals based on analysis
+            goals = []
+            goals.extend(self._generate_goals_for_weak_topics(
+                weak_topics, self.candidate_counts["weak"], rng, templates, topics
+            ))
+            goals.extend(self._generate_goals_for_inactive_topics(
+                inactive_topics, self.candidate_counts["inactive"], rng, templates, topics
+            ))
+            
+            # Add one confidence-building goal
+            goals.append(self._generate_confidence_goal(topics, rng, templates))
+            
+            # Ensure we have 2-4 goals
+            while len(goals) < 2:
+                goals.append(self._generate_additional_goal(topics, rng, templates))
+            
+            # Keep the 2-4 highest-value goals that fit the student's daily budget
+            goals = goal_packing_optimizer.select(goals, daily_budget)
+            
+            # Convert to MicroGoalCreate objects
+            micro_goals = []
+            for goal in goals:
+                micro_goal = MicroGoalCreate(
+                    student_id=student_id,
+                    topic_id=goal['topic_id'],
+                    goal_text=goal['text'],
+                    estimated_time=goal['time'],
+                    priority=goal['priority']
+                )
+                micro_goals.append(micro_goal)
         
         return micro_goals
 
-    def _create_performance_dataframe(self, performance_records: List[PerformanceRecord]) -> pd.DataFrame:
+    def student_topics(self, db: Session, student_id: int) -> List[Topic]:
+        """Topics the student's goals draw on: their enrolled syllabi, or every topic without enrollments"""
+        return self._load_syllabus_topics(db, self._enrolled_syllabus_ids(db, student_id))
+
+    def _enrolled_syllabus_ids(self, db: Session, student_id: int) -> Optional[List[int]]:
+        """Syllabi the student is enrolled in, or None if they have no enrollments"""
+        rows = db.query(StudentSyllabus.syllabus_id).filter(
+            StudentSyllabus.student_id == student_id
+        ).all()
+        return [row[0] for row in rows] or None
+
+    def _load_syllabus_topics(self, db: Session, syllabus_ids: Optional[List[int]]) -> List[Topic]:
+        """Load the topics of the given syllabi (all topics for students without enrollments)"""
+        query = db.query(Topic)
+        if syllabus_ids is not None:
+            query = query.filter(Topic.syllabus_id.in_(syllabus_ids))
+        return query.order_by(Topic.id).all()
+
+    def _daily_budget(self, db: Session, student_id: int) -> int:
+        """Minutes the student plans to study per day"""
+        budget = db.query(Student.daily_study_minutes).filter(Student.id == student_id).scalar()
+        return budget or self.default_daily_minutes
+
+    def _create_performance_dataframe(self, performance_records: List[PerformanceRecord]) -> "pd.DataFrame":
         """Convert performance records to pandas DataFrame for analysis"""
+        import pandas as pd
+
         if not performance_records:
             return pd.DataFrame(columns=['topic_id', 'score', 'time_spent', 'date'])
         
@@ -107,7 +160,7 @@ class MicroGoalEngine:
         
         return pd.DataFrame(data)
 
-    def _identify_weak_topics(self, performance_df: pd.DataFrame) -> List[Dict]:
+    def _identify_weak_topics(self, performance_df: "pd.DataFrame") -> List[Dict]:
         """Identify topics where student is performing poorly"""
         if performance_df.empty:
             return []
@@ -135,13 +188,14 @@ class MicroGoalEngine:
         
         return result
 
-    def _identify_inactive_topics(self, all_topics: List[Topic], recent_performance: List[PerformanceRecord]) -> List[Topic]:
-        """Identify topics that haven't been practiced recently"""
-        active_topic_ids = set(record.topic_id for record in recent_performance)
-        inactive_topics = [topic for topic in all_topics if topic.id not in active_topic_ids]
-        return inactive_topics
+    def _identify_inactive_topics(self, db: Session, student_id: int, count: int,
+                                  syllabus_ids: Optional[List[int]] = None) -> List[Topic]:
+        """Identify topics due for revision according to the spaced-repetition schedule"""
+        return topic_scheduler_engine.due_topics(db, student_id, count, syllabus_ids=syllabus_ids)
 
-    def _generate_goals_for_weak_topics(self, weak_topics: List[Dict], count: int) -> List[Dict]:
+    def _generate_goals_for_weak_topics(self, weak_topics: List[Dict], count: int, rng: random.Random,
+                                        templates: TemplateCatalog,
+                                        fallback_topics: Optional[List[Topic]] = None) -> List[Dict]:
         """Generate goals targeting weak topics"""
         goals = []
         
@@ -149,20 +203,20 @@ class MicroGoalEngine:
             # Select a template based on the weakness
             if weak_topic['avg_score'] < 50:
                 # Very weak topic - focus on revision
-                template = random.choice(self.goal_templates["revision"])
+                template = rng.choice(templates["revision"])
                 time_range = self.time_box_options["medium"]
             else:
                 # Moderately weak - mix of revision and practice
-                template = random.choice(self.goal_templates["practice"])
+                template = rng.choice(templates["practice"])
                 time_range = self.time_box_options["short"]
             
-            time_estimate = random.randint(time_range[0], time_range[1])
+            time_estimate = rng.randint(time_range[0], time_range[1])
             topic_name = f"Topic {weak_topic['topic_id']}"  # In real implementation, get actual topic name
             
-            goal_text = template.format(
+            goal_text = template(
                 topic_name=topic_name,
                 time_estimate=time_estimate,
-                num_questions=random.randint(3, 6),
+                num_questions=rng.randint(3, 6),
                 difficulty="easy"
             )
             
@@ -175,21 +229,23 @@ class MicroGoalEngine:
         
         # If we don't have enough weak topics, add additional goals
         while len(goals) < count:
-            goals.append(self._generate_additional_goal([]))
+            goals.append(self._generate_additional_goal(fallback_topics or [], rng, templates))
         
         return goals
 
-    def _generate_goals_for_inactive_topics(self, inactive_topics: List[Topic], count: int) -> List[Dict]:
+    def _generate_goals_for_inactive_topics(self, inactive_topics: List[Topic], count: int, rng: random.Random,
+                                            templates: TemplateCatalog,
+                                            fallback_topics: Optional[List[Topic]] = None) -> List[Dict]:
         """Generate goals for topics that haven't been practiced recently"""
         goals = []
         
         for i in range(min(count, len(inactive_topics))):
             topic = inactive_topics[i]
-            template = random.choice(self.goal_templates["revision"])
+            template = rng.choice(templates["revision"])
             time_range = self.time_box_options["short"]
-            time_estimate = random.randint(time_range[0], time_range[1])
+            time_estimate = rng.randint(time_range[0], time_range[1])
             
-            goal_text = template.format(
+            goal_text = template(
                 topic_name=topic.name,
                 time_estimate=time_estimate
             )
@@ -203,23 +259,24 @@ class MicroGoalEngine:
         
         # If no inactive topics, generate additional goals
         while len(goals) < count:
-            goals.append(self._generate_additional_goal(inactive_topics))
+            goals.append(self._generate_additional_goal(fallback_topics or inactive_topics, rng, templates))
         
         return goals
 
-    def _generate_confidence_goal(self, all_topics: List[Topic]) -> Dict:
+    def _generate_confidence_goal(self, all_topics: List[Topic], rng: random.Random,
+                                  templates: TemplateCatalog) -> Dict:
         """Generate a confidence-building goal based on a well-performing topic"""
         # For now, pick a random topic
         if all_topics:
-            topic = random.choice(all_topics)
+            topic = rng.choice(all_topics)
         else:
             topic = type('obj', (object,), {'id': 1, 'name': 'General Topic'})()
         
-        template = random.choice(self.goal_templates["conceptual"])
+        template = rng.choice(templates["conceptual"])
         time_range = self.time_box_options["short"]
-        time_estimate = random.randint(time_range[0], time_range[1])
+        time_estimate = rng.randint(time_range[0], time_range[1])
         
-        goal_text = template.format(
+        goal_text = template(
             topic_name=topic.name,
             time_estimate=time_estimate
         )
@@ -231,22 +288,22 @@ class MicroGoalEngine:
             'priority': 2  # Lower priority for confidence building
         }
 
-    def _generate_additional_goal(self, all_topics: List[Topic]) -> Dict:
+    def _generate_additional_goal(self, all_topics: List[Topic], rng: random.Random,
+                                  templates: TemplateCatalog) -> Dict:
         """Generate an additional goal when we don't have enough targets"""
         if all_topics:
-            topic = random.choice(all_topics)
+            topic = rng.choice(all_topics)
         else:
             topic = type('obj', (object,), {'id': 1, 'name': 'General Topic'})()
         
-        templates = self.goal_templates["revision"] + self.goal_templates["practice"]
-        template = random.choice(templates)
+        template = rng.choice(templates["revision"] + templates["practice"])
         time_range = self.time_box_options["short"]
-        time_estimate = random.randint(time_range[0], time_range[1])
+        time_estimate = rng.randint(time_range[0], time_range[1])
         
-        goal_text = template.format(
+        goal_text = template(
             topic_name=topic.name,
             time_estimate=time_estimate,
-            num_questions=random.randint(3, 5),
+            num_questions=rng.randint(3, 5),
             difficulty="easy"
         )
         
@@ -0,0 +1,138 @@
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class GoalPackingOptimizer:
+    def __init__(self, min_goals: int = 2, max_goals: int = 4, time_unit: int = 5):
+        self.min_goals = min_goals
+        self.max_goals = max_goals
+        self.time_unit = time_unit  # minutes per DP bucket
+
+        # Value of a goal by priority level (1-5); convex so one high-priority
+        # goal outweighs several low-priority ones
+        self.priority_weights = {1: 1.0, 2: 2.0, 3: 3.0, 4: 5.0, 5: 8.0}
+
+    def _units(self, minutes: int) -> int:
+        """Round a duration up to whole DP buckets so packed goals never exceed the budget"""
+        return -(-int(minutes) // self.time_unit)
+
+    def _budget_units(self, minutes: int) -> int:
+        """Round the budget down to whole DP buckets (never below 0) so it is never overrun"""
+        return max(int(minutes or 0), 0) // self.time_unit
+
+    def select(self, goals: List[Dict], budget_minutes: int) -> List[Dict]:
+        """
+        Pick the 2-4 goals with the highest total priority weight whose
+        estimated times fit in the student's daily budget (0/1 knapsack
+        with a cardinality bound). Falls back to the shortest goals when
+        no feasible set of min_goals exists.
+        """
+        if len(goals) <= self.min_goals:
+            return list(goals)
+
+        budget = self._budget_units(budget_minutes)
+        weights = [self._units(goal['time']) for goal in goals]
+        values = [self.priority_weights.get(goal['priority'], 1.0) for goal in goals]
+
+        # best[k][t] = (value, chosen bitmask) using exactly k goals within t buckets
+        best: List[List[Optional[tuple]]] = [[None] * (budget + 1) for _ in range(self.max_goals + 1)]
+        best[0] = [(0.0, 0)] * (budget + 1)
+
+        for i, (weight, value) in enumerate(zip(weights, values)):
+            if weight > budget:
+                continue
+            bit = 1 << i
+            for k in range(min(i + 1, self.max_goals), 0, -1):
+                prev_row = best[k - 1]
+                row = best[k]
+                for t in range(budget, weight - 1, -1):
+                    prev = prev_row[t - weight]
+                    if prev is None:
+                        continue
+                    candidate = prev[0] + value
+                    current = row[t]
+                    if current is None or candidate > current[0]:
+                        row[t] = (candidate, prev[1] | bit)
+
+        chosen = None
+        for k in range(self.min_goals, self.max_goals + 1):
+            entry = best[k][budget]
+            if entry is not None and (chosen is None or entry[0] > chosen[0]):
+                chosen = entry
+
+        if chosen is None:
+            order = sorted(range(len(goals)), key=lambda i: (weights[i], -values[i]))
+            selected = order[:self.min_goals]
+        else:
+            selected = [i for i in range(len(goals)) if chosen[1] >> i & 1]
+
+        # Highest priority first, ties keep generation order
+        selected.sort(key=lambda i: -goals[i]['priority'])
+        return [goals[i] for i in selected]
+
+    def select_cohort(self, times: "np.ndarray", priorities: "np.ndarray", budgets: "np.ndarray") -> "np.ndarray":
+        """
+        Vectorized select() over a cohort.
+
+        times, priorities: (students, candidates) arrays; pad missing
+        candidates with priority 0. budgets: (students,) minutes.
+        Returns a boolean (students, candidates) selection mask.
+        """
+        import numpy as np
+
+        times = np.asarray(times)
+        priorities = np.asarray(priorities)
+        n_students, n_candidates = times.shape
+        if n_candidates > 62:
+            raise ValueError("select_cohort supports at most 62 candidates per student")
+
+        weight_table = np.zeros(6)
+        for level, weight in self.priority_weights.items():
+            weight_table[level] = weight
+        valid = priorities > 0
+        values = np.where(valid, weight_table[np.clip(priorities, 0, 5).astype(int)], 0.0)
+        weights = -(-times.astype(np.int64) // self.time_unit)
+        budget_units = np.clip(np.asarray(budgets, dtype=np.int64), 0, None) // self.time_unit
+        max_budget = int(budget_units.max()) if n_students else 0
+
+        rows = np.arange(n_students)[:, None]
+        columns = np.arange(max_budget + 1)[None, :]
+        dp = np.full((self.max_goals + 1, n_students, max_budget + 1), -np.inf)
+        dp[0] = 0.0
+        masks = np.zeros((self.max_goals + 1, n_students, max_budget + 1), dtype=np.int64)
+
+        for i in range(n_candidates):
+            shifted = columns - weights[:, i][:, None]
+            in_range = (shifted >= 0) & valid[:, i][:, None]
+            source = np.clip(shifted, 0, None)
+            for k in range(min(i + 1, self.max_goals), 0, -1):
+                candidate = np.where(in_range, dp[k - 1][rows, source] + values[:, i][:, None], -np.inf)
+                better = candidate > dp[k]
+                dp[k] = np.where(better, candidate, dp[k])
+                masks[k] = np.where(better, masks[k - 1][rows, source] | (1 << i), masks[k])
+
+        student_index = np.arange(n_students)
+        final_values = dp[self.min_goals:, student_index, budget_units]
+        final_masks = masks[self.min_goals:, student_index, budget_units]
+        best_k = np.argmax(final_values, axis=0)
+        chosen_masks = final_masks[best_k, student_index]
+        feasible = np.isfinite(final_values[best_k, student_index])
+
+        bits = np.int64(1) << np.arange(n_candidates, dtype=np.int64)
+        selection = (chosen_masks[:, None] & bits[None, :]) != 0
+
+        # Same fallback as select(): the shortest valid goals
+        if not feasible.all():
+            ordered = np.argsort(np.where(valid, weights, np.iinfo(np.int64).max), axis=1, kind="stable")
+            for s in np.flatnonzero(~feasible):
+                selection[s] = False
+                picks = ordered[s, :self.min_goals]
+                selection[s, picks[valid[s, picks]]] = True
+
+        return selection
+
+
+# Initialize the goal packing optimizer
+goal_packing_optimizer = GoalPackingOptimizer()
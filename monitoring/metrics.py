@@ -0,0 +1,156 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Bucket upper bounds (Prometheus "le"), shared by every route
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observing a value touches preallocated slots only"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (None,), self.counts):
+            total += count
+            buckets.append(("+Inf" if bound is None else _format_number(bound), total))
+        return buckets
+
+
+class RouteStats:
+    """Everything recorded for one (method, route template) pair"""
+    __slots__ = ("latency", "response_size", "db_queries", "db_time", "status_classes", "exceptions")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+        self.db_queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.status_classes = [0] * 6  # index = status // 100
+        self.exceptions = 0
+
+
+class RequestStats:
+    """Per-request DB counters, filled in by the SQLAlchemy event hooks"""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Stats of the request being handled; copied into worker threads with the context
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class MetricsRegistry:
+    """
+    Process-wide request metrics rendered in the Prometheus text format.
+    Recording happens on the event loop thread (see MetricsMiddleware), so
+    only creating a route's stats and rendering take the lock.
+    """
+
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+        self._collectors: List[Callable[[], List[str]]] = []
+        self.in_flight = 0
+
+    def register_collector(self, collector: Callable[[], List[str]]):
+        """Add a callable returning extra exposition lines (e.g. engine phase timings)"""
+        self._collectors.append(collector)
+
+    def route(self, method: str, template: str) -> RouteStats:
+        key = (method, template)
+        stats = self._routes.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._routes.setdefault(key, RouteStats())
+        return stats
+
+    def record(self, method: str, template: str, status: int, seconds: float, size: int,
+               request: RequestStats, failed: bool = False):
+        stats = self.route(method, template)
+        stats.latency.observe(seconds)
+        stats.response_size.observe(size)
+        stats.db_queries.observe(request.queries)
+        stats.db_time.observe(request.db_seconds)
+        stats.status_classes[min(status // 100, 5)] += 1
+        if failed:
+            stats.exceptions += 1
+
+    def render(self) -> str:
+        with self._lock:
+            routes = sorted(self._routes.items())
+
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Requests by route and status class",
+            "# TYPE http_requests_total counter"
+        ]
+        for (method, template), stats in routes:
+            for status_class, count in enumerate(stats.status_classes):
+                if count:
+                    lines.append(f'http_requests_total{{{_labels(method, template)},status="{status_class}xx"}} {count}')
+
+        lines += [
+            "# HELP http_request_exceptions_total Requests that raised an unhandled exception",
+            "# TYPE http_request_exceptions_total counter"
+        ]
+        for (method, template), stats in routes:
+            lines.append(f"http_request_exceptions_total{{{_labels(method, template)}}} {stats.exceptions}")
+
+        for name, attribute, help_text in (
+            ("http_request_duration_seconds", "latency", "Request latency"),
+            ("http_response_size_bytes", "response_size", "Response body size"),
+            ("db_queries_per_request", "db_queries", "SQL statements executed per request"),
+            ("db_time_per_request_seconds", "db_time", "Time spent in SQL statements per request")
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, template), stats in routes:
+                histogram = getattr(stats, attribute)
+                labels = _labels(method, template)
+                for le, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {_format_number(histogram.sum)}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        for collector in self._collectors:
+            lines += collector()
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+def _labels(method: str, template: str) -> str:
+    template = template.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{template}"'
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Initialize the metrics registry
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,80 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from monitoring.metrics import MetricsRegistry, RequestStats, current_request_stats, metrics_registry
+
+# Label for requests that matched no route, so stray paths can't create new series
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status, response size and DB
+    usage per route template (e.g. /api/v1/micro-goals/{student_id}).
+    The template comes from the route FastAPI stores in the scope while routing.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        request = RequestStats()
+        token = current_request_stats.set(request)
+        status = 500
+        size = 0
+        failed = False
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.in_flight -= 1
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or UNMATCHED_ROUTE
+            registry.record(scope["method"], template, status, elapsed, size, request, failed)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    request = current_request_stats.get()
+    if request is not None:
+        request.queries += 1
+        request.db_seconds += time.perf_counter() - context._metrics_started
+
+
+_hooks_installed = False
+
+
+def install_sqlalchemy_hooks():
+    """Count statements and DB time for the current request on every engine"""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _hooks_installed = True
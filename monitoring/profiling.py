@@ -0,0 +1,316 @@
+"""
+Profiling surface for the engines' hot paths.
+
+- phase_timers: always-on per-phase timings (load, analyze, render, persist)
+  exported through /metrics as engine_phase_seconds histograms.
+- @profiled(engine): times a whole engine call (engine_call_seconds) and, while
+  a request is being captured, profiles the thread running it.
+- request_profiler + ProfilingMiddleware: capture the next N requests (armed via
+  the admin endpoint) or a single request sent with X-Profile, either with
+  cProfile (.pstats) or a stack sampler (.collapsed, flamegraph-ready).
+"""
+import cProfile
+import functools
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+
+from monitoring.metrics import LATENCY_BUCKETS, Histogram, metrics_registry
+
+PROFILE_DIR = os.environ.get("EXAM_PROFILE_DIR", "profiles")
+ADMIN_TOKEN = os.environ.get("EXAM_ADMIN_TOKEN") or None
+PROFILE_MODES = ("sample", "cprofile")
+
+
+class PhaseTimers:
+    """Latency histograms per (engine, phase) and per (engine, call)"""
+
+    def __init__(self):
+        self._phases: Dict[Tuple[str, str], Histogram] = {}
+        self._calls: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, engine: str, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._observe(self._phases, engine, name, elapsed)
+            capture = current_capture.get()
+            if capture is not None:
+                capture.phases.append((engine, name, round(elapsed * 1000, 3)))
+
+    def observe_call(self, engine: str, name: str, seconds: float):
+        self._observe(self._calls, engine, name, seconds)
+
+    def _observe(self, histograms: Dict[Tuple[str, str], Histogram], engine: str, name: str, seconds: float):
+        # Engines run in worker threads, so unlike request metrics this needs the lock
+        with self._lock:
+            histogram = histograms.get((engine, name))
+            if histogram is None:
+                histogram = histograms[(engine, name)] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def render_lines(self) -> List[str]:
+        lines = []
+        for metric, label, histograms, help_text in (
+            ("engine_phase_seconds", "phase", self._phases, "Time spent in each engine phase"),
+            ("engine_call_seconds", "call", self._calls, "Duration of profiled engine calls")
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            with self._lock:
+                snapshot = sorted(
+                    (key, list(h.cumulative()), h.sum, h.count) for key, h in histograms.items()
+                )
+            for (engine, name), buckets, total, count in snapshot:
+                labels = f'engine="{engine}",{label}="{name}"'
+                for le, cumulative in buckets:
+                    lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{labels}}} {total!r}")
+                lines.append(f"{metric}_count{{{labels}}} {count}")
+        return lines
+
+
+class ProfileCapture:
+    """One captured request: a cProfile run or stack samples from the threads it used"""
+
+    def __init__(self, label: str, mode: str, interval: float):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.label = label
+        self.mode = mode
+        self.interval = interval
+        self.phases: List[Tuple[str, str, float]] = []
+        self.samples: Counter = Counter()
+        self.started = time.perf_counter()
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+        self._profiling_thread: Optional[int] = None
+        self._threads: Dict[int, int] = {}  # thread ident -> nesting depth
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.mode == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop, name=f"profile-{self.id}", daemon=True)
+            self._sampler.start()
+
+    def enter_thread(self):
+        thread = threading.get_ident()
+        with self._lock:
+            depth = self._threads.get(thread, 0)
+            self._threads[thread] = depth + 1
+            # A cProfile.Profile can only be active in one thread at a time
+            enable = self._profile is not None and depth == 0 and self._profiling_thread is None
+            if enable:
+                self._profiling_thread = thread
+        if enable:
+            self._profile.enable()
+
+    def exit_thread(self):
+        thread = threading.get_ident()
+        with self._lock:
+            depth = self._threads.get(thread, 1) - 1
+            if depth:
+                self._threads[thread] = depth
+            else:
+                self._threads.pop(thread, None)
+            disable = depth == 0 and self._profiling_thread == thread
+            if disable:
+                self._profiling_thread = None
+        if disable:
+            self._profile.disable()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = list(self._threads)
+            for thread in threads:
+                frame = frames.get(thread)
+                if frame is not None:
+                    self.samples[_collapse(frame)] += 1
+
+    def finish(self, directory: str) -> Dict:
+        """Stop sampling and write <id>.json plus <id>.collapsed or <id>.pstats"""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        if self.mode == "sample":
+            path = os.path.join(directory, f"{self.id}.collapsed")
+            with open(path, "w") as f:
+                for stack, count in self.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            files.append(os.path.basename(path))
+        elif self._profile is not None:
+            path = os.path.join(directory, f"{self.id}.pstats")
+            self._profile.dump_stats(path)
+            files.append(os.path.basename(path))
+
+        meta = {
+            "id": self.id,
+            "label": self.label,
+            "mode": self.mode,
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "samples": sum(self.samples.values()),
+            "phases": [{"engine": engine, "phase": name, "ms": ms} for engine, name, ms in self.phases],
+            "files": files
+        }
+        with open(os.path.join(directory, f"{self.id}.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        return meta
+
+
+def _collapse(frame) -> str:
+    """Root-first 'a;b;c' stack in the collapsed format used by flamegraph tools"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+# The capture for the request being handled, if it is being profiled
+current_capture: ContextVar[Optional[ProfileCapture]] = ContextVar("current_profile_capture", default=None)
+
+
+class RequestProfiler:
+    """Decides which requests are captured and keeps the resulting files"""
+
+    def __init__(self, directory: str = PROFILE_DIR, admin_token: Optional[str] = ADMIN_TOKEN,
+                 interval: float = 0.005):
+        self.directory = directory
+        self.admin_token = admin_token
+        self.interval = interval
+        self._armed = 0
+        self._armed_mode = "sample"
+        self._lock = threading.Lock()
+
+    def authorized(self, token: Optional[str]) -> bool:
+        """Profiling controls are disabled unless EXAM_ADMIN_TOKEN is set"""
+        return bool(self.admin_token) and token is not None and hmac.compare_digest(token, self.admin_token)
+
+    def arm(self, requests: int, mode: str = "sample") -> Dict:
+        with self._lock:
+            self._armed = requests
+            self._armed_mode = mode
+        return self.status()
+
+    def status(self) -> Dict:
+        return {"armed_requests": self._armed, "mode": self._armed_mode, "directory": self.directory}
+
+    def take(self, header_mode: Optional[str], header_token: Optional[str]) -> Optional[str]:
+        """Profiling mode for an incoming request, or None"""
+        if header_mode is not None and self.authorized(header_token):
+            return header_mode if header_mode in PROFILE_MODES else "sample"
+        if not self._armed:
+            return None
+        with self._lock:
+            if self._armed <= 0:
+                return None
+            self._armed -= 1
+            return self._armed_mode
+
+    def captures(self) -> List[Dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        captures = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if name.endswith(".json"):
+                with open(os.path.join(self.directory, name)) as f:
+                    captures.append(json.load(f))
+        return captures
+
+    def capture_file(self, name: str) -> Optional[str]:
+        """Path of a capture file, refusing anything outside the capture directory"""
+        if os.path.basename(name) != name:
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware starting a capture for armed requests or requests
+    carrying X-Profile (with a valid X-Admin-Token). The capture id is
+    returned in the X-Profile-Capture response header.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler = None):
+        self.app = app
+        self.profiler = profiler or request_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header_mode = header_token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                header_mode = value.decode("latin-1")
+            elif name == b"x-admin-token":
+                header_token = value.decode("latin-1")
+        mode = self.profiler.take(header_mode, header_token)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        capture = ProfileCapture(f"{scope['method']} {scope['path']}", mode, self.profiler.interval)
+        capture_header = (b"x-profile-capture", capture.id.encode())
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + [capture_header]}
+            await send(message)
+
+        token = current_capture.set(capture)
+        capture.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_capture.reset(token)
+            # Joining the sampler and writing files would block the event loop;
+            # shielded so a cancelled request still stops its sampler
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(capture.finish, self.profiler.directory)
+
+
+def profiled(engine: str):
+    """Time an engine entry point, and profile it while its request is being captured"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            capture = current_capture.get()
+            started = time.perf_counter()
+            if capture is not None:
+                capture.enter_thread()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if capture is not None:
+                    capture.exit_thread()
+                phase_timers.observe_call(engine, func.__name__, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+# Initialize the shared timers and profiler
+phase_timers = PhaseTimers()
+request_profiler = RequestProfiler()
+metrics_registry.register_collector(phase_timers.render_lines)
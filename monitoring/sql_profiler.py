@@ -0,0 +1,214 @@
+"""
+Opt-in SQL profiler for development and canary deployments.
+
+With EXAM_SQL_PROFILE=1 every request logs a summary of the statements it
+ran. Statements are fingerprinted (literals and IN lists normalized away), so
+the same query issued in a loop shows up as one repeated fingerprint - the
+usual N+1 signature - and statements slower than EXAM_SQL_SLOW_MS are flagged.
+"""
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SQL_PROFILE_ENABLED = os.environ.get("EXAM_SQL_PROFILE", "0") not in ("0", "false", "no", "")
+SLOW_QUERY_MS = float(os.environ.get("EXAM_SQL_SLOW_MS", "100"))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)")
+_POSTCOMPILE = re.compile(r"\(\s*__\[POSTCOMPILE_\w+\]\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so calls differing only in values compare equal"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _POSTCOMPILE.sub("(?+)", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class QueryProfile:
+    """Statements run while one profile was active"""
+
+    def __init__(self, label: str, slow_ms: float = SLOW_QUERY_MS):
+        self.label = label
+        self.slow_ms = slow_ms
+        self.queries = 0
+        self.total_ms = 0.0
+        self.by_fingerprint: Dict[str, List[float]] = {}  # fingerprint -> [count, total ms, max ms]
+        self.identical: Dict[Tuple[str, str], int] = {}
+        self.slow: List[Tuple[str, float]] = []
+
+    def add(self, statement: str, parameters, elapsed_ms: float, executemany: bool = False):
+        self.queries += 1
+        self.total_ms += elapsed_ms
+
+        key = fingerprint(statement)
+        entry = self.by_fingerprint.get(key)
+        if entry is None:
+            self.by_fingerprint[key] = [1, elapsed_ms, elapsed_ms]
+        elif executemany:
+            # One batched call (e.g. a flush of several new rows), not a repeat
+            entry[1] += elapsed_ms
+            entry[2] = max(entry[2], elapsed_ms)
+        else:
+            entry[0] += 1
+            entry[1] += elapsed_ms
+            entry[2] = max(entry[2], elapsed_ms)
+
+        if not executemany:
+            exact = (statement, repr(parameters))
+            self.identical[exact] = self.identical.get(exact, 0) + 1
+
+        if elapsed_ms >= self.slow_ms:
+            self.slow.append((key, elapsed_ms))
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Fingerprints run more than once (N+1 candidates), most frequent first"""
+        return sorted(
+            ((key, int(entry[0])) for key, entry in self.by_fingerprint.items() if entry[0] > 1),
+            key=lambda item: -item[1]
+        )
+
+    def identical_repeats(self) -> int:
+        """Statements re-run with exactly the same parameters"""
+        return sum(count - 1 for count in self.identical.values() if count > 1)
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.slow) or bool(self.repeated())
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.label}: {self.queries} queries in {self.total_ms:.1f} ms, "
+            f"{len(self.by_fingerprint)} distinct, {self.identical_repeats()} identical repeats, "
+            f"{len(self.slow)} slow (>= {self.slow_ms:g} ms)"
+        ]
+        for key, count in self.repeated():
+            entry = self.by_fingerprint[key]
+            lines.append(f"  repeated x{count} ({entry[1]:.1f} ms total): {_shorten(key)}")
+        for key, elapsed_ms in self.slow:
+            lines.append(f"  slow {elapsed_ms:.1f} ms: {_shorten(key)}")
+        return "\n".join(lines)
+
+
+def _shorten(statement: str, limit: int = 200) -> str:
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_sql_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = getattr(context, "_profile_started", None)
+    if profile is not None and started is not None:
+        profile.add(statement, parameters, (time.perf_counter() - started) * 1000, executemany)
+
+
+_hooks_installed = False
+
+
+def install_sql_profiler():
+    """Attach the profiling hooks to every engine; they do nothing outside a profile"""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _hooks_installed = True
+
+
+@contextmanager
+def profile_queries(label: str, slow_ms: float = SLOW_QUERY_MS) -> Iterator[QueryProfile]:
+    """Collect the statements run in this context (and threads started from it)"""
+    install_sql_profiler()
+    profile = QueryProfile(label, slow_ms)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+class SQLProfilerMiddleware:
+    """
+    Pure ASGI middleware logging one query summary per request; requests with
+    repeated fingerprints or slow statements are logged as warnings.
+    """
+
+    def __init__(self, app, slow_ms: float = SLOW_QUERY_MS):
+        self.app = app
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries(f"{scope['method']} {scope['path']}", self.slow_ms) as profile:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    profile.label = f"{scope['method']} {route.path_format} ({scope['path']})"
+                if profile.flagged:
+                    logger.warning(profile.summary())
+                elif profile.queries:
+                    logger.info(profile.summary())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more statements than its declared budget"""
+
+
+@contextmanager
+def assert_query_budget(label: str, max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryProfile]:
+    """
+    Fail if the block runs more than max_queries statements, or (with
+    max_repeats) repeats any fingerprint more than max_repeats extra times.
+    Statements from every engine are counted, whatever thread runs them,
+    so this is meant for tests where nothing else touches the database.
+    """
+    profile = QueryProfile(label)
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        context._budget_started = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_budget_started", time.perf_counter())
+        profile.add(statement, parameters, (time.perf_counter() - started) * 1000, executemany)
+
+    event.listen(Engine, "before_cursor_execute", before)
+    event.listen(Engine, "after_cursor_execute", after)
+    try:
+        yield profile
+    finally:
+        event.remove(Engine, "before_cursor_execute", before)
+        event.remove(Engine, "after_cursor_execute", after)
+
+    if profile.queries > max_queries:
+        raise QueryBudgetExceeded(f"Query budget of {max_queries} exceeded\n{profile.summary()}")
+    if max_repeats is not None:
+        worst = profile.repeated()
+        if worst and worst[0][1] - 1 > max_repeats:
+            raise QueryBudgetExceeded(f"More than {max_repeats} repeated statements\n{profile.summary()}")
@@ -0,0 +1,186 @@
+"""
+Opt-in capture of sanitized request traces for replay.
+
+With EXAM_TRAFFIC_CAPTURE=<file> every API request appends one compact JSON
+line: arrival time, method, route template, path/query parameters, a
+sanitized JSON body, status, latency and response size. Student ids are
+replaced by a keyed hash (EXAM_TRAFFIC_SALT) and free-text strings by a
+length marker, so traces carry the workload's shape - which students are
+busy, and when - without names, emails or notes. Strings the API validates
+by form (ISO dates and datetimes, and the schemas' enum values) are kept as
+they are, so replayed requests still pass validation.
+
+EXAM_TRAFFIC_SAMPLE (0-1) keeps that share of students; all of a kept
+student's requests are recorded so per-student sequences stay intact.
+"""
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl
+
+from schemas.anxiety_signal import AnxietySignalType
+from schemas.encouragement import EncouragementType
+from schemas.job import JobStatus
+
+TRAFFIC_CAPTURE_PATH = os.environ.get("EXAM_TRAFFIC_CAPTURE") or None
+TRAFFIC_SALT = os.environ.get("EXAM_TRAFFIC_SALT", "")
+TRAFFIC_SAMPLE = float(os.environ.get("EXAM_TRAFFIC_SAMPLE", "1"))
+
+CAPTURED_PREFIX = "/api/v1/"
+EXCLUDED_PREFIXES = ("/api/v1/admin/",)
+EXCLUDED_SUFFIXES = ("/events",)  # long-lived SSE streams cannot be replayed as requests
+STUDENT_KEYS = ("student_id",)
+MAX_BODY_BYTES = 64 * 1024
+
+STUDENT_MARKER = "s:"
+TEXT_MARKER = "t:"
+
+# Strings kept verbatim: enum values and ISO 8601 dates/datetimes
+ENUM_VALUES = frozenset(member.value for enum in (AnxietySignalType, EncouragementType, JobStatus) for member in enum)
+ISO_DATETIME = re.compile(r"\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?)?")
+
+
+def hash_student_id(student_id, salt: str = TRAFFIC_SALT) -> str:
+    """Stable pseudonym for a student id; the same salt maps a snapshot's ids back"""
+    digest = hmac.new(salt.encode(), str(student_id).encode(), hashlib.sha256).hexdigest()
+    return STUDENT_MARKER + digest[:16]
+
+
+def sanitize(value, salt: str = TRAFFIC_SALT, key: Optional[str] = None):
+    """Hash student ids, replace free text with its length, keep enums, timestamps, numbers and booleans"""
+    if key in STUDENT_KEYS and value is not None and not isinstance(value, (dict, list)):
+        return hash_student_id(value, salt)
+    if isinstance(value, dict):
+        return {k: sanitize(v, salt, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [sanitize(item, salt) for item in value]
+    if isinstance(value, str):
+        if value in ENUM_VALUES or ISO_DATETIME.fullmatch(value):
+            return value
+        return f"{TEXT_MARKER}{len(value)}"
+    return value
+
+
+def _sanitize_params(params: Dict[str, str], salt: str) -> Dict[str, str]:
+    # Path and query values arrive as strings; only student ids are sensitive
+    return {key: hash_student_id(value, salt) if key in STUDENT_KEYS else value for key, value in params.items()}
+
+
+class TrafficCaptureWriter:
+    """Appends trace lines with O_APPEND so several workers can share one file"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self.lock = threading.Lock()
+        self.written = 0
+
+    def write(self, record: Dict):
+        line = (json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n").encode()
+        with self.lock:
+            os.write(self.fd, line)
+            self.written += 1
+
+    def close(self):
+        os.close(self.fd)
+
+
+def read_trace(path: str) -> Iterator[Dict]:
+    """Records of a capture file in file order, skipping a torn final line"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+class TrafficCaptureMiddleware:
+    """Pure ASGI middleware writing one sanitized trace record per API request"""
+
+    def __init__(self, app, path: str = TRAFFIC_CAPTURE_PATH, salt: str = TRAFFIC_SALT,
+                 sample: float = TRAFFIC_SAMPLE, writer: Optional[TrafficCaptureWriter] = None):
+        self.app = app
+        self.salt = salt
+        self.sample = sample
+        self.writer = writer or TrafficCaptureWriter(path)
+
+    def _keep(self, student: Optional[str]) -> bool:
+        if self.sample >= 1:
+            return True
+        if student is None:
+            return random.random() < self.sample
+        return int(student[len(STUDENT_MARKER):], 16) / 16 ** 16 < self.sample
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(CAPTURED_PREFIX) or path.startswith(EXCLUDED_PREFIXES) \
+                or path.endswith(EXCLUDED_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.time()
+        body: List[bytes] = []
+        body_size = 0
+        status = 500
+        size = 0
+
+        async def receive_wrapper():
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                body_size += len(chunk)
+                if body_size <= MAX_BODY_BYTES:
+                    body.append(chunk)
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._record(scope, arrived, body if body_size <= MAX_BODY_BYTES else None, status, elapsed_ms, size)
+
+    def _record(self, scope, arrived: float, body: Optional[List[bytes]], status: int, elapsed_ms: float, size: int):
+        route = scope.get("route")
+        template = getattr(route, "path_format", None)
+        if template is None:
+            return  # unmatched paths are not worth replaying
+
+        path_params = _sanitize_params({k: str(v) for k, v in scope.get("path_params", {}).items()}, self.salt)
+        query = _sanitize_params(dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"))), self.salt)
+        record = {"t": round(arrived, 4), "m": scope["method"], "r": template}
+        if path_params:
+            record["p"] = path_params
+        if query:
+            record["q"] = query
+        raw = b"".join(body) if body else b""
+        if raw:
+            try:
+                record["b"] = sanitize(json.loads(raw), self.salt)
+            except ValueError:
+                record["b"] = None  # non-JSON bodies are not replayed
+        record.update(s=status, ms=round(elapsed_ms, 3), n=size)
+
+        student = path_params.get("student_id") or query.get("student_id")
+        if student is None and isinstance(record.get("b"), dict):
+            student = record["b"].get("student_id")
+        if self._keep(student):
+            self.writer.write(record)
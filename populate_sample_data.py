@@ -1,260 +1,430 @@
+"""
+Synthetic data generator for the exam anxiety database.
+
+Every column is generated with seeded, vectorized NumPy draws in fixed-size
+chunks, so the same arguments always produce the same rows and memory stays
+flat however large the dataset is. Rows are bulk-loaded in large transactions
+(executemany on SQLite, COPY on PostgreSQL) with secondary indexes dropped
+during the load and rebuilt afterwards.
+
+    python populate_sample_data.py                      # small demo dataset
+    python populate_sample_data.py --students 100000 --topics 300 --days 50 --reset
+    python populate_sample_data.py --score-profile improving --anxiety-profile high
+"""
+import argparse
+import csv
+import io
 import sqlite3
-from datetime import datetime, timedelta
-import random
-from typing import List, Tuple
-
-# Connect to the database
-conn = sqlite3.connect('exam_anxiety.db')
-cursor = conn.cursor()
-
-def create_sample_students():
-    """Create sample students"""
-    students = [
-        (1, "Rahul Sharma", "rahul@example.com", "12", "board"), 
-        (2, "Priya Patel", "priya@example.com", "12", "competitive"), 
-        (3, "Amit Kumar", "amit@example.com", "11", "board"),
-        (4, "Sneha Reddy", "sneha@example.com", "12", "competitive"),
-        (5, "Vikram Singh", "vikram@example.com", "11", "board")
-    ]
-    
-    cursor.executemany('''
-        INSERT OR REPLACE INTO students (id, name, email, grade, exam_type)
-        VALUES (?, ?, ?, ?, ?)
-    ''', students)
-    
-    print(f"Created {len(students)} sample students")
-
-def create_sample_topics():
-    """Create sample topics for different subjects"""
-    topics = [
-        (1, "Algebra Basics", "Mathematics", 1, "easy", 20),
-        (2, "Quadratic Equations", "Mathematics", 1, "medium", 30),
-        (3, "Trigonometry", "Mathematics", 1, "medium", 25),
-        (4, "Calculus Intro", "Mathematics", 1, "hard", 35),
-        (5, "Coordinate Geometry", "Mathematics", 1, "medium", 30),
-        (6, "Atomic Structure", "Chemistry", 2, "easy", 25),
-        (7, "Chemical Bonding", "Chemistry", 2, "medium", 30),
-        (8, "Organic Chemistry", "Chemistry", 2, "hard", 40),
-        (9, "Thermodynamics", "Chemistry", 2, "medium", 35),
-        (10, "Periodic Table", "Chemistry", 2, "easy", 20),
-        (11, "Motion in One Dimension", "Physics", 3, "easy", 25),
-        (12, "Laws of Motion", "Physics", 3, "medium", 30),
-        (13, "Work and Energy", "Physics", 3, "medium", 30),
-        (14, "Electrostatics", "Physics", 3, "hard", 35),
-        (15, "Waves", "Physics", 3, "medium", 25)
-    ]
-    
-    cursor.executemany('''
-        INSERT OR REPLACE INTO topics (id, name, subject, syllabus_id, difficulty_level, estimated_time)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', topics)
-    
-    print(f"Created {len(topics)} sample topics")
-
-def create_sample_performance_records():
-    """Create sample performance records for students"""
-    records = []
-    
-    # Generate performance records for each student
-    for student_id in range(1, 6):  # Students 1-5
-        for day_offset in range(10):  # Last 10 days
-            date = datetime.now() - timedelta(days=day_offset)
-            
-            for _ in range(random.randint(1, 3)):  # 1-3 records per day
-                topic_id = random.randint(1, 15)
-                score = random.uniform(40, 95)  # Scores between 40-95%
-                time_spent = random.randint(15, 45)  # 15-45 minutes
-                
-                records.append((
-                    student_id, 
-                    topic_id, 
-                    date.strftime('%Y-%m-%d %H:%M:%S'), 
-                    score, 
-                    time_spent,
-                    None,  # mistakes
-                    True   # completed
-                ))
-    
-    cursor.executemany('''
-        INSERT INTO performance_records (student_id, topic_id, date, score, time_spent, mistakes, completed)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', records)
-    
-    print(f"Created {len(records)} sample performance records")
-
-def create_sample_micro_goals():
-    """Create sample micro goals for students"""
-    goals = []
-    
-    # Generate goals for each student
-    for student_id in range(1, 6):
-        for i in range(5):  # 5 goals per student
-            topic_id = random.randint(1, 15)
-            estimated_time = random.randint(15, 40)
-            priority = random.randint(1, 5)
-            completed = random.choice([True, False])
-            
-            # Generate goal text based on topic
-            topics = ["Algebra", "Trigonometry", "Calculus", "Chemistry", "Physics", "Biology"]
-            topic_name = f"Topic {topic_id}"
-            
-            goal_texts = [
-                f"Revise {topic_name} formulas ({estimated_time} mins)",
-                f"Practice {random.randint(3, 6)} problems on {topic_name} ({estimated_time} mins)",
-                f"Review {topic_name} concepts ({estimated_time} mins)",
-                f"Complete {topic_name} exercises ({estimated_time} mins)",
-                f"Understand {topic_name} fundamentals ({estimated_time} mins)"
-            ]
-            
-            goal_text = random.choice(goal_texts)
-            
-            goals.append((
-                student_id,
-                topic_id,
-                goal_text,
-                estimated_time,
-                priority,
-                (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d %H:%M:%S'),
-                completed,
-                (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d %H:%M:%S') if completed else None
-            ))
-    
-    cursor.executemany('''
-        INSERT INTO micro_goals (student_id, topic_id, goal_text, estimated_time, priority, created_at, completed, completed_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', goals)
-    
-    print(f"Created {len(goals)} sample micro goals")
-
-def create_sample_anxiety_signals():
-    """Create sample anxiety signals"""
-    signals = []
-    
-    for student_id in range(1, 6):
-        # Add various types of signals
-        signal_types = ["stress", "improvement_streak", "consistency", "confidence"]
-        
-        for _ in range(3):  # 3 signals per student
-            signal_type = random.choice(signal_types)
-            value = random.uniform(30, 95)
-            
-            descriptions = {
-                "stress": [
-                    "Increased study time with decreasing scores",
-                    "Low consistency in study pattern",
-                    "Significant performance drop"
-                ],
-                "improvement_streak": [
-                    f"Improvement streak of {random.randint(2, 5)} consecutive sessions",
-                    f"Performance increased by {random.randint(5, 15)}%",
-                    f"Accuracy improved by {random.randint(5, 12)}%"
-                ],
-                "consistency": [
-                    f"Studied {random.randint(4, 6)} of last 7 days",
-                    f"Consistent study pattern for {random.randint(3, 7)} days",
-                    f"Regular practice maintained for {random.randint(5, 10)} days"
-                ],
-                "confidence": [
-                    f"Current confidence score: {random.uniform(60, 90):.1f}",
-                    f"Confidence level assessment: {random.uniform(65, 95):.1f}",
-                    f"Self-assessment confidence: {random.uniform(55, 85):.1f}"
-                ]
-            }
-            
-            description = random.choice(descriptions[signal_type])
-            
-            signals.append((
-                student_id,
-                signal_type,
-                value,
-                description,
-                (datetime.now() - timedelta(days=random.randint(0, 5))).strftime('%Y-%m-%d %H:%M:%S')
-            ))
-    
-    cursor.executemany('''
-        INSERT INTO anxiety_signals (student_id, signal_type, value, description, detected_at)
-        VALUES (?, ?, ?, ?, ?)
-    ''', signals)
-    
-    print(f"Created {len(signals)} sample anxiety signals")
-
-def create_sample_encouragements():
-    """Create sample encouragement messages"""
-    messages = []
-    
-    encouragement_types = ["daily", "after_goal", "consolation", "improvement"]
-    
-    for student_id in range(1, 6):
-        for msg_type in encouragement_types:
-            for _ in range(2):  # 2 messages per type per student
-                msg_templates = {
-                    "daily": [
-                        "Remember, consistency matters more than speed. You're on track!",
-                        "Small steps daily lead to big results. Your dedication is noticed!",
-                        "Learning takes time. Your patience with the process is a strength.",
-                        "Every study session counts, even when progress feels slow.",
-                        "Your effort today is building your success tomorrow."
-                    ],
-                    "after_goal": [
-                        "Another goal completed! Your discipline is building your confidence.",
-                        "Well done! You're building momentum with completed goals.",
-                        "Goal completed! Each small victory counts toward your success.",
-                        "Great job finishing that goal! You're making steady progress.",
-                        "Completed goal! Every task you finish brings you closer to your target."
-                    ],
-                    "consolation": [
-                        "One missed goal doesn't break your progress. Tomorrow is a new opportunity.",
-                        "Setbacks are part of learning. What matters is you keep going.",
-                        "Don't let one difficult day discourage you. Your journey continues.",
-                        "It's okay to have challenging days. What's important is you're here now.",
-                        "Progress isn't always smooth. Your commitment to continue matters."
-                    ],
-                    "improvement": [
-                        f"You improved accuracy by {random.randint(5, 15)}% this week—keep going 💪",
-                        "Great progress! Your hard work is showing results.",
-                        "Consistency pays off! You've improved by {random.randint(5, 12)}% recently.",
-                        "Noticed your improvement! You're on the right track!",
-                        "Your dedication is paying off with visible progress!"
-                    ]
-                }
-                
-                message = random.choice(msg_templates[msg_type])
-                viewed = random.choice([True, False])
-                
-                messages.append((
-                    student_id,
-                    message,
-                    msg_type,
-                    (datetime.now() - timedelta(days=random.randint(0, 4))).strftime('%Y-%m-%d %H:%M:%S'),
-                    viewed
-                ))
-    
-    cursor.executemany('''
-        INSERT INTO encouragement_messages (student_id, message, message_type, created_at, viewed)
-        VALUES (?, ?, ?, ?, ?)
-    ''', messages)
-    
-    print(f"Created {len(messages)} sample encouragement messages")
-
-def main():
-    """Main function to create all sample data"""
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from database.database import DATABASE_URL, build_engine
+from database.models import Base, Student
+
+# Rows generated and loaded per batch; part of the seed contract (changing it changes the data)
+CHUNK_ROWS = 250_000
+
+# Per-student score model: ability ~ N(mean, spread), trend in points per day, per-session noise
+SCORE_PROFILES = {
+    "balanced": {"mean": 68.0, "spread": 12.0, "trend": 0.0, "noise": 10.0},
+    "struggling": {"mean": 52.0, "spread": 10.0, "trend": -0.15, "noise": 12.0},
+    "improving": {"mean": 58.0, "spread": 12.0, "trend": 0.4, "noise": 9.0},
+    "strong": {"mean": 82.0, "spread": 8.0, "trend": 0.05, "noise": 6.0}
+}
+
+# Share of students showing each anxiety pattern:
+#   cramming   - study time rises while scores fall (the engine's stress pattern)
+#   irregular  - studies on alternate days only
+#   stress     - share of anxiety signals that are stress signals
+#   completion - probability a micro-goal gets completed
+#   mistakes   - probability a session logs mistakes
+ANXIETY_PROFILES = {
+    "low": {"cramming": 0.05, "irregular": 0.10, "stress": 0.10, "completion": 0.80, "mistakes": 0.15},
+    "medium": {"cramming": 0.15, "irregular": 0.25, "stress": 0.30, "completion": 0.65, "mistakes": 0.30},
+    "high": {"cramming": 0.35, "irregular": 0.45, "stress": 0.55, "completion": 0.45, "mistakes": 0.50}
+}
+
+SAMPLE_STUDENTS = [
+    ("Rahul Sharma", "rahul@example.com", "12", "board"),
+    ("Priya Patel", "priya@example.com", "12", "competitive"),
+    ("Amit Kumar", "amit@example.com", "11", "board"),
+    ("Sneha Reddy", "sneha@example.com", "12", "competitive"),
+    ("Vikram Singh", "vikram@example.com", "11", "board")
+]
+
+SAMPLE_TOPICS = [
+    ("Algebra Basics", "easy", 20), ("Quadratic Equations", "medium", 30), ("Trigonometry", "medium", 25),
+    ("Calculus Intro", "hard", 35), ("Coordinate Geometry", "medium", 30),
+    ("Atomic Structure", "easy", 25), ("Chemical Bonding", "medium", 30), ("Organic Chemistry", "hard", 40),
+    ("Thermodynamics", "medium", 35), ("Periodic Table", "easy", 20),
+    ("Motion in One Dimension", "easy", 25), ("Laws of Motion", "medium", 30), ("Work and Energy", "medium", 30),
+    ("Electrostatics", "hard", 35), ("Waves", "medium", 25)
+]
+
+SUBJECTS = ["Mathematics", "Chemistry", "Physics", "Biology", "English", "Computer Science"]
+DIFFICULTIES = np.array(["easy", "medium", "hard"])
+SIGNAL_TYPES = np.array(["stress", "improvement_streak", "consistency", "confidence"])
+MESSAGE_TYPES = np.array(["daily", "after_goal", "consolation", "improvement"])
+MESSAGES = np.array([
+    "Remember, consistency matters more than speed. You're on track!",
+    "Another goal completed! Your discipline is building your confidence.",
+    "One missed goal doesn't break your progress. Tomorrow is a new opportunity.",
+    "Great progress! Your hard work is showing results."
+])
+GOAL_VERBS = np.array(["Revise", "Practice problems on", "Review", "Complete exercises on", "Understand"])
+MISTAKES = np.array(['["calculation"]', '["concept"]', '["careless"]'])
+
+
+def timestamps(now: datetime, seconds_ago: np.ndarray) -> List[str]:
+    """SQLAlchemy's DateTime text format, vectorized"""
+    stamps = np.datetime64(now, "us") - seconds_ago.astype("timedelta64[s]")
+    return [stamp.replace("T", " ") for stamp in np.datetime_as_string(stamps, unit="us").tolist()]
+
+
+def planned_counts(students: int, days: int, sessions_per_day: float, goals_per_day: float) -> Dict[str, int]:
+    """Row counts for the activity tables"""
+    student_days = students * days
+    return {
+        "performance_records": int(round(student_days * sessions_per_day)),
+        "micro_goals": int(round(student_days * goals_per_day)),
+        "anxiety_signals": int(round(student_days * 0.2)),
+        "encouragement_messages": int(round(student_days * 0.3))
+    }
+
+
+def _chunks(total: int):
+    for start in range(0, total, CHUNK_ROWS):
+        yield min(CHUNK_ROWS, total - start)
+
+
+class Cohort:
+    """Per-student attributes every activity table is drawn from"""
+
+    def __init__(self, rng: np.random.Generator, students: int, topics: int, topics_per_syllabus: int,
+                 score_profile: Dict, anxiety_profile: Dict):
+        self.rng = rng
+        self.students = students
+        self.topics = topics
+        self.topics_per_syllabus = topics_per_syllabus
+        self.syllabi = -(-topics // topics_per_syllabus)
+
+        # Index 0 is unused so arrays can be indexed by student id directly
+        size = students + 1
+        self.ability = rng.normal(score_profile["mean"], score_profile["spread"], size)
+        self.trend = rng.normal(score_profile["trend"], abs(score_profile["trend"]) / 2 + 0.05, size)
+        self.noise = score_profile["noise"]
+        self.cramming = rng.random(size) < anxiety_profile["cramming"]
+        self.irregular = rng.random(size) < anxiety_profile["irregular"]
+        self.first_syllabus = rng.integers(1, self.syllabi + 1, size)
+        self.syllabus_count = np.minimum(rng.integers(1, 4, size), self.syllabi)
+        # Some students study far more than others
+        weights = rng.gamma(2.0, 1.0, size)
+        weights[0] = 0.0
+        self.activity = weights / weights.sum()
+
+    def owners(self, n: int) -> np.ndarray:
+        return self.rng.choice(self.students + 1, n, p=self.activity)
+
+    def topics_for(self, owners: np.ndarray) -> np.ndarray:
+        """A topic from one of each owner's enrolled syllabi"""
+        offset = (self.rng.random(owners.size) * self.syllabus_count[owners]).astype(np.int64)
+        syllabus = (self.first_syllabus[owners] - 1 + offset) % self.syllabi
+        topic = syllabus * self.topics_per_syllabus + self.rng.integers(1, self.topics_per_syllabus + 1, owners.size)
+        return np.minimum(topic, self.topics)
+
+    def seconds_ago(self, owners: np.ndarray, days: int) -> np.ndarray:
+        """Session times within the window; irregular students skip odd days"""
+        day = self.rng.integers(0, days, owners.size)
+        day = np.where(self.irregular[owners], day - day % 2, day)
+        return day * 86400 + self.rng.integers(0, 14 * 3600, owners.size)
+
+    def enrollments(self):
+        ids = np.arange(1, self.students + 1)
+        for k in range(3):
+            has = self.syllabus_count[ids] > k
+            yield ids[has], (self.first_syllabus[ids[has]] - 1 + k) % self.syllabi + 1
+
+
+class SQLiteLoader:
+    """executemany over a raw connection, one transaction per table"""
+
+    def __init__(self, engine: Engine):
+        self.path = engine.url.database
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("PRAGMA journal_mode=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-200000")
+
+    def load(self, table: str, columns: Sequence[str], rows: Iterable[tuple]):
+        placeholders = ", ".join("?" for _ in columns)
+        self.conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def analyze(self):
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("ANALYZE")
+
+
+class PostgresLoader:
+    """COPY ... FROM STDIN in CSV, one transaction per table"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.conn = engine.raw_connection()
+
+    def load(self, table: str, columns: Sequence[str], rows: Iterable[tuple]):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        with self.conn.cursor() as cursor:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        with self.conn.cursor() as cursor:
+            # Explicit ids were loaded for these tables, so move their sequences past them
+            for table in ("students", "topics"):
+                cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                               f"COALESCE((SELECT MAX(id) FROM {table}), 1))")
+        self.conn.commit()
+        self.conn.close()
+
+    def analyze(self):
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
+            conn.commit()
+
+
+def _loader(engine: Engine):
+    if engine.dialect.name == "sqlite":
+        return SQLiteLoader(engine)
+    if engine.dialect.name == "postgresql":
+        return PostgresLoader(engine)
+    raise ValueError(f"Unsupported database for bulk loading: {engine.dialect.name}")
+
+
+def _student_rows(cohort: Cohort, now: datetime, days: int):
+    rng = cohort.rng
+    n = cohort.students
+    ids = np.arange(1, n + 1)
+    names = [f"Student {i}" for i in ids]
+    emails = [f"student{i}@example.com" for i in ids]
+    grades = rng.choice(["11", "12"], n).tolist()
+    exam_types = rng.choice(["board", "competitive"], n).tolist()
+    for i, (name, email, grade, exam_type) in enumerate(SAMPLE_STUDENTS[:n]):
+        names[i], emails[i], grades[i], exam_types[i] = name, email, grade, exam_type
+    created = timestamps(now, np.full(n, days * 86400))
+    return zip(ids.tolist(), names, emails, grades, exam_types, rng.choice([30, 45, 60, 90], n).tolist(), created)
+
+
+def _topic_rows(cohort: Cohort):
+    rng = cohort.rng
+    n = cohort.topics
+    ids = np.arange(1, n + 1)
+    syllabus = (ids - 1) // cohort.topics_per_syllabus + 1
+    subjects = [SUBJECTS[(s - 1) % len(SUBJECTS)] for s in syllabus]
+    names = [f"{subject} topic {i}" for subject, i in zip(subjects, ids)]
+    difficulty = rng.choice(DIFFICULTIES, n).tolist()
+    minutes = rng.integers(15, 45, n).tolist()
+    if cohort.topics_per_syllabus == 5:
+        for i, (name, level, estimate) in enumerate(SAMPLE_TOPICS[:n]):
+            names[i], difficulty[i], minutes[i] = name, level, estimate
+    return zip(ids.tolist(), names, subjects, syllabus.tolist(), difficulty, minutes)
+
+
+def populate(engine: Engine, students: int = 5, topics: int = 15, days: int = 10,
+             sessions_per_day: float = 2.0, goals_per_day: float = 1.0, topics_per_syllabus: int = 5,
+             score_profile: str = "balanced", anxiety_profile: str = "medium", seed: int = 42,
+             now: Optional[datetime] = None, reset: bool = False, progress=None) -> Dict[str, float]:
+    """
+    Create the schema if needed and fill it with a synthetic cohort.
+    Returns row counts per table plus the elapsed seconds.
+    """
+    started = time.perf_counter()
+    now = now or datetime.utcnow().replace(microsecond=0)
+    rng = np.random.default_rng(seed)
+    scores = SCORE_PROFILES[score_profile]
+    anxiety = ANXIETY_PROFILES[anxiety_profile]
+    counts = planned_counts(students, days, sessions_per_day, goals_per_day)
+    report = progress or (lambda message: None)
+
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count()).select_from(Student)).scalar()
+    if existing:
+        raise ValueError(f"Database already has {existing} students; pass reset=True (--reset) to replace them")
+
+    # Secondary indexes are rebuilt once after the load instead of maintained per row
+    indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes]
+    for index in indexes:
+        index.drop(bind=engine)
+
+    cohort = Cohort(rng, students, topics, topics_per_syllabus, scores, anxiety)
+    loader = _loader(engine)
+    try:
+        loader.load("students", ("id", "name", "email", "grade", "exam_type", "daily_study_minutes", "created_at"),
+                    _student_rows(cohort, now, days))
+        loader.load("topics", ("id", "name", "subject", "syllabus_id", "difficulty_level", "estimated_time"),
+                    _topic_rows(cohort))
+        enrolled_at = timestamps(now, np.array([days * 86400]))[0]
+        for ids, syllabus in cohort.enrollments():
+            loader.load("student_syllabi", ("student_id", "syllabus_id", "enrolled_at"),
+                        zip(ids.tolist(), syllabus.tolist(), [enrolled_at] * ids.size))
+        loader.commit()
+        report(f"students: {students}, topics: {topics}")
+
+        # Performance records, tracking the latest session per (student, topic) for the schedules
+        last_key = np.empty(0, dtype=np.int64)
+        last_ago = np.empty(0, dtype=np.int64)
+        last_score = np.empty(0)
+        written = 0
+        for n in _chunks(counts["performance_records"]):
+            owners = cohort.owners(n)
+            topic_ids = cohort.topics_for(owners)
+            ago = cohort.seconds_ago(owners, days)
+            elapsed_days = days - ago / 86400.0
+            trend = np.where(cohort.cramming[owners], -0.6, cohort.trend[owners])
+            score = np.clip(cohort.ability[owners] + trend * (elapsed_days - days / 2)
+                            + rng.normal(0, cohort.noise, n), 0, 100).round(1)
+            minutes = rng.integers(15, 46, n) * np.where(cohort.cramming[owners], 1 + elapsed_days / days, 1.0)
+            mistakes = np.where(rng.random(n) < anxiety["mistakes"], rng.choice(MISTAKES, n), None)
+            loader.load("performance_records",
+                        ("student_id", "topic_id", "date", "score", "time_spent", "mistakes", "completed"),
+                        zip(owners.tolist(), topic_ids.tolist(), timestamps(now, ago), score.tolist(),
+                            minutes.astype(np.int64).tolist(), mistakes.tolist(), [1] * n))
+
+            key = np.concatenate([last_key, owners.astype(np.int64) * (topics + 1) + topic_ids])
+            ago_all = np.concatenate([last_ago, ago])
+            score_all = np.concatenate([last_score, score])
+            order = np.lexsort((ago_all, key))
+            first = np.r_[True, key[order][1:] != key[order][:-1]]
+            keep = order[first]
+            last_key, last_ago, last_score = key[keep], ago_all[keep], score_all[keep]
+            written += n
+            report(f"performance_records: {written}/{counts['performance_records']}")
+        loader.commit()
+
+        # SM-2 state consistent with each pair's latest session
+        for start in range(0, last_key.size, CHUNK_ROWS):
+            key = last_key[start:start + CHUNK_ROWS]
+            ago = last_ago[start:start + CHUNK_ROWS]
+            score = last_score[start:start + CHUNK_ROWS]
+            interval = np.where(score >= 60, rng.choice([1.0, 6.0, 15.0], key.size), 1.0)
+            loader.load("topic_schedules",
+                        ("student_id", "topic_id", "easiness", "interval_days", "repetitions", "last_score",
+                         "last_reviewed_at", "next_due_at"),
+                        zip((key // (topics + 1)).tolist(), (key % (topics + 1)).tolist(),
+                            np.clip(2.5 + (score - 70) / 100, 1.3, 2.8).round(2).tolist(), interval.tolist(),
+                            np.where(score >= 60, rng.integers(1, 5, key.size), 0).tolist(), score.tolist(),
+                            timestamps(now, ago), timestamps(now, ago - (interval * 86400).astype(np.int64))))
+        loader.commit()
+        counts["topic_schedules"] = int(last_key.size)
+
+        for n in _chunks(counts["micro_goals"]):
+            owners = cohort.owners(n)
+            topic_ids = cohort.topics_for(owners)
+            ago = cohort.seconds_ago(owners, days)
+            minutes = rng.integers(10, 41, n)
+            done = rng.random(n) < anxiety["completion"]
+            completed_at = timestamps(now, np.maximum(ago - rng.integers(600, 6 * 3600, n), 0))
+            texts = [f"{verb} Topic {topic} ({estimate} mins)"
+                     for verb, topic, estimate in zip(rng.choice(GOAL_VERBS, n).tolist(), topic_ids.tolist(), minutes.tolist())]
+            loader.load("micro_goals",
+                        ("student_id", "topic_id", "goal_text", "estimated_time", "priority", "created_at",
+                         "completed", "completed_at"),
+                        zip(owners.tolist(), topic_ids.tolist(), texts, minutes.tolist(),
+                            rng.integers(1, 6, n).tolist(), timestamps(now, ago), done.astype(int).tolist(),
+                            [c if d else None for c, d in zip(completed_at, done)]))
+        loader.commit()
+        report(f"micro_goals: {counts['micro_goals']}")
+
+        other = (1 - anxiety["stress"]) / 3
+        for n in _chunks(counts["anxiety_signals"]):
+            owners = cohort.owners(n)
+            kinds = rng.choice(SIGNAL_TYPES, n, p=[anxiety["stress"], other, other, other])
+            values = np.where(kinds == "stress", rng.uniform(50, 95, n), rng.uniform(30, 95, n)).round(1)
+            loader.load("anxiety_signals", ("student_id", "signal_type", "value", "description", "detected_at"),
+                        zip(owners.tolist(), kinds.tolist(), values.tolist(),
+                            [f"Synthetic {kind}" for kind in kinds.tolist()],
+                            timestamps(now, cohort.seconds_ago(owners, days))))
+        loader.commit()
+        report(f"anxiety_signals: {counts['anxiety_signals']}")
+
+        for n in _chunks(counts["encouragement_messages"]):
+            owners = cohort.owners(n)
+            kind = rng.integers(0, len(MESSAGE_TYPES), n)
+            loader.load("encouragement_messages", ("student_id", "message", "message_type", "created_at", "viewed"),
+                        zip(owners.tolist(), MESSAGES[kind].tolist(), MESSAGE_TYPES[kind].tolist(),
+                            timestamps(now, cohort.seconds_ago(owners, days)),
+                            (rng.random(n) < 0.5).astype(int).tolist()))
+        loader.commit()
+        report(f"encouragement_messages: {counts['encouragement_messages']}")
+    finally:
+        loader.close()
+        for index in indexes:
+            index.create(bind=engine)
+        report("indexes rebuilt")
+    loader.analyze()
+
+    return {"students": students, "topics": topics, **counts, "seconds": round(time.perf_counter() - started, 2)}
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic exam anxiety dataset")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--students", type=int, default=5)
+    parser.add_argument("--topics", type=int, default=15)
+    parser.add_argument("--days", type=int, default=10, help="days of history ending now")
+    parser.add_argument("--sessions-per-day", type=float, default=2.0,
+                        help="average performance records per student per day")
+    parser.add_argument("--goals-per-day", type=float, default=1.0,
+                        help="average micro-goals per student per day")
+    parser.add_argument("--topics-per-syllabus", type=int, default=5)
+    parser.add_argument("--score-profile", choices=sorted(SCORE_PROFILES), default="balanced")
+    parser.add_argument("--anxiety-profile", choices=sorted(ANXIETY_PROFILES), default="medium")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args(argv)
+
+    engine = build_engine(args.database_url)
     print("Creating sample dataset for AI-Driven Exam Anxiety Reduction System...")
-    
-    # Create all sample data
-    create_sample_students()
-    create_sample_topics()
-    create_sample_performance_records()
-    create_sample_micro_goals()
-    create_sample_anxiety_signals()
-    create_sample_encouragements()
-    
-    # Commit changes
-    conn.commit()
-    conn.close()
-    
-    print("\nSample dataset created successfully!")
-    print("Database file: exam_anxiety.db")
-    print("Tables populated with sample data for testing.")
+    try:
+        counts = populate(
+            engine, students=args.students, topics=args.topics, days=args.days,
+            sessions_per_day=args.sessions_per_day, goals_per_day=args.goals_per_day,
+            topics_per_syllabus=args.topics_per_syllabus, score_profile=args.score_profile,
+            anxiety_profile=args.anxiety_profile, seed=args.seed, reset=args.reset,
+            progress=lambda message: print(f"  {message}", file=sys.stderr)
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        engine.dispose()
+
+    seconds = counts.pop("seconds")
+    for table, rows in counts.items():
+        print(f"Created {rows} {table.replace('_', ' ')}")
+    print(f"\nSample dataset created in {seconds}s: {args.database_url}")
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
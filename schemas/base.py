@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -8,6 +8,7 @@ class StudentCreate(BaseModel):
     email: str
     grade: str
     exam_type: str  # "board" or "competitive"
+    daily_study_minutes: int = Field(60, ge=0, le=1440)  # time budget for daily goals, in minutes
 
 class StudentResponse(BaseModel):
     id: int
@@ -15,6 +16,7 @@ class StudentResponse(BaseModel):
     email: str
     grade: str
     exam_type: str
+    daily_study_minutes: Optional[int] = Field(None, ge=0)
     created_at: datetime
 
     class Config:
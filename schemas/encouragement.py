@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 class EncouragementType(str, Enum):
@@ -23,4 +23,24 @@ class EncouragementResponse(BaseModel):
     viewed: bool
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class EncouragementMarkViewed(BaseModel):
+    """Either explicit message ids or every message up to (and including) a cursor id"""
+    student_id: int
+    message_ids: Optional[List[int]] = None
+    up_to_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_selector(self):
+        if (self.message_ids is None) == (self.up_to_id is None):
+            raise ValueError("Provide exactly one of message_ids or up_to_id")
+        return self
+
+class EncouragementMarkViewedResponse(BaseModel):
+    updated: int
+    success: bool
+
+class UnreadCountResponse(BaseModel):
+    student_id: int
+    unread: int
\ No newline at end of file
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Optional
+from enum import Enum
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+class JobAccepted(BaseModel):
+    job_id: int
+    status: JobStatus
+    status_url: str
+
+class JobResponse(BaseModel):
+    id: int
+    type: str
+    status: JobStatus
+    priority: int
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None  # last failure, kept while a retry is pending
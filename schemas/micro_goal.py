@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class MicroGoalCreate(BaseModel):
     student_id: int
@@ -21,4 +21,17 @@ class MicroGoalResponse(BaseModel):
     completed_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class GoalCompletion(BaseModel):
+    goal_id: int
+    completed_at: Optional[datetime] = None  # when the client completed it offline; defaults to now
+
+class BulkGoalCompletion(BaseModel):
+    student_id: int
+    completions: List[GoalCompletion]
+
+class BulkGoalCompletionResponse(BaseModel):
+    completed: List[int]  # newly completed by this request
+    already_completed: List[int]
+    not_found: List[int]
\ No newline at end of file
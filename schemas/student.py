@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
@@ -7,6 +7,7 @@ class StudentCreate(BaseModel):
     email: str
     grade: str
     exam_type: str  # "board" or "competitive"
+    daily_study_minutes: int = Field(60, ge=0, le=1440)  # time budget for daily goals, in minutes
 
 class StudentResponse(BaseModel):
     id: int
@@ -14,11 +15,24 @@ class StudentResponse(BaseModel):
     email: str
     grade: str
     exam_type: str
+    daily_study_minutes: Optional[int] = Field(None, ge=0)
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class SyllabusEnrollmentCreate(BaseModel):
+    syllabus_id: int
+
+class SyllabusEnrollmentResponse(BaseModel):
+    id: int
+    student_id: int
+    syllabus_id: int
+    enrolled_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class PerformanceRecordCreate(BaseModel):
     student_id: int
     topic_id: int
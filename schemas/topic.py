@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+
+class TopicCreate(BaseModel):
+    name: str
+    subject: str
+    syllabus_id: int
+    difficulty_level: str  # "easy", "medium", "hard"
+    estimated_time: int  # in minutes
+
+class TopicResponse(BaseModel):
+    id: int
+    name: str
+    subject: str
+    syllabus_id: int
+    difficulty_level: str
+    estimated_time: int
+
+    class Config:
+        from_attributes = True
\ No newline at end of file
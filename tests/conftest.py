@@ -0,0 +1,104 @@
+import os
+import sqlite3
+
+# The app's default engine and job queue are in-memory under test, so importing
+# main never creates ./exam_anxiety.db or ./exam_jobs.db and parallel workers
+# share no files
+os.environ.setdefault("EXAM_DATABASE_URL", "sqlite://")
+os.environ.setdefault("EXAM_JOBS_DB", ":memory:")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from cache.store import shared_cache
+from database import database
+from database.models import Base
+from monitoring.sql_profiler import assert_query_budget
+
+
+def _memory_engine(conn: sqlite3.Connection):
+    return create_engine("sqlite://", creator=lambda: conn, poolclass=StaticPool)
+
+
+@pytest.fixture(scope="session")
+def template_db():
+    """In-memory database with the schema loaded, built once per worker process"""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    engine = _memory_engine(conn)
+    Base.metadata.create_all(bind=engine)
+    yield conn
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Every test starts with an empty shared cache, as its database is new too"""
+    shared_cache.clear()
+    yield shared_cache
+    shared_cache.clear()
+
+
+@pytest.fixture
+def engine(template_db):
+    """A private copy of the template database, cloned with SQLite's backup API"""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    template_db.backup(conn)
+    engine = _memory_engine(conn)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def seed(session_factory):
+    """
+    Bulk-insert rows given as column dicts, one executemany per call:
+
+        seed(MicroGoal, [{"student_id": 1, "topic_id": t, "goal_text": "Revise"} for t in (1, 2)])
+    """
+    def insert_rows(model, rows):
+        with session_factory() as session:
+            session.execute(insert(model), list(rows))
+            session.commit()
+    return insert_rows
+
+
+@pytest.fixture
+def app_engine(engine):
+    """Bind the app's sessions (SessionLocal, get_db) to the test database"""
+    previous = database.get_engine()
+    database.configure_engine(engine)
+    yield engine
+    database.configure_engine(previous)
+
+
+@pytest.fixture
+def client(app_engine):
+    import main
+
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Declare how many statements a call may run:
+
+        with query_budget("GET /api/v1/encouragements/{id}/unread-count", max_queries=1):
+            client.get(...)
+    """
+    return assert_query_budget
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from anxiety_signals.engine import anxiety_signals_engine
+from database.models import MicroGoal, PerformanceRecord
+
+
+def _sessions(student_id, scores, minutes, days_ago):
+    now = datetime.utcnow()
+    return [{"student_id": student_id, "topic_id": 1, "score": score, "time_spent": spent,
+             "date": now - timedelta(days=ago)}
+            for score, spent, ago in zip(scores, minutes, days_ago)]
+
+
+def test_confidence_is_neutral_without_data(db):
+    assert anxiety_signals_engine.calculate_confidence_score(db, 1) == 50.0
+
+
+def test_confidence_rewards_steady_improvement(db, seed):
+    seed(PerformanceRecord, _sessions(1, [50, 60, 70, 80, 90], [30] * 5, [4, 3, 2, 1, 0])
+         + _sessions(2, [90, 80, 70, 60, 50], [30] * 5, [4, 3, 2, 1, 0]))
+    seed(MicroGoal, [{"student_id": 1, "topic_id": 1, "goal_text": "Revise", "completed": True},
+                     {"student_id": 2, "topic_id": 1, "goal_text": "Revise", "completed": False}])
+
+    improving = anxiety_signals_engine.calculate_confidence_score(db, 1)
+    declining = anxiety_signals_engine.calculate_confidence_score(db, 2)
+
+    assert 0 <= declining < improving <= 100
+
+
+def test_detects_cramming_and_improvement_streaks(db, seed):
+    # Student 1 studies longer while scoring lower; student 2 improves every session, every day
+    seed(PerformanceRecord, _sessions(1, [80, 70, 40], [20, 35, 50], [2, 1, 0])
+         + _sessions(2, [40, 50, 60, 70, 80], [30] * 5, [4, 3, 2, 1, 0]))
+
+    stressed = anxiety_signals_engine.detect_anxiety_signals(db, 1)
+    improving = anxiety_signals_engine.detect_anxiety_signals(db, 2)
+
+    descriptions = [s.description for s in stressed if s.signal_type == "stress"]
+    assert any(d.startswith("Sudden performance drop") for d in descriptions)
+    assert sum(d.startswith("Increased study time") for d in descriptions) == 2
+    assert {s.signal_type for s in improving} == {"improvement_streak", "consistency"}
+    assert [s.value for s in improving if s.signal_type == "improvement_streak"] == [4]
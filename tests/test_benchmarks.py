@@ -0,0 +1,94 @@
+import sqlite3
+
+import numpy as np
+
+from benchmarks.compare import compare_results
+from benchmarks.dataset import build_dataset, dataset_shape
+from benchmarks.importtime import import_breakdown, parse_importtime
+from benchmarks.runner import run_benchmarks, run_route_cases, summarize
+from cache.store import shared_cache
+from database import database
+from database.database import build_engine
+
+
+def _document(**cases):
+    return {"results": {name: {"p50_ms": p50, "p95_ms": p95} for name, (p50, p95) in cases.items()}}
+
+
+def test_summarize_reports_percentiles_and_throughput():
+    stats = summarize([i * 1_000_000 for i in range(1, 101)], wall_seconds=2.0)
+
+    assert stats["n"] == 100
+    assert stats["p50_ms"] == 50.5
+    assert stats["p99_ms"] > stats["p95_ms"] > stats["p50_ms"]
+    assert stats["throughput_per_s"] == 50.0
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = _document(slow=(10.0, 20.0), noisy=(0.010, 0.020), steady=(5.0, 6.0))
+    current = _document(slow=(10.5, 25.0), noisy=(0.030, 0.040), steady=(5.2, 6.1))
+
+    flagged = {row["case"] for row in compare_results(baseline, current, threshold=0.10) if row["regressed"]}
+
+    assert flagged == {"slow"}
+
+
+def test_import_breakdown_keeps_direct_children_of_the_target():
+    report = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 | site",
+        "import time:        50 |         50 |     pydantic.main",
+        "import time:       200 |        250 |   fastapi",
+        "import time:        30 |         30 |   api.routes",
+        "import time:        10 |        290 | main",
+    ])
+
+    rows = parse_importtime(report)
+
+    assert rows[1] == ("pydantic.main", 2, 50, 50)
+    assert import_breakdown(rows, "main") == {"main": 290, "api.routes": 30, "fastapi": 250}
+
+
+def test_dataset_is_deterministic(tmp_path):
+    shape = dataset_shape(500)
+    for name in ("a.db", "b.db"):
+        build_dataset(str(tmp_path / name), 500, seed=7)
+
+    dumps = []
+    for name in ("a.db", "b.db"):
+        conn = sqlite3.connect(str(tmp_path / name))
+        dumps.append(conn.execute("SELECT student_id, topic_id, date, score FROM performance_records ORDER BY id").fetchall())
+        assert conn.execute("SELECT COUNT(*) FROM students").fetchone()[0] == shape["students"]
+        conn.close()
+    assert len(dumps[0]) == 500 and dumps[0] == dumps[1]
+
+
+def test_suite_runs_engines_and_routes(tmp_path, monkeypatch):
+    monkeypatch.setattr("benchmarks.dataset.DATA_DIR", str(tmp_path))
+
+    document = run_benchmarks(size="1k", iterations=3, warmup=1, selected=["confidence", "unread-count"])
+
+    assert set(document["results"]) == {
+        "engine.anxiety_signals.calculate_confidence_score",
+        "route.GET /confidence-score/{student_id}",
+        "route.GET /encouragements/{student_id}/unread-count"
+    }
+    assert all(stats["n"] == 3 for stats in document["results"].values())
+    assert document["results"]["route.GET /confidence-score/{student_id}"]["errors"] == 0
+
+
+def test_route_samples_are_cold_calls_on_the_dataset(tmp_path):
+    build_dataset(str(tmp_path / "bench.db"), 500, seed=7)
+    dataset_engine = build_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    app_engine = database.get_engine()
+    hits_before = shared_cache.stats()["hit"]
+
+    try:
+        results = run_route_cases(dataset_engine, np.array([1, 1, 1, 1]), warmup=1, selected=["confidence-score"])
+    finally:
+        dataset_engine.dispose()
+
+    assert results["route.GET /confidence-score/{student_id}"]["errors"] == 0
+    # The same student every time, yet no request was served from the cache
+    assert shared_cache.stats()["hit"] == hits_before
+    assert database.get_engine() is app_engine
@@ -0,0 +1,75 @@
+import multiprocessing
+import time
+
+import pytest
+
+from cache.store import MemoryCache, SQLiteCache
+from database.models import AnxietySignal, MicroGoal
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    cache = MemoryCache() if request.param == "memory" else SQLiteCache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+def _bump(path, times):
+    cache = SQLiteCache(path)
+    for _ in range(times):
+        cache.bump("student:1")
+    cache.close()
+
+
+def test_values_round_trip_and_expire(cache):
+    cache.set("plan", {"topics": [1, 2], "score": 71.5})
+    cache.set("short", 1, ttl=0.05)
+
+    value = cache.get("plan")
+    value["topics"].append(3)
+    time.sleep(0.1)
+
+    assert cache.get("plan") == {"topics": [1, 2], "score": 71.5}
+    assert cache.get("short", "gone") == "gone"
+    assert cache.get_or_set("short", lambda: 2) == (2, False)
+    assert cache.get_or_set("short", lambda: 3) == (2, True)
+    assert cache.stats()["hit"] >= 2
+
+
+def test_bumping_a_generation_invalidates_dependent_keys(cache):
+    key = cache.generation_key("confidence:1", "student:1")
+    cache.set(key, 64.0)
+
+    assert cache.bump("student:1") == 1
+    assert cache.get(cache.generation_key("confidence:1", "student:1")) is None
+    assert cache.generation_key("confidence:2", "student:2") == "confidence:2|student:2@0"
+
+
+def test_sqlite_generations_are_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    seeded = SQLiteCache(path)
+    seeded.set("confidence:1|student:1@0", 64.0)
+
+    workers = [multiprocessing.Process(target=_bump, args=(path, 50)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+
+    cache = SQLiteCache(path)
+    assert cache.generation("student:1") == 200
+    assert cache.get(cache.generation_key("confidence:1", "student:1")) is None
+
+
+def test_confidence_is_recomputed_only_after_the_students_data_changes(client, db, seed):
+    seed(MicroGoal, [{"student_id": 1, "topic_id": 1, "goal_text": "Revise"}])
+    record = {"student_id": 1, "topic_id": 1, "score": 80.0, "time_spent": 20, "mistakes": None, "completed": True}
+
+    client.get("/api/v1/confidence-score/1")
+    client.get("/api/v1/confidence-score/1")
+    client.post("/api/v1/performance-records", json=record)
+    client.get("/api/v1/confidence-score/1")
+    client.put("/api/v1/micro-goals/1/complete")
+    client.get("/api/v1/confidence-score/1")
+
+    assert db.query(AnxietySignal).filter_by(signal_type="confidence").count() == 3
@@ -0,0 +1,114 @@
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+
+from database.models import PerformanceRecord, MicroGoal, AnxietySignal, EncouragementRotation
+from encouragement.engine import encouragement_engine, StudentProgressContext
+from encouragement.rotation import MessageRotation, upsert_rotation
+
+
+def count_queries(session):
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def seed_student(db, student_id=1):
+    now = datetime.utcnow()
+    for i, score in enumerate([40.0, 55.0, 60.0, 80.0]):
+        db.add(PerformanceRecord(student_id=student_id, topic_id=1, score=score, time_spent=20,
+                                 date=now - timedelta(days=3 - i)))
+    db.add(MicroGoal(student_id=student_id, topic_id=1, goal_text="Revise", estimated_time=15,
+                     priority=3, completed=True, completed_at=now - timedelta(days=1)))
+    db.add(AnxietySignal(student_id=student_id, signal_type="stress", value=60.0,
+                         description="drop", detected_at=now - timedelta(days=1)))
+    db.add(AnxietySignal(student_id=student_id, signal_type="stress", value=60.0,
+                         description="drop", detected_at=now - timedelta(days=5)))
+    db.commit()
+
+
+def test_analysis_context(db):
+    seed_student(db)
+
+    context = encouragement_engine._analyze_student_progress(db, 1)
+
+    assert context == StudentProgressContext(
+        significant_improvement=100.0,
+        consistency_days=4,
+        recent_goal_completion=True,
+        stress_signals=2,
+        recent_stress_signals=1
+    )
+
+
+def test_analysis_context_without_activity(db):
+    assert encouragement_engine._analyze_student_progress(db, 42) == StudentProgressContext()
+
+
+def test_personalized_encouragement_reads_once(db):
+    seed_student(db)
+    statements = count_queries(db)
+
+    messages = encouragement_engine.generate_personalized_encouragement(db, 1, day=date(2026, 1, 1))
+
+    # One aggregated analysis query, one rotation-state lookup and the new rotation row's upsert
+    assert [statement.split()[0] for statement in statements] == ["SELECT", "SELECT", "INSERT"]
+    assert [m.message_type.value for m in messages] == ["daily", "improvement"]
+
+
+def test_setback_path_reuses_context(db):
+    db.add(AnxietySignal(student_id=2, signal_type="stress", value=75.0,
+                         description="drop", detected_at=datetime.utcnow() - timedelta(hours=3)))
+    db.commit()
+    statements = count_queries(db)
+
+    messages = encouragement_engine.generate_personalized_encouragement(db, 2, day=date(2026, 1, 1))
+
+    assert [statement.split()[0] for statement in statements] == ["SELECT", "SELECT", "INSERT"]
+    assert [m.message_type.value for m in messages] == ["daily", "consolation"]
+    stress_templates = encouragement_engine.templates.get("encouragement")["stress"]
+    assert messages[1].message in [template.source for template in stress_templates]
+
+
+def test_daily_messages_rotate_without_repeats(db):
+    for offset in range(4):
+        db.add(PerformanceRecord(student_id=3, topic_id=1, score=70.0, time_spent=20,
+                                 date=datetime.utcnow() - timedelta(days=offset)))
+    db.commit()
+    consistency = encouragement_engine.templates.get("encouragement")["consistency"]
+
+    shown = []
+    for _ in range(len(consistency) + 1):
+        shown.append(encouragement_engine.generate_daily_encouragement(db, 3, day=date(2026, 1, 1)))
+        db.commit()
+
+    cycle = shown[:len(consistency)]
+    assert len(set(cycle)) == len(consistency)
+    assert shown[-1] != shown[-2]
+
+
+def test_concurrent_first_rotations_do_not_collide(session_factory):
+    templates = ["a", "b", "c"]
+    first, second = session_factory(), session_factory()
+    first_rotation = MessageRotation.load(first, 5)
+    second_rotation = MessageRotation.load(second, 5)
+
+    first_rotation.choose(random.Random(1), "stress", templates)
+    first.commit()
+    picked = second_rotation.choose(random.Random(2), "stress", templates)
+    second.commit()
+
+    row = first.query(EncouragementRotation).filter_by(student_id=5, category="stress").populate_existing().one()
+    assert row.recent_mask == 1 << templates.index(picked)
+    first.close()
+    second.close()
+
+
+def test_rotation_upsert_compiles_for_postgresql():
+    sql = str(upsert_rotation("postgresql", 5, "stress", 1).compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT (student_id, category) DO UPDATE SET recent_mask = excluded.recent_mask" in sql
+    assert "RETURNING" in sql
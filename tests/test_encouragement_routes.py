@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import event
+
+from database.models import EncouragementMessage
+
+
+@pytest.fixture(autouse=True)
+def messages(seed):
+    seed(EncouragementMessage, [{"student_id": 1, "message": f"Message {i}", "message_type": "daily"} for i in range(5)]
+         + [{"student_id": 2, "message": "Other student", "message_type": "daily"}])
+
+
+def test_unread_count(client):
+    assert client.get("/api/v1/encouragements/1/unread-count").json() == {"student_id": 1, "unread": 5}
+    assert client.get("/api/v1/encouragements/3/unread-count").json()["unread"] == 0
+
+
+def test_bulk_mark_viewed_by_ids_is_one_update(client, session_factory):
+    statements = []
+    bind = session_factory.kw["bind"]
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(bind, "before_cursor_execute", listener)
+
+    response = client.put("/api/v1/encouragements/mark-viewed",
+                          json={"student_id": 1, "message_ids": [1, 2, 6]})
+
+    event.remove(bind, "before_cursor_execute", listener)
+    assert response.json() == {"updated": 2, "success": True}
+    assert [s.split()[0] for s in statements] == ["UPDATE"]
+    assert client.get("/api/v1/encouragements/1/unread-count").json()["unread"] == 3
+    assert client.get("/api/v1/encouragements/2/unread-count").json()["unread"] == 1
+
+
+def test_bulk_mark_viewed_up_to_cursor(client):
+    response = client.put("/api/v1/encouragements/mark-viewed", json={"student_id": 1, "up_to_id": 4})
+
+    assert response.json()["updated"] == 4
+    assert client.get("/api/v1/encouragements/1/unread-count").json()["unread"] == 1
+
+
+def test_bulk_mark_viewed_requires_one_selector(client):
+    assert client.put("/api/v1/encouragements/mark-viewed", json={"student_id": 1}).status_code == 422
+    assert client.put("/api/v1/encouragements/mark-viewed",
+                      json={"student_id": 1, "message_ids": [1], "up_to_id": 3}).status_code == 422
+
+
+def test_mark_single_message_viewed(client):
+    assert client.put("/api/v1/encouragements/1/mark-viewed").status_code == 200
+    assert client.put("/api/v1/encouragements/99/mark-viewed").status_code == 404
+    assert client.get("/api/v1/encouragements/1", params={"limit": 2}).status_code == 200
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from api.event_routes import stream_student_events
+from database.models import MicroGoal
+from events.broker import EventBroker, event_broker, event_stream
+
+
+def _messages(chunks):
+    """(event, data) for each SSE message, skipping the retry hint and keep-alives"""
+    messages = []
+    for chunk in chunks:
+        fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n") if not line.startswith(":"))
+        if "event" in fields:
+            messages.append((fields["event"], json.loads(fields["data"])))
+    return messages
+
+
+def _disconnect_after(checks):
+    calls = 0
+
+    async def is_disconnected():
+        nonlocal calls
+        calls += 1
+        return calls > checks
+    return is_disconnected
+
+
+def test_slow_subscriber_drops_oldest_and_is_told():
+    async def scenario():
+        broker = EventBroker(buffer_size=2)
+        subscription = broker.subscribe(1)
+        for n in range(5):
+            broker.publish(1, "performance_record", {"n": n})
+        broker.publish(2, "performance_record", {"n": 99})
+        stream = event_stream(broker, lambda: subscription, _disconnect_after(1), keepalive=0.1)
+        chunks = [chunk async for chunk in stream]
+        return broker, chunks
+
+    broker, chunks = asyncio.run(scenario())
+
+    assert chunks[0] == "retry: 3000\n\n"
+    assert [(event, data.get("count", data.get("n"))) for event, data in _messages(chunks)] == [
+        ("dropped", 3), ("performance_record", 3), ("performance_record", 4)
+    ]
+    assert broker.stats() == {"subscribers": 0, "published": 6, "delivered": 5, "dropped": 3}
+
+
+def test_stream_endpoint_sends_events_and_unsubscribes():
+    class Request:
+        is_disconnected = staticmethod(_disconnect_after(1))
+
+    async def scenario():
+        response = await stream_student_events(41, Request())
+        subscribed_before_body = event_broker.has_subscribers(41)
+        body = response.body_iterator
+        chunks = [await body.__anext__()]
+        event_broker.publish(41, "goals_completed", {"goal_ids": [7]})
+        return response, subscribed_before_body, chunks + [chunk async for chunk in body]
+
+    response, subscribed_before_body, chunks = asyncio.run(scenario())
+
+    assert response.media_type == "text/event-stream"
+    assert not subscribed_before_body
+    assert "id: " in chunks[1]
+    assert _messages(chunks)[0][1]["goal_ids"] == [7]
+    assert not event_broker.has_subscribers(41)
+
+
+def test_writes_publish_events_and_confidence_changes(client, seed):
+    seed(MicroGoal, [{"student_id": 1, "topic_id": 1, "goal_text": "Revise"}])
+    record = {"student_id": 1, "topic_id": 1, "score": 80.0, "time_spent": 20, "mistakes": None, "completed": True}
+
+    async def scenario():
+        subscription = event_broker.subscribe(1)
+        try:
+            client.post("/api/v1/performance-records", json=record)
+            client.put("/api/v1/micro-goals/1/complete")
+            client.put("/api/v1/micro-goals/1/complete")  # already completed: no event
+            await asyncio.sleep(0)
+            return await subscription.get(timeout=1)
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    events, dropped = asyncio.run(scenario())
+
+    assert dropped == 0
+    assert [event["event"] for event in events] == ["performance_record", "confidence", "goals_completed", "confidence"]
+    assert events[0]["data"]["score"] == 80.0
+    assert events[1]["data"]["previous"] is None
+    assert events[3]["data"]["previous"] == events[1]["data"]["score"] != events[3]["data"]["score"]
@@ -0,0 +1,74 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from micro_goals.optimizer import GoalPackingOptimizer
+
+optimizer = GoalPackingOptimizer()
+
+
+def _goals(*specs):
+    return [{"topic_id": i, "time": time, "priority": priority} for i, (time, priority) in enumerate(specs)]
+
+
+def _brute_force(goals, budget_minutes):
+    best = 0.0
+    for k in range(optimizer.min_goals, optimizer.max_goals + 1):
+        for subset in combinations(goals, k):
+            if sum(optimizer._units(goal["time"]) for goal in subset) * optimizer.time_unit <= budget_minutes:
+                best = max(best, sum(optimizer.priority_weights[goal["priority"]] for goal in subset))
+    return best
+
+
+def _value(goals):
+    return sum(optimizer.priority_weights[goal["priority"]] for goal in goals)
+
+
+def test_select_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        goals = _goals(*zip(rng.integers(5, 45, 7).tolist(), rng.integers(1, 6, 7).tolist()))
+        budget = int(rng.integers(20, 120))
+
+        selected = optimizer.select(goals, budget)
+
+        if _brute_force(goals, budget):
+            assert _value(selected) == _brute_force(goals, budget)
+            assert sum(goal["time"] for goal in selected) <= budget
+            assert optimizer.min_goals <= len(selected) <= optimizer.max_goals
+
+
+def test_select_never_exceeds_a_budget_between_buckets():
+    selected = optimizer.select(_goals((5, 3), (5, 3), (10, 5)), 12)
+
+    assert [goal["time"] for goal in selected] == [5, 5]
+
+
+def test_select_falls_back_to_the_shortest_goals():
+    selected = optimizer.select(_goals((40, 5), (15, 1), (25, 2), (10, 1)), 20)
+
+    assert sorted(goal["time"] for goal in selected) == [10, 15]
+
+
+@pytest.mark.parametrize("budget", [0, -30, None])
+def test_select_handles_empty_and_negative_budgets(budget):
+    selected = optimizer.select(_goals((20, 5), (10, 1), (15, 2)), budget)
+
+    assert sorted(goal["time"] for goal in selected) == [10, 15]
+
+
+def test_select_cohort_agrees_with_select():
+    rng = np.random.default_rng(11)
+    times = rng.integers(5, 45, (20, 6))
+    priorities = rng.integers(1, 6, (20, 6))
+    budgets = np.concatenate([rng.integers(20, 120, 17), [12, 0, -30]])
+
+    selection = optimizer.select_cohort(times, priorities, budgets)
+
+    for s in range(len(budgets)):
+        goals = _goals(*zip(times[s].tolist(), priorities[s].tolist()))
+        picked = [goals[i] for i in np.flatnonzero(selection[s])]
+        assert _value(picked) == _value(optimizer.select(goals, int(budgets[s])))
+        if _brute_force(goals, int(budgets[s])):
+            assert sum(goal["time"] for goal in picked) <= budgets[s]
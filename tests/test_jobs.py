@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+from database.models import Topic
+from jobs.queue import JobQueue, JobWorkerPool, job_queue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+@pytest.fixture
+def app_jobs():
+    job_queue.clear()
+    yield job_queue
+    job_queue.clear()
+
+
+def test_claims_follow_priority_and_concurrency_limits(queue):
+    queue.register("report", lambda payload: payload, concurrency=1)
+    queue.register("goals", lambda payload: payload, priority=10, concurrency=2)
+    report = queue.enqueue("report", {"n": 1})
+    queue.enqueue("report", {"n": 2})
+    urgent = queue.enqueue("report", {"n": 3}, priority=5)
+    goals = [queue.enqueue("goals", {"n": n}) for n in range(3)]
+
+    claimed = [queue.claim() for _ in range(3)]
+
+    # Two goal jobs fill their limit, then one report job fills its own
+    assert [job["id"] for job in claimed] == [goals[0], goals[1], urgent]
+    assert queue.claim() is None
+    assert queue.complete(claimed[0], {"ok": True})
+    assert queue.claim()["id"] == goals[2]
+    assert queue.get(report)["status"] == "queued"
+
+
+def test_failures_retry_with_backoff_then_fail(queue):
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload)
+        raise ValueError("database is locked")
+
+    queue.register("flaky", flaky, max_attempts=2, retry_backoff=0.05)
+    job_id = queue.enqueue("flaky", {"student_id": 1})
+
+    queue.run_one()
+    assert queue.get(job_id)["status"] == "queued" and queue.claim() is None  # backing off
+    time.sleep(0.1)
+    queue.run_one()
+
+    job = queue.get(job_id)
+    assert len(calls) == 2
+    assert job["status"] == "failed" and job["attempts"] == 2
+    assert job["error"] == "ValueError: database is locked"
+
+
+def test_expired_lease_is_retried_and_then_failed(queue):
+    queue.register("stuck", lambda payload: None, max_attempts=2, lease_seconds=0)
+    job_id = queue.enqueue("stuck", {})
+
+    assert queue.claim()["attempts"] == 1  # this worker "dies"
+    assert queue.claim()["attempts"] == 2
+    assert queue.claim() is None
+
+    assert queue.get(job_id)["status"] == "failed"
+    assert queue.get(job_id)["error"] == "worker lost (lease expired)"
+
+
+def test_stale_attempt_cannot_overwrite_a_reclaimed_job(queue):
+    queue.register("slow", lambda payload: None, max_attempts=3, lease_seconds=0)
+    job_id = queue.enqueue("slow", {})
+    stale = queue.claim()
+    queue.types["slow"].lease_seconds = 300
+    current = queue.claim()
+
+    assert current["attempts"] == 2
+    assert not queue.complete(stale, {"from": "stale"})
+    assert queue.fail(stale, "late error") is None
+    assert not queue.renew(stale)
+    assert queue.get(job_id)["status"] == "running"
+
+    assert queue.complete(current, {"from": "current"})
+    assert queue.get(job_id)["result"] == {"from": "current"}
+
+
+def test_lease_is_renewed_while_the_handler_runs(queue):
+    def slow(payload):
+        time.sleep(0.4)
+        return "done"
+
+    queue.register("slow", slow, lease_seconds=0.15)
+    job_id = queue.enqueue("slow", {})
+    claims = []
+    other = JobQueue(queue.path)
+    other.register("slow", slow, lease_seconds=0.15)
+
+    runner = threading.Thread(target=queue.run_one)
+    runner.start()
+    while queue.get(job_id)["status"] != "running":
+        time.sleep(0.01)
+    deadline = time.monotonic() + 0.3
+    while time.monotonic() < deadline:
+        claims.append(other.claim())
+        time.sleep(0.05)
+    runner.join()
+
+    assert claims == [None] * len(claims)
+    assert queue.get(job_id)["status"] == "succeeded" and queue.get(job_id)["attempts"] == 1
+
+
+def test_worker_pool_runs_jobs_in_background(queue):
+    queue.register("square", lambda payload: payload["n"] ** 2, concurrency=2)
+    job_ids = [queue.enqueue("square", {"n": n}) for n in range(5)]
+    pool = JobWorkerPool(queue, threads=2, poll_interval=0.01)
+
+    pool.start()
+    deadline = time.monotonic() + 10
+    while queue.counts()["succeeded"] < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.stop()
+
+    assert [queue.get(job_id)["result"] for job_id in job_ids] == [0, 1, 4, 9, 16]
+
+
+def test_async_goal_generation_returns_a_job(client, seed, app_jobs):
+    seed(Topic, [{"name": f"Topic {i}", "subject": "Maths", "difficulty_level": "easy", "estimated_time": 20}
+                 for i in range(4)])
+
+    accepted = client.post("/api/v1/micro-goals/generate", params={"student_id": 1, "async": "true"})
+    job_url = accepted.json()["status_url"]
+    queued = client.get(job_url).json()
+    assert app_jobs.run_pending() == 1
+    done = client.get(job_url).json()
+
+    assert accepted.status_code == 202 and queued["status"] == "queued"
+    assert done["status"] == "succeeded" and done["attempts"] == 1
+    assert done["result"] == client.post("/api/v1/micro-goals/generate", params={"student_id": 1}).json()
+
+
+def test_async_signal_detection_and_unknown_jobs(client, app_jobs):
+    job_id = client.post("/api/v1/detect-anxiety-signals/1", params={"async": "true"}).json()["job_id"]
+    app_jobs.run_pending()
+
+    result = client.get(f"/api/v1/jobs/{job_id}").json()["result"]
+    assert result["message"] == "Detected 1 anxiety signals"
+    assert [signal["signal_type"] for signal in result["signals"]] == ["stress"]
+    assert len(client.get("/api/v1/anxiety-signals/1").json()) == 1
+    assert client.get("/api/v1/jobs/999").status_code == 404
+
+
+def test_dedicated_worker_requires_the_shared_cache(capsys):
+    from jobs import worker
+
+    with pytest.raises(SystemExit) as exited:
+        worker.main(["--drain"])
+
+    assert exited.value.code == 2
+    assert "EXAM_CACHE" in capsys.readouterr().err
@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import main
+from benchmarks.loadtest import max_sustainable, run_stage
+from database.database import get_db
+from database.models import Base, Student, Topic
+
+
+@pytest.fixture
+def transport(tmp_path):
+    # A file database: renders run concurrently, so sessions need their own connections
+    engine = create_engine(f"sqlite:///{tmp_path / 'load.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([Student(id=i, name=f"Student {i}", email=f"s{i}@example.com", grade="12", exam_type="board")
+                    for i in range(1, 4)])
+        db.add_all([Topic(name=f"Topic {i}", subject="Maths", syllabus_id=1, difficulty_level="easy",
+                          estimated_time=20) for i in range(3)])
+        db.commit()
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = override_get_db
+    yield httpx.ASGITransport(app=main.app)
+    main.app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+
+
+def test_stage_replays_dashboard_mix(transport):
+    stage = asyncio.run(run_stage("http://loadtest", rate=40, duration=0.5, students=3, topics=3,
+                                  transport=transport))
+
+    assert stage["renders"]["n"] > 0
+    assert stage["error_rate"] == 0
+    endpoints = stage["endpoints"]
+    # Every render reads goals and the confidence score twice (Daily Goals/Progress and Analytics tabs)
+    assert endpoints["GET /confidence-score/{id}"]["n"] == 2 * stage["renders"]["n"]
+    assert endpoints["GET /encouragements/{id}/unread-count"]["statuses"] == {"200": stage["renders"]["n"]}
+
+
+def test_max_sustainable_rate_respects_slo():
+    stages = [
+        {"rate": 5, "renders": {"p95_ms": 120}, "error_rate": 0.0},
+        {"rate": 10, "renders": {"p95_ms": 400}, "error_rate": 0.002},
+        {"rate": 20, "renders": {"p95_ms": 300}, "error_rate": 0.05},
+        {"rate": 40, "renders": {"p95_ms": 4000}, "error_rate": 0.0}
+    ]
+
+    assert max_sustainable(stages, slo_p95_ms=500) == 10
+    assert max_sustainable(stages, slo_p95_ms=100) is None
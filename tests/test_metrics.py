@@ -0,0 +1,35 @@
+import pytest
+
+from monitoring.metrics import Histogram, metrics_registry
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    metrics_registry.reset()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1, 5))
+    for value in (0.5, 1, 3, 7):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [("1", 2), ("5", 3), ("+Inf", 4)]
+    assert histogram.sum == 11.5
+
+
+def test_metrics_use_route_templates_and_count_queries(client):
+    client.get("/api/v1/encouragements/1/unread-count")
+    client.get("/api/v1/encouragements/2/unread-count")
+    client.put("/api/v1/encouragements/99/mark-viewed")
+    client.get("/no/such/path")
+
+    text = client.get("/metrics").text
+    labels = 'method="GET",route="/api/v1/encouragements/{student_id}/unread-count"'
+
+    assert f'http_requests_total{{{labels},status="2xx"}} 2' in text
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in text
+    assert f'db_queries_per_request_bucket{{{labels},le="0"}} 0' in text
+    assert f"db_queries_per_request_sum{{{labels}}} 2" in text
+    assert 'method="PUT",route="/api/v1/encouragements/{message_id}/mark-viewed",status="4xx"} 1' in text
+    assert 'route="unmatched",status="4xx"} 1' in text
+    assert "http_requests_in_flight 1" in text  # the /metrics request itself
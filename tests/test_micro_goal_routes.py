@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from database.models import DailyGoalSet, MicroGoal, Topic, TopicSchedule
+
+
+@pytest.fixture(autouse=True)
+def goals(seed):
+    seed(MicroGoal, [{"student_id": 1, "topic_id": topic_id, "goal_text": f"Goal {topic_id}", "estimated_time": 15,
+                      "priority": 3} for topic_id in (1, 2, 3)]
+         + [{"student_id": 2, "topic_id": 1, "goal_text": "Someone else's", "estimated_time": 15, "priority": 3}])
+
+
+def test_complete_is_one_statement_and_idempotent(client, session_factory):
+    statements = []
+    bind = session_factory.kw["bind"]
+    listener = lambda conn, cursor, statement, *args: statements.append(statement.split()[0])
+    event.listen(bind, "before_cursor_execute", listener)
+    first = client.put("/api/v1/micro-goals/1/complete").json()
+    goal_statements = statements[:1]
+    second = client.put("/api/v1/micro-goals/1/complete").json()
+    event.remove(bind, "before_cursor_execute", listener)
+
+    assert goal_statements == ["UPDATE"]
+    assert first["already_completed"] is False
+    assert second["already_completed"] is True
+    with session_factory() as db:
+        goal = db.get(MicroGoal, 1)
+        schedule = db.query(TopicSchedule).filter_by(student_id=1, topic_id=1).one()
+        assert goal.completed and schedule.next_due_at > goal.completed_at
+
+
+def test_reopened_goal_counts_as_a_first_completion(client, seed, session_factory):
+    earlier = datetime.utcnow() - timedelta(days=2)
+    seed(MicroGoal, [{"id": 10, "student_id": 1, "topic_id": 2, "goal_text": "Reopened", "estimated_time": 15,
+                      "priority": 3, "completed": False, "completed_at": earlier}])
+
+    response = client.put("/api/v1/micro-goals/10/complete").json()
+
+    assert response["already_completed"] is False
+    with session_factory() as db:
+        goal = db.get(MicroGoal, 10)
+        schedule = db.query(TopicSchedule).filter_by(student_id=1, topic_id=2).one()
+        assert goal.completed_at > earlier
+        assert schedule.last_reviewed_at == goal.completed_at
+
+
+def test_complete_and_delete_missing_goal(client):
+    assert client.put("/api/v1/micro-goals/99/complete").status_code == 404
+    assert client.delete("/api/v1/micro-goals/99").status_code == 404
+    assert client.delete("/api/v1/micro-goals/1").status_code == 200
+    assert client.delete("/api/v1/micro-goals/1").status_code == 404
+
+
+def test_bulk_complete(client, session_factory):
+    offline = (datetime.utcnow() - timedelta(hours=3)).replace(microsecond=0)
+    client.put("/api/v1/micro-goals/2/complete")
+
+    response = client.post("/api/v1/micro-goals/complete", json={
+        "student_id": 1,
+        "completions": [
+            {"goal_id": 1, "completed_at": offline.isoformat()},
+            {"goal_id": 2},
+            {"goal_id": 4},
+            {"goal_id": 99}
+        ]
+    })
+
+    assert response.json() == {"completed": [1], "already_completed": [2], "not_found": [4, 99]}
+    with session_factory() as db:
+        assert db.get(MicroGoal, 1).completed_at == offline
+        assert not db.get(MicroGoal, 4).completed
+        schedule = db.query(TopicSchedule).filter_by(student_id=1, topic_id=1).one()
+        assert schedule.last_reviewed_at == offline
+
+
+def _generate(client, **params):
+    headers = {"Idempotency-Key": params.pop("key")} if "key" in params else {}
+    response = client.post("/api/v1/micro-goals/generate", params={"student_id": 5, **params}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def topics(seed):
+    seed(Topic, [{"id": i, "name": f"Topic {i}", "subject": "Physics", "syllabus_id": 1, "difficulty_level": "easy",
+                  "estimated_time": 20} for i in range(1, 7)])
+
+
+def test_generate_returns_the_days_set_on_repeat_calls(client, topics, session_factory):
+    first = _generate(client)
+    second = _generate(client)
+
+    assert 2 <= len(first) <= 4
+    assert [goal["id"] for goal in second] == [goal["id"] for goal in first]
+    with session_factory() as db:
+        assert db.query(DailyGoalSet).filter_by(student_id=5).count() == 1
+
+
+def test_regenerate_replaces_open_goals_and_keeps_completed_ones(client, topics, session_factory):
+    first = _generate(client)
+    done = first[0]["id"]
+    client.put(f"/api/v1/micro-goals/{done}/complete")
+
+    second = _generate(client, regenerate=True)
+
+    assert [goal["completed"] for goal in second if goal["id"] == done] == [True]
+    assert not any(goal["completed"] for goal in second if goal["id"] != done)
+    with session_factory() as db:
+        assert db.query(DailyGoalSet).filter_by(student_id=5).one().generation == 1
+        assert db.query(MicroGoal).filter_by(student_id=5).count() == len(second)
+
+
+def test_idempotency_key_retry_returns_the_existing_set(client, topics, session_factory):
+    first = _generate(client, key="sync-1")
+
+    retried = _generate(client, regenerate=True, key="sync-1")
+    with session_factory() as db:
+        assert db.query(DailyGoalSet.generation).filter_by(student_id=5).scalar() == 0
+    _generate(client, regenerate=True, key="sync-2")
+
+    assert retried == first
+    with session_factory() as db:
+        goal_set = db.query(DailyGoalSet).filter_by(student_id=5).one()
+        assert (goal_set.generation, goal_set.idempotency_key) == (1, "sync-2")
+
+
+def test_concurrent_generation_returns_the_winners_set(client, topics, app_engine, session_factory):
+    today = datetime.utcnow().date().isoformat()
+    state = {"raced": False}
+
+    def concurrent_request(conn, cursor, statement, *args):
+        # Another request commits today's set right after this one found none
+        if not state["raced"] and statement.startswith("SELECT") and "FROM daily_goal_sets" in statement:
+            state["raced"] = True
+            raw = cursor.connection
+            raw.execute("INSERT INTO daily_goal_sets (id, student_id, goal_date, generation) VALUES (50, 5, ?, 0)",
+                        (today,))
+            raw.execute("INSERT INTO micro_goals (id, student_id, topic_id, goal_text, estimated_time, priority, "
+                        "created_at, completed, goal_set_id) VALUES (500, 5, 1, 'Winner', 15, 3, ?, 0, 50)",
+                        (datetime.utcnow().isoformat(sep=" "),))
+            raw.commit()
+
+    event.listen(app_engine, "after_cursor_execute", concurrent_request)
+    try:
+        goals = _generate(client)
+    finally:
+        event.remove(app_engine, "after_cursor_execute", concurrent_request)
+
+    assert [goal["id"] for goal in goals] == [500]
+    with session_factory() as db:
+        assert db.query(MicroGoal).filter_by(student_id=5).count() == 1
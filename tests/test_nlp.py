@@ -0,0 +1,79 @@
+import sys
+import threading
+import types
+
+import pytest
+
+from encouragement.engine import EncouragementEngine
+from encouragement.nlp import NLPModelManager
+
+
+class FakeToken:
+    def __init__(self, lemma):
+        self.lemma_ = lemma
+
+
+def fake_spacy(monkeypatch, load):
+    module = types.ModuleType("spacy")
+    module.load = load
+    monkeypatch.setitem(sys.modules, "spacy", module)
+    return module
+
+
+def test_model_is_loaded_lazily_and_once(monkeypatch):
+    calls = []
+
+    def load(name, disable):
+        calls.append((name, disable))
+        return lambda text: [FakeToken("revise")]
+
+    fake_spacy(monkeypatch, load)
+    manager = NLPModelManager(model_name="fake_model", enabled=True, disable_pipes="parser, ner")
+    assert manager.stats()["state"] == "unloaded" and calls == []
+
+    threads = [threading.Thread(target=manager.get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [("fake_model", ["parser", "ner"])]
+    assert manager.get() is manager.get()
+    assert manager.stats()["state"] == "loaded" and manager.stats()["load_seconds"] is not None
+
+
+@pytest.mark.parametrize("spacy_module", [None, "missing model"])
+def test_missing_spacy_or_model_falls_back_for_good(monkeypatch, spacy_module):
+    calls = []
+    if spacy_module is None:
+        monkeypatch.setitem(sys.modules, "spacy", None)  # import spacy raises ImportError
+    else:
+        def load(name, disable):
+            calls.append(name)
+            raise OSError(f"[E050] Can't find model '{name}'")
+        fake_spacy(monkeypatch, load)
+    manager = NLPModelManager(enabled=True)
+
+    assert manager.get() is None
+    assert manager.get() is None
+    assert manager.stats()["state"] == "failed" and manager.stats()["error"]
+    assert len(calls) <= 1
+
+
+def test_disabled_manager_never_imports_spacy(monkeypatch):
+    monkeypatch.setitem(sys.modules, "spacy", None)
+    manager = NLPModelManager(enabled=False)
+
+    assert manager.warmup()["state"] == "disabled"
+    assert manager.get() is None
+
+
+def test_goal_kind_uses_lemmas_or_keyword_fallback(monkeypatch):
+    engine = EncouragementEngine()
+    engine.nlp_models = NLPModelManager(enabled=False)
+    assert engine._goal_kind("Revise the periodic table") == "revision"
+    assert engine._goal_kind("Plan tomorrow") is None
+
+    fake_spacy(monkeypatch, lambda name, disable: lambda text: [FakeToken("solve"), FakeToken("problem")])
+    engine.nlp_models = NLPModelManager(enabled=True)
+    assert engine._goal_kind("Solved five problems") == "practice"
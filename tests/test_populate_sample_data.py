@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from database.models import AnxietySignal, PerformanceRecord, Student, TopicSchedule
+from populate_sample_data import planned_counts, populate
+
+NOW = datetime(2024, 3, 1, 12, 0)
+
+
+def _populate(path, **kwargs):
+    engine = create_engine(f"sqlite:///{path}")
+    counts = populate(engine, students=40, topics=20, days=14, now=NOW, **kwargs)
+    return engine, counts
+
+
+def test_row_counts_match_the_plan(tmp_path):
+    engine, counts = _populate(tmp_path / "a.db")
+
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).select_from(Student)) == 40
+        assert db.scalar(select(func.count()).select_from(PerformanceRecord)) == planned_counts(40, 14, 2.0, 1.0)["performance_records"]
+        # One schedule per (student, topic) pair that has records
+        pairs = db.execute(select(PerformanceRecord.student_id, PerformanceRecord.topic_id).distinct()).all()
+        assert db.scalar(select(func.count()).select_from(TopicSchedule)) == len(pairs) == counts["topic_schedules"]
+        assert db.scalar(select(func.max(PerformanceRecord.date))) <= NOW
+    engine.dispose()
+
+
+def test_same_seed_same_rows(tmp_path):
+    rows = []
+    for name in ("a.db", "b.db"):
+        engine, _ = _populate(tmp_path / name, seed=3)
+        with Session(engine) as db:
+            rows.append(db.execute(select(PerformanceRecord.student_id, PerformanceRecord.date,
+                                          PerformanceRecord.score).order_by(PerformanceRecord.id)).all())
+        engine.dispose()
+    assert rows[0] == rows[1]
+
+
+def test_anxiety_profile_shifts_stress_signals(tmp_path):
+    shares = {}
+    for profile in ("low", "high"):
+        engine, _ = _populate(tmp_path / f"{profile}.db", anxiety_profile=profile)
+        with Session(engine) as db:
+            total = db.scalar(select(func.count()).select_from(AnxietySignal))
+            stress = db.scalar(select(func.count()).where(AnxietySignal.signal_type == "stress"))
+        shares[profile] = stress / total
+        engine.dispose()
+    assert shares["high"] > shares["low"] + 0.2
+
+
+def test_refuses_to_append_without_reset(tmp_path):
+    engine, _ = _populate(tmp_path / "a.db")
+    with pytest.raises(ValueError):
+        populate(engine, students=5, now=NOW)
+    assert populate(engine, students=5, topics=15, now=NOW, reset=True)["students"] == 5
+    engine.dispose()
@@ -0,0 +1,73 @@
+import pstats
+
+import pytest
+from database.models import Topic
+from monitoring.profiling import ProfileCapture, request_profiler
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture(autouse=True)
+def profiler(seed, tmp_path, monkeypatch):
+    seed(Topic, [{"name": f"Topic {i}", "subject": "Maths", "syllabus_id": 1, "difficulty_level": "easy",
+                  "estimated_time": 20} for i in range(4)])
+    monkeypatch.setattr(request_profiler, "admin_token", TOKEN)
+    monkeypatch.setattr(request_profiler, "directory", str(tmp_path))
+    monkeypatch.setattr(request_profiler, "interval", 0.0005)
+    yield request_profiler
+    request_profiler.arm(0)
+
+
+def test_admin_endpoints_require_token(client):
+    assert client.post("/api/v1/admin/profiling/arm").status_code == 403
+    assert client.get("/api/v1/admin/profiling/captures", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_armed_request_records_phases_and_collapsed_stacks(client, tmp_path):
+    headers = {"X-Admin-Token": TOKEN}
+    assert client.post("/api/v1/admin/profiling/arm", params={"requests": 1}, headers=headers).json()["armed_requests"] == 1
+
+    response = client.post("/api/v1/micro-goals/generate", params={"student_id": 1})
+    client.post("/api/v1/micro-goals/generate", params={"student_id": 2})  # not captured
+
+    captures = client.get("/api/v1/admin/profiling/captures", headers=headers).json()
+    assert len(captures) == 1
+    capture = captures[0]
+    assert response.headers["X-Profile-Capture"] == capture["id"]
+    assert [p["phase"] for p in capture["phases"]] == ["load", "analyze", "render", "persist"]
+    collapsed = client.get(f"/api/v1/admin/profiling/captures/{capture['files'][0]}", headers=headers).text
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and "generate_daily_goals" in stack
+
+
+def test_profile_header_captures_with_cprofile(client, tmp_path):
+    response = client.get("/api/v1/confidence-score/1", headers={"X-Profile": "cprofile", "X-Admin-Token": TOKEN})
+    capture_id = response.headers["X-Profile-Capture"]
+
+    stats = pstats.Stats(str(tmp_path / f"{capture_id}.pstats"))
+    assert any(name == "calculate_confidence_score" for _, _, name in stats.stats)
+
+    # Without a valid token the header is ignored
+    assert "X-Profile-Capture" not in client.get("/api/v1/confidence-score/1", headers={"X-Profile": "1"}).headers
+
+
+def test_phase_timings_are_exported(client):
+    client.post("/api/v1/encouragements/generate/1")
+
+    text = client.get("/metrics").text
+
+    assert 'engine_phase_seconds_count{engine="encouragement",phase="analyze"}' in text
+    assert 'engine_call_seconds_count{engine="encouragement",call="generate_personalized_encouragement"}' in text
+
+
+def test_capture_only_samples_registered_threads(tmp_path):
+    capture = ProfileCapture("unit", "sample", 0.0005)
+    capture.start()
+    capture.enter_thread()
+    sum(i * i for i in range(200000))
+    capture.exit_thread()
+    meta = capture.finish(str(tmp_path))
+
+    assert meta["samples"] > 0
+    assert all("test_capture_only_samples_registered_threads" in stack for stack in capture.samples)
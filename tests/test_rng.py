@@ -0,0 +1,53 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.models import AnxietySignal, Topic
+from encouragement.engine import encouragement_engine
+from micro_goals.engine import micro_goal_engine
+from utils.rng import derive_rng, derive_seed
+
+DAY = date(2026, 3, 2)
+
+
+@pytest.fixture
+def topics(seed):
+    seed(Topic, [{"id": i, "name": f"Topic {i}", "subject": "Chemistry", "syllabus_id": 1,
+                  "difficulty_level": "medium", "estimated_time": 25} for i in range(1, 9)])
+
+
+def _goals(db, day=DAY, variant=0):
+    return [goal.model_dump() for goal in micro_goal_engine.generate_daily_goals(db, 1, day=day, variant=variant)]
+
+
+def test_seed_depends_on_every_input():
+    seed = derive_seed(1, DAY, "engine/1")
+
+    assert derive_seed(1, DAY, "engine/1") == seed
+    assert len({seed, derive_seed(2, DAY, "engine/1"), derive_seed(1, DAY + timedelta(days=1), "engine/1"),
+                derive_seed(1, DAY, "engine/2"), derive_seed(1, DAY, "engine/1", variant=1)}) == 5
+    assert derive_rng(1, DAY, "engine/1").random() == derive_rng(1, DAY, "engine/1").random()
+
+
+def test_daily_goals_replay_for_the_same_student_and_day(db, topics):
+    first = _goals(db)
+
+    assert _goals(db) == first
+    assert any(_goals(db, day=DAY + timedelta(days=offset)) != first for offset in range(1, 4))
+    assert any(_goals(db, variant=variant) != first for variant in range(1, 4))
+
+
+def test_daily_encouragement_replays_for_the_same_student_and_day(db, seed):
+    seed(AnxietySignal, [{"student_id": 7, "signal_type": "stress", "value": 60.0, "description": "drop",
+                          "detected_at": datetime.utcnow() - timedelta(days=1)}])
+
+    def message(day):
+        # Rolled back so each call starts from the same rotation state
+        text = encouragement_engine.generate_daily_encouragement(db, 7, day=day)
+        db.rollback()
+        return text
+
+    first = message(DAY)
+
+    assert message(DAY) == first
+    assert any(message(DAY + timedelta(days=offset)) != first for offset in range(1, 6))
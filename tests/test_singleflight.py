@@ -0,0 +1,76 @@
+import threading
+import time
+
+from anxiety_signals.engine import anxiety_signals_engine
+from monitoring.metrics import metrics_registry
+from utils.singleflight import SingleFlight, single_flight_registry
+
+
+def _run_concurrently(group, callers, fn):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(group.do(("student", 1), fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results, errors
+
+
+def _blocking(group, callers, outcome):
+    """A computation that finishes only once every other caller is waiting on it"""
+    def compute():
+        deadline = time.monotonic() + 5
+        while group.stats()["coalesced"] < callers - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return outcome()
+    return compute
+
+
+def test_concurrent_callers_share_one_execution():
+    group = SingleFlight("test")
+    runs = []
+
+    results, errors = _run_concurrently(group, 8, _blocking(group, 8, lambda: runs.append(1) or 71.5))
+
+    assert results == [71.5] * 8 and not errors
+    assert len(runs) == 1
+    assert group.stats() == {"executed": 1, "coalesced": 7, "in_flight": 0}
+    # Finished calls are forgotten: the next caller computes afresh
+    assert group.do(("student", 1), lambda: 80.0) == 80.0
+
+
+def test_followers_get_the_leaders_exception():
+    group = SingleFlight("test")
+
+    def fail():
+        raise ValueError("no records")
+
+    results, errors = _run_concurrently(group, 4, _blocking(group, 4, fail))
+
+    assert results == [] and len(errors) == 4
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_disabled_group_runs_every_call():
+    group = SingleFlight("test", enabled=False)
+
+    assert [group.do("key", lambda: 1) for _ in range(3)] == [1, 1, 1]
+    assert group.stats()["executed"] == 3 and group.stats()["coalesced"] == 0
+
+
+def test_engine_entry_points_are_coalesced(db):
+    before = single_flight_registry.stats().get("anxiety_signals.calculate_confidence_score", {"executed": 0})
+
+    anxiety_signals_engine.calculate_confidence_score(db, 1)
+
+    after = single_flight_registry.stats()["anxiety_signals.calculate_confidence_score"]
+    assert after["executed"] == before["executed"] + 1
+    assert 'singleflight_calls_total{call="anxiety_signals.calculate_confidence_score",outcome="coalesced"}' \
+        in metrics_registry.render()
@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import text
+
+from database.models import Student
+from monitoring.sql_profiler import QueryBudgetExceeded, fingerprint, profile_queries
+
+
+@pytest.fixture(autouse=True)
+def student(seed):
+    seed(Student, [{"name": "Asha", "email": "asha@example.com", "grade": "12", "exam_type": "board"}])
+
+
+def test_fingerprint_normalizes_values():
+    assert fingerprint("SELECT * FROM t WHERE id = 12 AND name = 'it''s'") == "SELECT * FROM t WHERE id = ? AND name = ?"
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?,\n ?)") == fingerprint("SELECT * FROM t WHERE id IN (?)")
+
+
+def test_profile_flags_repeated_and_slow_statements(engine):
+    with engine.connect() as conn, profile_queries("loop", slow_ms=0) as profile:
+        for student_id in range(3):
+            conn.execute(text("SELECT name FROM students WHERE id = :id"), {"id": student_id})
+        conn.execute(text("SELECT name FROM students WHERE id = :id"), {"id": 0})
+
+    assert profile.queries == 4
+    assert profile.repeated() == [("SELECT name FROM students WHERE id = ?", 4)]
+    assert profile.identical_repeats() == 1
+    assert profile.flagged and len(profile.slow) == 4
+    assert "repeated x4" in profile.summary()
+
+
+def test_query_budget_fixture(client, query_budget):
+    with query_budget("GET /api/v1/encouragements/{student_id}/unread-count", max_queries=1):
+        assert client.get("/api/v1/encouragements/1/unread-count").status_code == 200
+
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget("GET /api/v1/students/{student_id}", max_queries=0):
+            client.get("/api/v1/students/1")
+
+
+def test_endpoint_query_budgets(client, query_budget):
+    with query_budget("POST /api/v1/micro-goals/generate", max_queries=16, max_repeats=0):
+        assert client.post("/api/v1/micro-goals/generate", params={"student_id": 1}).status_code == 200
+    with query_budget("GET /api/v1/confidence-score/{student_id}", max_queries=5, max_repeats=0):
+        assert client.get("/api/v1/confidence-score/1").status_code == 200
+    with query_budget("POST /api/v1/encouragements/generate/{student_id}", max_queries=8, max_repeats=0):
+        assert client.post("/api/v1/encouragements/generate/1").status_code == 200
@@ -0,0 +1,158 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+import subprocess
+import sys
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+import main
+from database.database import build_engine
+from database.migrate import main as migrate_main, migrate
+from database.models import Base, MicroGoal, Student, Topic, TopicSchedule
+from topic_scheduler.engine import topic_scheduler_engine
+from utils.warmup import HEAVY_MODULES, StartupWarmup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Schema of the first release, before columns and indexes were added to existing tables
+BASELINE_SCHEMA = """
+CREATE TABLE students (id INTEGER NOT NULL, name VARCHAR, email VARCHAR, grade VARCHAR, exam_type VARCHAR,
+                       created_at DATETIME, PRIMARY KEY (id));
+CREATE UNIQUE INDEX ix_students_email ON students (email);
+CREATE TABLE topics (id INTEGER NOT NULL, name VARCHAR, subject VARCHAR, syllabus_id INTEGER,
+                     difficulty_level VARCHAR, estimated_time INTEGER, PRIMARY KEY (id));
+CREATE TABLE performance_records (id INTEGER NOT NULL, student_id INTEGER, topic_id INTEGER, date DATETIME,
+                                  score FLOAT, time_spent INTEGER, mistakes TEXT, completed BOOLEAN, PRIMARY KEY (id));
+CREATE TABLE micro_goals (id INTEGER NOT NULL, student_id INTEGER, topic_id INTEGER, goal_text TEXT,
+                          estimated_time INTEGER, priority INTEGER, created_at DATETIME, completed BOOLEAN,
+                          completed_at DATETIME, PRIMARY KEY (id));
+INSERT INTO students (id, name, email) VALUES (1, 'Asha', 'asha@example.com');
+INSERT INTO topics (id, name, subject, syllabus_id) VALUES (1, 'Algebra', 'Math', 1);
+INSERT INTO micro_goals (id, student_id, topic_id, goal_text, completed) VALUES (1, 1, 1, 'Review algebra', 0);
+"""
+
+
+def test_importing_the_api_loads_no_heavy_modules_and_no_database(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k != "EXAM_DATABASE_URL"}
+    env["PYTHONPATH"] = ROOT
+    script = f"import sys, main; print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+
+    output = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "[]"
+    assert not (tmp_path / "exam_anxiety.db").exists()
+
+
+def test_ready_reports_warmup_progress(client, monkeypatch):
+    warmup = StartupWarmup("background")
+    warmup.add("schema", lambda: None, deferred=False)
+    warmup.add("imports", lambda: None)
+    monkeypatch.setattr(main, "startup_warmup", warmup)
+
+    before = client.get("/ready")
+    warmup.start()
+    assert warmup.wait(timeout=10)
+    after = client.get("/ready")
+
+    assert before.status_code == 503 and before.json()["steps"]["schema"]["state"] == "pending"
+    assert after.status_code == 200
+    assert {name: step["state"] for name, step in after.json()["steps"].items()} == {"schema": "done", "imports": "done"}
+
+
+def test_failed_step_keeps_worker_unready():
+    warmup = StartupWarmup("startup")
+    warmup.add("imports", lambda: __import__("no_such_module_for_warmup"))
+    warmup.start()
+
+    assert not warmup.ready
+    assert warmup.stats()["steps"]["imports"]["error"].startswith("ModuleNotFoundError")
+
+
+def test_migrate_is_idempotent(tmp_path, capsys, engine):
+    url = f"sqlite:///{tmp_path / 'fresh.db'}"
+
+    assert migrate_main(["--url", url]) == 0
+    assert "students" in capsys.readouterr().out
+    assert migrate_main(["--url", url]) == 0
+    assert capsys.readouterr().out.strip() == "Schema is up to date"
+    assert migrate(engine) == []
+
+
+def test_migrate_upgrades_a_baseline_database(tmp_path):
+    path = tmp_path / "baseline.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+    engine = build_engine(f"sqlite:///{path}")
+
+    changes = migrate(engine)
+
+    assert "column students.daily_study_minutes" in changes
+    assert "column micro_goals.goal_set_id" in changes
+    assert "index ix_performance_records_student_date" in changes
+    assert "index ix_micro_goals_student_completed_at" in changes
+    assert "index ix_topics_syllabus_id" in changes
+    inspector = inspect(engine)
+    for name, table in Base.metadata.tables.items():
+        assert {column.name for column in table.columns} <= {c["name"] for c in inspector.get_columns(name)}
+        assert {index.name for index in table.indexes} <= {i["name"] for i in inspector.get_indexes(name)}
+    with Session(engine) as db:
+        assert db.query(Student).one().daily_study_minutes == 60
+        assert db.query(MicroGoal).one().goal_set_id is None
+        assert db.query(Topic).one().syllabus_id == 1
+    assert migrate(engine) == []
+    engine.dispose()
+
+
+def test_migrate_tolerates_a_column_added_by_another_worker(tmp_path):
+    path = tmp_path / "baseline.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+    engine = build_engine(f"sqlite:///{path}")
+    raced = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def add_column_first(conn, cursor, statement, parameters, context, executemany):
+        # Another worker's migration lands between our inspection and our ALTER
+        if statement.startswith("ALTER TABLE students") and not raced:
+            raced.append(statement)
+            with sqlite3.connect(path) as other:
+                other.execute(statement)
+
+    changes = migrate(engine)
+
+    assert raced
+    assert "column students.daily_study_minutes" not in changes
+    assert "daily_study_minutes" in {c["name"] for c in inspect(engine).get_columns("students")}
+    assert migrate(engine) == []
+    engine.dispose()
+
+
+def test_migrate_rebuilds_schedules_from_existing_history(tmp_path):
+    path = tmp_path / "baseline.db"
+    now = datetime.utcnow()
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+        conn.executemany(
+            "INSERT INTO topics (id, name, subject, syllabus_id) VALUES (?, ?, 'Math', 1)",
+            [(2, "Geometry"), (3, "Calculus")]
+        )
+        # Topic 1 passed twice long ago and is now due; topic 3 was just reviewed
+        conn.executemany(
+            "INSERT INTO performance_records (student_id, topic_id, date, score) VALUES (1, ?, ?, ?)",
+            [(1, str(now - timedelta(days=20)), 90.0), (1, str(now - timedelta(days=19)), 90.0),
+             (3, str(now - timedelta(hours=1)), 80.0)]
+        )
+    engine = build_engine(f"sqlite:///{path}")
+
+    changes = migrate(engine)
+
+    assert "schedules for 1 student(s)" in changes
+    with Session(engine) as db:
+        assert db.query(TopicSchedule).filter_by(student_id=1, topic_id=1).one().repetitions == 2
+        due = topic_scheduler_engine.due_topics(db, 1, limit=3)
+        assert [topic.id for topic in due] == [1, 2]
+    assert migrate(engine) == []
+    engine.dispose()
@@ -0,0 +1,47 @@
+from database.models import PerformanceRecord, Student, Topic
+
+
+def test_create_student_rejects_duplicate_email(client):
+    body = {"name": "Asha", "email": "asha@example.com", "grade": "12", "exam_type": "board"}
+
+    created = client.post("/api/v1/students", json=body)
+    duplicate = client.post("/api/v1/students", json=body)
+
+    assert created.status_code == 200 and created.json()["daily_study_minutes"] == 60
+    assert duplicate.status_code == 400
+    assert client.get(f"/api/v1/students/{created.json()['id']}").json()["email"] == "asha@example.com"
+    assert client.get("/api/v1/students/999").status_code == 404
+
+
+def test_enrollment_scopes_the_topic_catalog(client, seed):
+    seed(Student, [{"id": 1, "name": "Asha", "email": "asha@example.com"}])
+    seed(Topic, [{"name": f"Topic {i}", "subject": "Maths" if i < 3 else "Physics", "syllabus_id": 1 if i < 3 else 2,
+                  "difficulty_level": "easy", "estimated_time": 20} for i in range(5)])
+
+    assert len(client.get("/api/v1/students/1/topics").json()) == 5
+    assert client.post("/api/v1/students/1/syllabi", json={"syllabus_id": 2}).status_code == 200
+    assert client.post("/api/v1/students/1/syllabi", json={"syllabus_id": 2}).status_code == 409
+    assert client.post("/api/v1/students/1/syllabi", json={"syllabus_id": 9}).status_code == 404
+    assert client.post("/api/v1/students/99/syllabi", json={"syllabus_id": 2}).status_code == 404
+
+    assert [t["subject"] for t in client.get("/api/v1/students/1/topics").json()] == ["Physics", "Physics"]
+    assert client.delete("/api/v1/students/1/syllabi/2").json()["success"] is True
+    assert len(client.get("/api/v1/students/1/topics").json()) == 5
+    assert client.delete("/api/v1/students/1/syllabi/2").status_code == 404
+
+
+def test_log_and_list_performance_records(client, db):
+    record = {"student_id": 3, "topic_id": 1, "score": 72.5, "time_spent": 25, "mistakes": None, "completed": True}
+
+    response = client.post("/api/v1/performance-records", json=record)
+
+    assert response.status_code == 200
+    assert [r["score"] for r in client.get("/api/v1/performance-records/3").json()] == [72.5]
+    assert db.query(PerformanceRecord).filter_by(student_id=3).count() == 1
+
+
+def test_create_student_rejects_a_negative_study_budget(client):
+    response = client.post("/api/v1/students/", json={"name": "Ravi", "email": "ravi@example.com", "grade": "12",
+                                                      "exam_type": "board", "daily_study_minutes": -10})
+
+    assert response.status_code == 422
@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from utils.templates import CompiledTemplate, TemplateRegistry, TemplateValidationError
+
+
+def write_catalog(directory, locale, version, templates):
+    path = directory / "greetings" / f"{locale}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": version, "templates": templates}), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = TemplateRegistry(directory=str(tmp_path), poll_interval=0)
+    registry.register("greetings", {"hello": {"name"}})
+    return registry
+
+
+def test_compiled_template_matches_str_format():
+    source = "Solve {num_questions} {difficulty} problems on {topic_name} ({time_estimate} mins)"
+    values = dict(num_questions=4, difficulty="easy", topic_name="Waves", time_estimate=12.5)
+
+    assert CompiledTemplate(source)(**values) == source.format(**values)
+    assert CompiledTemplate("No placeholders {{here}}")() == "No placeholders {here}"
+
+
+def test_unknown_placeholder_is_rejected(tmp_path, registry):
+    write_catalog(tmp_path, "en", 1, {"hello": ["Hi {nme}"]})
+
+    with pytest.raises(TemplateValidationError):
+        registry.get("greetings")
+
+
+def test_hot_reload_keeps_last_good_catalog(tmp_path, registry):
+    path = write_catalog(tmp_path, "en", 1, {"hello": ["Hi {name}"]})
+    assert registry.get("greetings")["hello"][0](name="Asha") == "Hi Asha"
+
+    write_catalog(tmp_path, "en", 2, {"hello": ["Hello {name}"]})
+    os.utime(path, (1, 1))
+    assert registry.get("greetings").version == "2"
+
+    write_catalog(tmp_path, "en", 3, {"hello": ["Hello {unknown}"]})
+    os.utime(path, (2, 2))
+    assert registry.get("greetings").version == "2"
+
+
+def test_missing_locale_falls_back_to_default(tmp_path, registry):
+    write_catalog(tmp_path, "en", 1, {"hello": ["Hi {name}"]})
+
+    assert registry.get("greetings", "hi")["hello"][0](name="Ravi") == "Hi Ravi"
+
+
+def test_new_locale_file_replaces_the_fallback(tmp_path, registry):
+    write_catalog(tmp_path, "en", 1, {"hello": ["Hi {name}"]})
+    assert registry.get("greetings", "fr")["hello"][0](name="Léa") == "Hi Léa"
+
+    write_catalog(tmp_path, "fr", 1, {"hello": ["Salut {name}"]})
+
+    assert registry.get("greetings", "fr")["hello"][0](name="Léa") == "Salut Léa"
+    assert registry.get("greetings")["hello"][0](name="Léa") == "Hi Léa"
+
+
+def test_bad_edit_is_reported_once(tmp_path, registry, caplog):
+    path = write_catalog(tmp_path, "en", 1, {"hello": ["Hi {name}"]})
+    registry.get("greetings")
+    write_catalog(tmp_path, "en", 2, {"hello": ["Hi {unknown}"]})
+    os.utime(path, (1, 1))
+
+    for _ in range(3):
+        assert registry.get("greetings").version == "1"
+
+    assert len([r for r in caplog.records if r.levelname == "ERROR"]) == 1
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.models import Topic, TopicSchedule
+from topic_scheduler.engine import topic_scheduler_engine as scheduler
+
+NOW = datetime(2024, 3, 1, 9, 0)
+
+
+@pytest.mark.parametrize("score, quality", [(None, 0), (0, 0), (9, 0), (50, 2), (59, 3), (70, 4), (100, 5), (130, 5)])
+def test_score_to_quality(score, quality):
+    assert scheduler.score_to_quality(score) == quality
+
+
+def test_passing_reviews_grow_the_interval():
+    state = (2.5, 0, 0)
+    intervals = []
+    for _ in range(4):
+        state = scheduler.next_state(*state, quality=4)
+        intervals.append(state[1])
+
+    assert intervals == [1, 6, 15.0, 37.5]
+    assert state == (2.5, 37.5, 4)
+
+
+def test_easiness_moves_with_quality_and_has_a_floor():
+    assert scheduler.next_state(2.5, 6, 2, 5)[0] == 2.6
+    assert scheduler.next_state(2.5, 6, 2, 3)[0] == 2.36
+    assert scheduler.next_state(1.35, 6, 2, 3)[0] == scheduler.min_easiness
+
+
+def test_failing_review_resets_repetitions():
+    easiness, interval, repetitions = scheduler.next_state(2.5, 37.5, 4, 1)
+
+    assert (interval, repetitions) == (1, 0)
+    assert easiness == 1.96
+
+
+def _topics(seed):
+    seed(Topic, [{"id": i, "name": f"Topic {i}", "subject": "Math", "syllabus_id": 1 if i <= 3 else 2,
+                  "difficulty_level": "easy", "estimated_time": 20} for i in range(1, 6)])
+
+
+def test_due_topics_puts_most_overdue_first_then_never_practised(db, seed):
+    _topics(seed)
+    seed(TopicSchedule, [
+        {"student_id": 1, "topic_id": 2, "next_due_at": NOW - timedelta(days=1)},
+        {"student_id": 1, "topic_id": 4, "next_due_at": NOW - timedelta(days=3)},
+        {"student_id": 1, "topic_id": 1, "next_due_at": NOW + timedelta(days=2)},
+        {"student_id": 2, "topic_id": 3, "next_due_at": NOW - timedelta(days=9)},
+    ])
+
+    assert [t.id for t in scheduler.due_topics(db, 1, limit=4, now=NOW)] == [4, 2, 3, 5]
+    assert [t.id for t in scheduler.due_topics(db, 1, limit=1, now=NOW)] == [4]
+    assert [t.id for t in scheduler.due_topics(db, 1, limit=4, now=NOW, syllabus_ids=[1])] == [2, 3]
+    assert scheduler.due_topics(db, 1, limit=4, now=NOW, syllabus_ids=[]) == []
+
+
+def test_record_goal_completions_touches_topics_without_changing_sm2_state(db, seed):
+    _topics(seed)
+    seed(TopicSchedule, [{"student_id": 1, "topic_id": 1, "easiness": 2.2, "interval_days": 15, "repetitions": 3,
+                          "last_reviewed_at": NOW - timedelta(days=20), "next_due_at": NOW + timedelta(days=5)}])
+
+    touched = scheduler.record_goal_completions(db, 1, [(1, NOW), (2, NOW - timedelta(hours=2)), (2, NOW), (None, NOW)])
+    db.flush()
+
+    existing = db.query(TopicSchedule).filter_by(student_id=1, topic_id=1).one()
+    new = db.query(TopicSchedule).filter_by(student_id=1, topic_id=2).one()
+    assert touched == 2
+    assert (existing.easiness, existing.interval_days, existing.repetitions) == (2.2, 15, 3)
+    assert existing.last_reviewed_at == NOW and existing.next_due_at == NOW + timedelta(days=5)
+    assert new.repetitions == 0 and new.last_reviewed_at == NOW
+    assert new.next_due_at == NOW + timedelta(days=1)
+    assert scheduler.record_goal_completions(db, 1, []) == 0
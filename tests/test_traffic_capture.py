@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import main
+from benchmarks.replay import StudentMapper, load_trace, replay
+from database.database import get_db
+from database.models import Base, MicroGoal, Student, Topic
+from monitoring.traffic_capture import TrafficCaptureMiddleware, TrafficCaptureWriter, hash_student_id
+
+SALT = "test-salt"
+
+
+@pytest.fixture
+def database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([Student(id=i, name=f"Student {i}", email=f"s{i}@example.com", grade="12", exam_type="board")
+                    for i in (7, 8)])
+        db.add(Topic(name="Algebra", subject="Maths", syllabus_id=1, difficulty_level="easy", estimated_time=20))
+        db.add_all([MicroGoal(student_id=7, topic_id=1, goal_text="Revise algebra", estimated_time=15, priority=1)
+                    for _ in range(2)])
+        db.commit()
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = override_get_db
+    yield tmp_path / "snapshot.db"
+    main.app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+
+
+def _capture(tmp_path):
+    writer = TrafficCaptureWriter(str(tmp_path / "trace.jsonl"))
+    client = TestClient(TrafficCaptureMiddleware(main.app, salt=SALT, writer=writer))
+    client.get("/api/v1/confidence-score/7")
+    client.post("/api/v1/performance-records", json={
+        "student_id": 7, "topic_id": 1, "score": 80.0, "time_spent": 30, "mistakes": "sign error in step 2"
+    })
+    client.post("/api/v1/micro-goals/generate", params={"student_id": 8})
+    client.get("/api/v1/admin/profiling/captures")  # admin traffic is never captured
+    client.get("/metrics")
+    writer.close()
+    return str(tmp_path / "trace.jsonl")
+
+
+def test_capture_is_sanitized(database, tmp_path):
+    path = _capture(tmp_path)
+    text = open(path).read()
+    records = [json.loads(line) for line in text.splitlines()]
+
+    assert [(r["m"], r["r"]) for r in records] == [
+        ("GET", "/api/v1/confidence-score/{student_id}"),
+        ("POST", "/api/v1/performance-records"),
+        ("POST", "/api/v1/micro-goals/generate")
+    ]
+    assert records[0]["p"] == {"student_id": hash_student_id(7, SALT)}
+    assert records[1]["b"]["student_id"] == hash_student_id(7, SALT)
+    assert records[1]["b"]["mistakes"] == "t:20" and records[1]["b"]["score"] == 80.0
+    assert records[2]["q"] == {"student_id": hash_student_id(8, SALT)}
+    assert "sign error" not in text
+    assert all(r["s"] == 200 and r["ms"] > 0 for r in records)
+
+
+def test_replay_maps_students_back_onto_the_snapshot(database, tmp_path):
+    records = load_trace(_capture(tmp_path))
+    mapper = StudentMapper.from_snapshot(str(database), SALT)
+    assert mapper(hash_student_id(8, SALT)) == 8
+
+    report = asyncio.run(replay("http://replay", records, mapper, speed=100,
+                                transport=httpx.ASGITransport(app=main.app)))
+
+    assert report["error_rate"] == 0
+    assert report["endpoints"]["GET /api/v1/confidence-score/{student_id}"]["statuses"] == {"200": 1}
+    assert report["endpoints"]["POST /api/v1/performance-records"]["statuses"] == {"200": 1}
+
+
+def test_bulk_completion_keeps_timestamps_and_replays(database, tmp_path):
+    writer = TrafficCaptureWriter(str(tmp_path / "trace.jsonl"))
+    client = TestClient(TrafficCaptureMiddleware(main.app, salt=SALT, writer=writer))
+    response = client.post("/api/v1/micro-goals/complete", json={
+        "student_id": 7, "completions": [{"goal_id": 1, "completed_at": "2026-10-19T08:30:00Z"}, {"goal_id": 2}]
+    })
+    writer.close()
+    assert response.status_code == 200
+
+    records = load_trace(str(tmp_path / "trace.jsonl"))
+    assert records[0]["b"]["completions"][0] == {"goal_id": 1, "completed_at": "2026-10-19T08:30:00Z"}
+
+    report = asyncio.run(replay("http://replay", records, StudentMapper.from_snapshot(str(database), SALT),
+                                speed=100, transport=httpx.ASGITransport(app=main.app)))
+
+    assert report["endpoints"]["POST /api/v1/micro-goals/complete"]["statuses"] == {"200": 1}
+
+
+def test_unsalted_mapping_is_stable_and_in_range():
+    mapper = StudentMapper([3, 5, 9])
+    pseudonyms = [hash_student_id(i, "unknown") for i in range(50)]
+
+    assert [mapper(p) for p in pseudonyms] == [mapper(p) for p in pseudonyms]
+    assert {mapper(p) for p in pseudonyms} <= {3, 5, 9}
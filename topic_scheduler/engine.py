@@ -0,0 +1,198 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, exists
+from sqlalchemy.orm import Session
+
+from database.models import PerformanceRecord, Topic, TopicSchedule
+
+
+class TopicSchedulerEngine:
+    def __init__(self):
+        # SM-2 parameters
+        self.initial_easiness = 2.5
+        self.min_easiness = 1.3
+        self.first_intervals = (1, 6)  # days after the 1st and 2nd passing review
+        self.passing_quality = 3       # quality below this restarts the topic
+
+    def score_to_quality(self, score: float) -> int:
+        """
+        Map a percentage score onto the SM-2 0-5 recall quality scale
+        """
+        if score is None:
+            return 0
+        return max(0, min(5, int(round(score / 20.0))))
+
+    def next_state(self, easiness: float, interval_days: float, repetitions: int, quality: int) -> Tuple[float, float, int]:
+        """
+        Apply one SM-2 review and return (easiness, interval_days, repetitions)
+        """
+        if quality < self.passing_quality:
+            # Failed recall - see the topic again tomorrow
+            repetitions = 0
+            interval_days = self.first_intervals[0]
+        else:
+            if repetitions == 0:
+                interval_days = self.first_intervals[0]
+            elif repetitions == 1:
+                interval_days = self.first_intervals[1]
+            else:
+                interval_days = round(interval_days * easiness, 2)
+            repetitions += 1
+
+        easiness = easiness + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        easiness = max(self.min_easiness, easiness)
+
+        return round(easiness, 4), interval_days, repetitions
+
+    def record_review(self, db: Session, student_id: int, topic_id: int, score: float,
+                      reviewed_at: Optional[datetime] = None) -> TopicSchedule:
+        """
+        Update a topic's schedule after the student practised it.
+        The caller owns the transaction; nothing is committed here.
+        """
+        reviewed_at = reviewed_at or datetime.utcnow()
+
+        schedule = db.query(TopicSchedule).filter(
+            TopicSchedule.student_id == student_id,
+            TopicSchedule.topic_id == topic_id
+        ).first()
+        if schedule is None:
+            schedule = TopicSchedule(
+                student_id=student_id,
+                topic_id=topic_id,
+                easiness=self.initial_easiness,
+                interval_days=0,
+                repetitions=0
+            )
+            db.add(schedule)
+
+        easiness, interval_days, repetitions = self.next_state(
+            schedule.easiness, schedule.interval_days, schedule.repetitions,
+            self.score_to_quality(score)
+        )
+        schedule.easiness = easiness
+        schedule.interval_days = interval_days
+        schedule.repetitions = repetitions
+        schedule.last_score = score
+        schedule.last_reviewed_at = reviewed_at
+        schedule.next_due_at = reviewed_at + timedelta(days=interval_days)
+
+        return schedule
+
+    def record_goal_completions(self, db: Session, student_id: int,
+                                completions: List[Tuple[int, datetime]]) -> int:
+        """
+        Note completed micro goals on their topics' schedules. A goal carries no
+        score, so the SM-2 state is left alone; the topic is only marked as
+        touched and kept out of the due list for at least the first interval.
+        One SELECT covers all topics; the caller owns the transaction.
+        """
+        latest: Dict[int, datetime] = {}
+        for topic_id, completed_at in completions:
+            if topic_id is not None and (topic_id not in latest or completed_at > latest[topic_id]):
+                latest[topic_id] = completed_at
+        if not latest:
+            return 0
+
+        schedules = {
+            schedule.topic_id: schedule
+            for schedule in db.query(TopicSchedule).filter(
+                TopicSchedule.student_id == student_id,
+                TopicSchedule.topic_id.in_(list(latest))
+            )
+        }
+        for topic_id, completed_at in latest.items():
+            schedule = schedules.get(topic_id)
+            if schedule is None:
+                schedule = TopicSchedule(
+                    student_id=student_id,
+                    topic_id=topic_id,
+                    easiness=self.initial_easiness,
+                    interval_days=0,
+                    repetitions=0
+                )
+                db.add(schedule)
+
+            not_before = completed_at + timedelta(days=self.first_intervals[0])
+            if schedule.last_reviewed_at is None or completed_at > schedule.last_reviewed_at:
+                schedule.last_reviewed_at = completed_at
+            if schedule.next_due_at is None or schedule.next_due_at < not_before:
+                schedule.next_due_at = not_before
+
+        return len(latest)
+
+    def due_topics(self, db: Session, student_id: int, limit: int, now: Optional[datetime] = None,
+                   syllabus_ids: Optional[List[int]] = None) -> List[Topic]:
+        """
+        Return up to `limit` topics the student should revisit, most overdue first.
+        Reviewed topics come from the (student_id, next_due_at) index; topics the
+        student has never practised fill any remaining slots. syllabus_ids, when
+        given, restricts both to the student's enrolled syllabi.
+        """
+        now = now or datetime.utcnow()
+
+        overdue_query = db.query(Topic).join(
+            TopicSchedule, TopicSchedule.topic_id == Topic.id
+        ).filter(
+            TopicSchedule.student_id == student_id,
+            TopicSchedule.next_due_at <= now
+        )
+        if syllabus_ids is not None:
+            overdue_query = overdue_query.filter(Topic.syllabus_id.in_(syllabus_ids))
+        overdue = overdue_query.order_by(TopicSchedule.next_due_at).limit(limit).all()
+
+        remaining = limit - len(overdue)
+        if remaining <= 0:
+            return overdue
+
+        # Anti-join on the unique (student_id, topic_id) index, stops after `remaining` rows
+        never_practised_query = db.query(Topic).outerjoin(
+            TopicSchedule,
+            and_(TopicSchedule.topic_id == Topic.id, TopicSchedule.student_id == student_id)
+        ).filter(
+            TopicSchedule.id.is_(None)
+        )
+        if syllabus_ids is not None:
+            never_practised_query = never_practised_query.filter(Topic.syllabus_id.in_(syllabus_ids))
+        never_practised = never_practised_query.order_by(Topic.id).limit(remaining).all()
+
+        return overdue + never_practised
+
+    def rebuild_student_schedule(self, db: Session, student_id: int) -> int:
+        """
+        Recompute a student's schedule from their full performance history.
+        Used to backfill students whose records predate the scheduler.
+        """
+        db.query(TopicSchedule).filter(
+            TopicSchedule.student_id == student_id
+        ).delete(synchronize_session=False)
+
+        records = db.query(PerformanceRecord).filter(
+            PerformanceRecord.student_id == student_id
+        ).order_by(PerformanceRecord.date).all()
+
+        for record in records:
+            self.record_review(db, student_id, record.topic_id, record.score, record.date)
+            db.flush()
+
+        return len(records)
+
+    def backfill_schedules(self, db: Session) -> int:
+        """
+        Rebuild the schedule of every student who has performance records but
+        no schedule rows, i.e. whose history predates the scheduler. Commits
+        per student and returns how many were rebuilt.
+        """
+        student_ids = [student_id for (student_id,) in db.query(PerformanceRecord.student_id).filter(
+            ~exists().where(TopicSchedule.student_id == PerformanceRecord.student_id)
+        ).distinct().order_by(PerformanceRecord.student_id)]
+
+        for student_id in student_ids:
+            self.rebuild_student_schedule(db, student_id)
+            db.commit()
+
+        return len(student_ids)
+
+
+# Initialize the topic scheduler engine
+topic_scheduler_engine = TopicSchedulerEngine()
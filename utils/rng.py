@@ -0,0 +1,23 @@
+import hashlib
+import random
+from datetime import date, datetime
+from typing import Optional
+
+
+def derive_seed(student_id: int, day: date, engine_version: str, variant: int = 0) -> int:
+    """
+    Stable 64-bit seed for one student's outputs on one day from one engine version.
+    variant distinguishes deliberate re-rolls (e.g. regenerating today's goals).
+    """
+    key = f"{engine_version}:{student_id}:{day.isoformat()}:{variant}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+
+def derive_rng(student_id: int, day: Optional[date], engine_version: str, variant: int = 0) -> random.Random:
+    """
+    Private random generator for (student_id, day, engine_version).
+    Identical inputs always replay the same sequence of choices; day
+    defaults to the current UTC date.
+    """
+    day = day or datetime.utcnow().date()
+    return random.Random(derive_seed(student_id, day, engine_version, variant))
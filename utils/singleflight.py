@@ -0,0 +1,140 @@
+"""
+Request coalescing ("single-flight") for expensive engine entry points.
+
+Routes run in a thread pool, so when several requests ask for the same
+student's computation at once each would otherwise redo it. Wrapped with
+@coalesced, the first caller for a key runs the computation and the
+callers that arrive while it is running wait for it and share its result
+(or its exception). Nothing is kept once the call finishes, so this never
+serves a stale value. A follower may get a result that was computed from
+data read just before it arrived; callers that need their own write
+reflected bump the student's cache generation and read afterwards.
+
+Keys default to the call arguments after `self` and the database session.
+EXAM_SINGLE_FLIGHT=0 turns coalescing off (every call runs). Counts of
+executed and coalesced calls are exported at /metrics as
+singleflight_calls_total.
+"""
+import functools
+import os
+import threading
+from typing import Callable, Dict, Hashable, List, Optional
+
+from monitoring.metrics import metrics_registry
+
+SINGLE_FLIGHT_ENABLED = os.environ.get("EXAM_SINGLE_FLIGHT", "1") not in ("0", "false", "no")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """One in-flight computation per key; concurrent callers for the key share it"""
+
+    def __init__(self, name: str, enabled: bool = SINGLE_FLIGHT_ENABLED):
+        self.name = name
+        self.enabled = enabled
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], object]):
+        if not self.enabled:
+            with self._lock:
+                self.executed += 1
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class SingleFlightRegistry:
+    """Named single-flight groups, rendered together for /metrics"""
+
+    def __init__(self):
+        self._groups: Dict[str, SingleFlight] = {}
+        self._lock = threading.Lock()
+
+    def group(self, name: str) -> SingleFlight:
+        with self._lock:
+            group = self._groups.get(name)
+            if group is None:
+                group = self._groups[name] = SingleFlight(name)
+            return group
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            groups = list(self._groups.items())
+        return {name: group.stats() for name, group in sorted(groups)}
+
+    def render_lines(self) -> List[str]:
+        stats = self.stats()
+        lines = ["# HELP singleflight_calls_total Engine calls by outcome: executed, or coalesced onto one in flight",
+                 "# TYPE singleflight_calls_total counter"]
+        for name, group in stats.items():
+            for outcome in ("executed", "coalesced"):
+                lines.append(f'singleflight_calls_total{{call="{name}",outcome="{outcome}"}} {group[outcome]}')
+        lines += ["# HELP singleflight_in_flight Keys currently being computed", "# TYPE singleflight_in_flight gauge"]
+        for name, group in stats.items():
+            lines.append(f'singleflight_in_flight{{call="{name}"}} {group["in_flight"]}')
+        return lines
+
+
+def _default_key(args, kwargs) -> Hashable:
+    # Engine methods are (self, db, ...); neither identifies the computation
+    return args[2:], tuple(sorted(kwargs.items()))
+
+
+def coalesced(name: str, key: Callable[[tuple, dict], Hashable] = _default_key):
+    """Decorator: concurrent calls with the same key share one execution"""
+    def decorator(fn):
+        group = single_flight_registry.group(name)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return group.do(key(args, kwargs), lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+# Process-wide groups
+single_flight_registry = SingleFlightRegistry()
+metrics_registry.register_collector(single_flight_registry.render_lines)
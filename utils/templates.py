@@ -0,0 +1,212 @@
+import json
+import logging
+import os
+import threading
+import time
+from string import Formatter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = os.environ.get(
+    "EXAM_TEMPLATES_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+)
+
+
+class TemplateValidationError(ValueError):
+    """Raised when a template file is malformed or uses unknown placeholders"""
+
+
+class CompiledTemplate:
+    """
+    A template parsed once at load time into literal chunks and field names,
+    so rendering is a single join instead of re-parsing with str.format.
+    """
+    __slots__ = ("source", "fields", "_literals", "_names", "_constant")
+
+    def __init__(self, source: str):
+        self.source = source
+        literals: List[str] = []
+        names: List[str] = []
+        pending = ""
+        try:
+            parsed = list(Formatter().parse(source))
+        except ValueError as e:
+            raise TemplateValidationError(f"Cannot parse template {source!r}: {e}")
+
+        for literal, field_name, format_spec, conversion in parsed:
+            pending += literal
+            if field_name is None:
+                continue
+            if not field_name.isidentifier() or format_spec or conversion:
+                raise TemplateValidationError(
+                    f"Only plain {{name}} placeholders are supported, got {{{field_name}}} in {source!r}"
+                )
+            literals.append(pending)
+            names.append(field_name)
+            pending = ""
+        literals.append(pending)
+
+        self.fields = frozenset(names)
+        self._literals = tuple(literals)
+        self._names = tuple(names)
+        self._constant = literals[0] if not names else None
+
+    def __call__(self, **values) -> str:
+        if self._constant is not None:
+            return self._constant
+        literals = self._literals
+        parts = [literals[0]]
+        for i, name in enumerate(self._names):
+            parts.append(str(values[name]))
+            parts.append(literals[i + 1])
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.source!r})"
+
+
+class TemplateCatalog:
+    """Immutable snapshot of one catalog file: category -> compiled templates"""
+
+    def __init__(self, name: str, locale: str, version: str, categories: Dict[str, Tuple[CompiledTemplate, ...]],
+                 path: str, mtime: float):
+        self.name = name
+        self.locale = locale
+        self.version = version
+        self.path = path
+        self.mtime = mtime
+        self._categories = categories
+
+    def __getitem__(self, category: str) -> Tuple[CompiledTemplate, ...]:
+        return self._categories[category]
+
+    def __contains__(self, category: str) -> bool:
+        return category in self._categories
+
+    def categories(self) -> Iterable[str]:
+        return self._categories.keys()
+
+
+class TemplateRegistry:
+    """
+    Loads versioned JSON template catalogs from TEMPLATES_DIR/<name>/<locale>.json.
+
+    - Catalogs are compiled and validated against the placeholders each
+      category may use when registered; a bad file never replaces a good one.
+    - Locales are loaded lazily on first use and fall back to the default locale.
+    - Files are polled for mtime changes at most every poll_interval seconds;
+      a changed file is reloaded by one caller while everyone else keeps
+      using the previous snapshot, which is then swapped in atomically. A
+      locale served from the default file switches over once its own file
+      appears, and a bad edit is reported once rather than on every poll.
+    """
+
+    def __init__(self, directory: str = TEMPLATES_DIR, default_locale: str = "en", poll_interval: float = 2.0):
+        self.directory = directory
+        self.default_locale = default_locale
+        self.poll_interval = poll_interval
+        self._schemas: Dict[str, Dict[str, frozenset]] = {}
+        self._catalogs: Dict[Tuple[str, str], TemplateCatalog] = {}
+        self._checked_at: Dict[Tuple[str, str], float] = {}
+        self._rejected: Dict[Tuple[str, str], Tuple[str, float]] = {}  # (path, mtime) that last failed to load
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def register(self, name: str, placeholders: Dict[str, Iterable[str]]):
+        """Declare a catalog and the placeholders each of its categories may use"""
+        self._schemas[name] = {category: frozenset(fields) for category, fields in placeholders.items()}
+
+    def get(self, name: str, locale: Optional[str] = None) -> TemplateCatalog:
+        """Return the current snapshot of a catalog, loading or refreshing it if needed"""
+        key = (name, locale or self.default_locale)
+        catalog = self._catalogs.get(key)
+        if catalog is None:
+            with self._load_lock:
+                catalog = self._catalogs.get(key)
+                if catalog is None:
+                    catalog = self._load(*key)
+                    self._catalogs[key] = catalog
+                    self._checked_at[key] = time.monotonic()
+            return catalog
+
+        if time.monotonic() - self._checked_at.get(key, 0.0) >= self.poll_interval:
+            self._maybe_reload(key, catalog)
+            catalog = self._catalogs[key]
+        return catalog
+
+    def _maybe_reload(self, key: Tuple[str, str], catalog: TemplateCatalog):
+        # Never wait: if another thread is already reloading, keep serving the old snapshot
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at[key] = time.monotonic()
+            try:
+                path = self._source_path(*key)
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                return
+            if (path, mtime) == (catalog.path, catalog.mtime) or (path, mtime) == self._rejected.get(key):
+                return
+            try:
+                self._catalogs[key] = self._load(*key)
+                self._rejected.pop(key, None)
+                logger.info("Reloaded template catalog %s/%s", *key)
+            except (OSError, ValueError) as e:
+                self._rejected[key] = (path, mtime)
+                logger.error("Keeping previous template catalog %s/%s: %s", key[0], key[1], e)
+        finally:
+            self._reload_lock.release()
+
+    def _path(self, name: str, locale: str) -> str:
+        return os.path.join(self.directory, name, f"{locale}.json")
+
+    def _source_path(self, name: str, locale: str) -> str:
+        """The locale's own file, or the default locale's while it has none"""
+        path = self._path(name, locale)
+        if not os.path.exists(path) and locale != self.default_locale:
+            path = self._path(name, self.default_locale)
+        return path
+
+    def _load(self, name: str, locale: str) -> TemplateCatalog:
+        if name not in self._schemas:
+            raise KeyError(f"Template catalog {name!r} is not registered")
+
+        path = self._source_path(name, locale)
+        mtime = os.stat(path).st_mtime
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        return self.compile(name, locale, data, path=path, mtime=mtime)
+
+    def compile(self, name: str, locale: str, data: Dict, path: str = "", mtime: float = 0.0) -> TemplateCatalog:
+        """Validate and compile a parsed catalog document"""
+        schema = self._schemas[name]
+        if "version" not in data or not isinstance(data.get("templates"), dict):
+            raise TemplateValidationError(f"{name}/{locale}: expected 'version' and 'templates' keys")
+
+        missing = set(schema) - set(data["templates"])
+        if missing:
+            raise TemplateValidationError(f"{name}/{locale}: missing categories {sorted(missing)}")
+
+        categories = {}
+        for category, sources in data["templates"].items():
+            if category not in schema:
+                raise TemplateValidationError(f"{name}/{locale}: unknown category {category!r}")
+            if not sources:
+                raise TemplateValidationError(f"{name}/{locale}: category {category!r} is empty")
+            compiled = tuple(CompiledTemplate(source) for source in sources)
+            for template in compiled:
+                unknown = template.fields - schema[category]
+                if unknown:
+                    raise TemplateValidationError(
+                        f"{name}/{locale}: {category!r} template {template.source!r} uses unknown placeholders {sorted(unknown)}"
+                    )
+            categories[category] = compiled
+
+        return TemplateCatalog(name, locale, str(data["version"]), categories, path, mtime)
+
+
+# Shared registry used by the engines
+template_registry = TemplateRegistry()
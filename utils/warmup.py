@@ -0,0 +1,103 @@
+"""
+Startup work kept out of `import main`, and its progress for /ready.
+
+Importing the API loads only what routing needs; schema creation, the heavy
+numeric libraries the engines import lazily and (optionally) the NLP model
+are registered as warmup steps and run once the worker starts.
+
+Configuration (environment):
+- EXAM_WARMUP=background (default) runs deferred steps in a daemon thread
+  after startup, so the worker accepts connections at once and /ready turns
+  200 when they finish; "startup" runs them inside the startup hook; "off"
+  skips preloading the libraries (the first request that needs them pays).
+- EXAM_CREATE_SCHEMA=0 leaves tables to `python -m database.migrate`, run
+  once per deploy; by default each worker creates missing tables on startup.
+  Schema creation always runs in the startup hook, before any request.
+"""
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WARMUP_MODE = os.environ.get("EXAM_WARMUP", "background")
+CREATE_SCHEMA = os.environ.get("EXAM_CREATE_SCHEMA", "1") not in ("0", "false", "no")
+
+# Imported lazily by the engines; loading them takes longer than the whole API import
+HEAVY_MODULES = ("numpy", "pandas", "sklearn.linear_model")
+
+
+def import_heavy_modules(modules=HEAVY_MODULES) -> List[str]:
+    for name in modules:
+        importlib.import_module(name)
+    return list(modules)
+
+
+class StartupWarmup:
+    """Runs named startup steps once and reports their state (pending, running, done, failed)"""
+
+    def __init__(self, mode: str = WARMUP_MODE):
+        self.mode = mode
+        self._steps: List[tuple] = []
+        self._status: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, step: Callable[[], object], deferred: bool = True):
+        """Register a step; deferred steps follow EXAM_WARMUP, the others always run in the startup hook"""
+        self._steps.append((name, step, deferred))
+        self._status[name] = {"state": "pending", "seconds": None, "error": None}
+
+    def _run(self, name: str, step: Callable[[], object]):
+        status = self._status[name]
+        status["state"] = "running"
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            status.update(state="failed", error=f"{type(e).__name__}: {e}")
+            logger.exception("Warmup step %s failed", name)
+        else:
+            status["state"] = "done"
+        status["seconds"] = round(time.perf_counter() - started, 3)
+
+    def _run_all(self, steps):
+        for name, step, _ in steps:
+            self._run(name, step)
+
+    def start(self):
+        """Run the steps for this worker; only the first call does anything"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        self._run_all([s for s in self._steps if not s[2]])
+        deferred = [s for s in self._steps if s[2]]
+        if self.mode == "background" and deferred:
+            self._thread = threading.Thread(target=self._run_all, args=(deferred,), name="startup-warmup", daemon=True)
+            self._thread.start()
+        else:
+            self._run_all(deferred)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until background steps finish; returns readiness"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    @property
+    def ready(self) -> bool:
+        return self._started and all(status["state"] == "done" for status in self._status.values())
+
+    def stats(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "mode": self.mode,
+            "steps": {name: dict(status) for name, status in self._status.items()},
+            "pid": os.getpid()
+        }